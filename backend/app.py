@@ -23,9 +23,11 @@ load_dotenv(os.path.join(CURRENT_DIR, ".env"))
 try:
     from backend.config import Config
     from backend.extensions import db, migrate, jwt
+    from backend.utils.schema import verify_schema, readiness
 except ModuleNotFoundError:
     from config import Config
     from extensions import db, migrate, jwt
+    from utils.schema import verify_schema, readiness
 
 # ==========================================================
 #  Import dinmico tolerante
@@ -46,7 +48,8 @@ def import_models():
         "asset", "manual", "inventory", "invoice",
         "project_room_status", "project", "quote", "task",
         "task_comment", "user", "vendor", "document",
-        "inspection", "sop"
+        "inspection", "sop", "inventory_usage", "table_version",
+        "room", "asset_state_history", "search_document"
     ]
     for m in modules:
         mod = safe_import(f"backend.models.{m}", f"models.{m}")
@@ -59,7 +62,8 @@ def register_routes(app):
     routes = [
         "auth", "assets", "inventory", "invoices", "projects", "quotes",
         "tasks", "task_comments", "vendors", "users", "uploads",
-        "documents", "inspections", "manuals", "sops"
+        "documents", "inspections", "manuals", "sops", "activity",
+        "autocomplete", "search"
     ]
     for r in routes:
         mod = safe_import(f"backend.routes.{r}", f"routes.{r}")
@@ -102,12 +106,19 @@ def create_app(config_class=Config):
     def health():
         return jsonify({"message": "Hotel Engineering API running", "status": "ok"})
 
+    @app.route("/api/health/ready")
+    def health_ready():
+        # Resultado cacheado de verify_schema(): no hace introspeccion por request
+        state = readiness(app)
+        return jsonify(state), (200 if state.get("ok") else 503)
+
     register_routes(app)
     with app.app_context():
         try:
             db.create_all()
         except Exception as e:
             print(f"[db] Error creating tables: {e}")
+    verify_schema(app)
 
     @app.route("/uploads/<path:filename>")
     def serve_upload(filename):
@@ -19,6 +19,7 @@ from .task_comment import TaskComment
 # Inventory
 from .inventory import InventoryItem
 from .inventory_log import InventoryLog
+from .inventory_usage import InventoryDailyUsage, InventoryRollupState
 
 # Vendors / Quotes / Invoices
 from .vendor import Vendor
@@ -26,7 +27,8 @@ from .quote import Quote
 from .invoice import Invoice
 
 # Projects and related tracking
-from .project import Project, ProjectRoomStatus, ProjectRoomAudit
+from .project import Project, ProjectRoomStatus, ProjectRoomAudit, ProjectRoomCheckpoint
+from .room import Room
 
 # Inspections
 from .inspection import Inspection
@@ -34,6 +36,13 @@ from .inspection_item import InspectionItem
 
 # Asset status tracking
 from .asset_status import AssetStatus
+from .asset_state_history import AssetStateHistory
+
+# Búsqueda unificada (/api/search)
+from .search_document import SearchDocument
+
+# Change tracking (invalidación de cachés por proceso)
+from .table_version import ChangeLog
 
 # INNCOM system
 from .inncom_temp import InncomTemp  # ✅ Agregado correctamente
@@ -57,6 +66,8 @@ __all__ = [
     # Inventory
     "InventoryItem",
     "InventoryLog",
+    "InventoryDailyUsage",
+    "InventoryRollupState",
 
     # Vendors / Quotes / Invoices
     "Vendor",
@@ -67,6 +78,8 @@ __all__ = [
     "Project",
     "ProjectRoomStatus",
     "ProjectRoomAudit",
+    "ProjectRoomCheckpoint",
+    "Room",
 
     # Inspections
     "Inspection",
@@ -74,6 +87,13 @@ __all__ = [
 
     # Asset Status
     "AssetStatus",
+    "AssetStateHistory",
+
+    # Búsqueda unificada
+    "SearchDocument",
+
+    # Change tracking
+    "ChangeLog",
 
     # INNCOM
     "InncomTemp",
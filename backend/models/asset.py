@@ -14,6 +14,9 @@ class Asset(db.Model):
     __table_args__ = (
         db.Index("ix_asset_type", "type"),
         db.Index("ix_asset_area_floor", "area", "floor"),
+        # Búsqueda difusa (backend/utils/fuzzy.py) — solo PostgreSQL, requiere pg_trgm
+        db.Index("ix_asset_name_trgm", "name", postgresql_using="gin",
+                 postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
         {"extend_existing": True},
     )
 
@@ -118,3 +121,9 @@ class Asset(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+# Keyset del listado (backend/routes/assets.py ASSET_SORTS): clave de orden + id
+db.Index("ix_asset_sort_name_id", Asset.name, Asset.id)
+db.Index("ix_asset_sort_floor_id", func.coalesce(Asset.floor, ""), Asset.id)
+db.Index("ix_asset_sort_type_id", func.coalesce(Asset.type, ""), Asset.id)
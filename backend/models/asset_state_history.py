@@ -0,0 +1,42 @@
+# backend/models/asset_state_history.py
+from __future__ import annotations
+from typing import Any, Dict
+from sqlalchemy.sql import func
+
+from backend.extensions import db
+
+
+class AssetStateHistory(db.Model):
+    """
+    Historial append-only de cambios de AssetStatus.state (una fila por
+    transición). Lo escribe _update_asset_statuses en routes/inspections.py;
+    backend/utils/asset_reliability.py calcula MTBF y fallas a partir de él.
+    """
+    __tablename__ = "asset_state_history"
+    __table_args__ = (
+        db.Index("ix_asset_state_history_asset_changed", "asset_id", "changed_at"),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    asset_id = db.Column(db.Integer, nullable=False)  # FK lógico a asset.id
+    prev_state = db.Column(db.String(16), nullable=True)
+    state = db.Column(db.String(16), nullable=False)
+    inspection_id = db.Column(db.Integer, nullable=True)
+    changed_by = db.Column(db.String(120), nullable=True)
+    changed_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "asset_id": self.asset_id,
+            "prev_state": self.prev_state,
+            "state": self.state,
+            "inspection_id": self.inspection_id,
+            "changed_by": self.changed_by,
+            "changed_at": self.changed_at.isoformat() if self.changed_at else None,
+        }
@@ -24,6 +24,16 @@ class Inspection(db.Model):
     status = db.Column(db.String(20), nullable=False, default="in_progress")  # in_progress | completed | paused
     progress = db.Column(db.Integer, nullable=False, default=0)
 
+    # Contadores de ítems por estado, mantenidos por el servidor en la misma
+    # transacción que los cambios de ítems (backend/utils/inspection_items.py).
+    # progress se deriva de ellos.
+    items_total = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    items_open = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    items_ok = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    items_fail = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    items_na = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    items_ooo = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # Actor que inició / metadatos
     started_by_name = db.Column(db.String(120), nullable=True)
 
@@ -53,6 +63,14 @@ class Inspection(db.Model):
             "floors": self.floors or [],
             "status": self.status,
             "progress": self.progress,
+            "counts": {
+                "total": self.items_total or 0,
+                "open": self.items_open or 0,
+                "ok": self.items_ok or 0,
+                "fail": self.items_fail or 0,
+                "na": self.items_na or 0,
+                "ooo": self.items_ooo or 0,
+            },
             "started_by_name": self.started_by_name,
             "inspection_date": self.inspection_date.isoformat() if self.inspection_date else None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
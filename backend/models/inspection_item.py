@@ -8,6 +8,10 @@ from backend.extensions import db
 
 class InspectionItem(db.Model):
     __tablename__ = "inspection_item"
+    __table_args__ = (
+        # Un ítem por asset y por inspección (ver backend/utils/inspection_items.py)
+        db.Index("uq_inspection_item_asset", "inspection_id", "asset_id", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -36,6 +40,12 @@ class InspectionItem(db.Model):
 
     updated_by = db.Column(db.String(120), nullable=True)
 
+    # Sincronización offline: versión por ítem (+1 en cada cambio) y hora del
+    # último cambio de cada campo, para resolver conflictos campo a campo.
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    status_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    notes_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
     # ✅ PostgreSQL-compatible timestamps
     created_at = db.Column(
         db.DateTime(timezone=True),
@@ -65,6 +75,7 @@ class InspectionItem(db.Model):
             "notes": self.notes or "",
             "photos": self.photos or [],
             "updated_by": self.updated_by,
+            "version": self.version or 1,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+from sqlalchemy import text
+from sqlalchemy.sql import func
 from backend.extensions import db
 
 
 class InventoryItem(db.Model):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # Índice parcial para /lowstock y ?low=1 (el predicado debe coincidir con la consulta)
+        db.Index(
+            "ix_inventory_low_stock", "name", "id",
+            postgresql_where=text("stock <= minimum"),
+            sqlite_where=text("stock <= minimum"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -60,3 +70,7 @@ class InventoryItem(db.Model):
             "product_link": self.product_link,
             "image_url": self.image,
         }
+
+
+# Keyset del listado: ORDER BY COALESCE(name, ''), id
+db.Index("ix_inventory_sort_name_id", func.coalesce(InventoryItem.name, ""), InventoryItem.id)
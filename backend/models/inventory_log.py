@@ -7,6 +7,12 @@ from backend.extensions import db
 
 class InventoryLog(db.Model):
     __tablename__ = "inventory_log"
+    __table_args__ = (
+        # /logs: historial por ítem o por usuario y keyset global por (created_at, id)
+        db.Index("ix_inventory_log_item_created", "item_db_id", "created_at"),
+        db.Index("ix_inventory_log_user_created", "user_id", "created_at"),
+        db.Index("ix_inventory_log_created_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
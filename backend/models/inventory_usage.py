@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from sqlalchemy.sql import func
+
+from backend.extensions import db
+
+
+class InventoryDailyUsage(db.Model):
+    """
+    Agregado diario por ítem construido a partir de InventoryLog
+    (ver backend/utils/inventory_usage.py). El forecast solo lee esta tabla.
+    """
+    __tablename__ = "inventory_daily_usage"
+
+    item_db_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+
+    qty_in = db.Column(db.Integer, nullable=False, default=0)    # suma de entradas (in)
+    qty_out = db.Column(db.Integer, nullable=False, default=0)   # consumo (out, positivo)
+    qty_set = db.Column(db.Integer, nullable=False, default=0)   # ajustes netos por conteo (set)
+    moves = db.Column(db.Integer, nullable=False, default=0)     # nº de movimientos
+
+    def to_dict(self) -> dict:
+        return {
+            "item_db_id": self.item_db_id,
+            "day": self.day.isoformat() if self.day else None,
+            "qty_in": self.qty_in,
+            "qty_out": self.qty_out,
+            "qty_set": self.qty_set,
+            "moves": self.moves,
+        }
+
+
+class InventoryRollupState(db.Model):
+    """Marca de agua del job de rollup (una fila por job)."""
+    __tablename__ = "inventory_rollup_state"
+
+    name = db.Column(db.String(40), primary_key=True)
+    last_day = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now()
+    )
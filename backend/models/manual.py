@@ -6,6 +6,13 @@ from backend.extensions import db
 
 class Manual(db.Model):
     __tablename__ = "manuals"
+    __table_args__ = (
+        # Búsqueda difusa (backend/utils/fuzzy.py) — solo PostgreSQL, requiere pg_trgm
+        db.Index("ix_manuals_title_trgm", "title", postgresql_using="gin",
+                 postgresql_ops={"title": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        db.Index("ix_manuals_description_trgm", "description", postgresql_using="gin",
+                 postgresql_ops={"description": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     # title requerido
@@ -95,6 +95,8 @@ class ProjectRoomStatus(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("project_id", "room_number", name="uq_project_room"),
+        # Conteos por estado del listado de proyectos (index-only scan)
+        db.Index("ix_project_room_status_project_status", "project_id", "status"),
     )
 
     def to_dict(self):
@@ -111,6 +113,10 @@ class ProjectRoomStatus(db.Model):
 
 class ProjectRoomAudit(db.Model):
     __tablename__ = "project_room_audit"
+    __table_args__ = (
+        # Última auditoría por habitación a una fecha (as_of / progreso)
+        db.Index("ix_project_room_audit_project_room_created", "project_id", "room_number", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(
@@ -141,3 +147,24 @@ class ProjectRoomAudit(db.Model):
             "updated_by": self.updated_by,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class ProjectRoomCheckpoint(db.Model):
+    """
+    Foto del estado de las habitaciones al cierre de un día (UTC), solo para
+    días con cambios. La construye backend/utils/room_history.py a partir de
+    ProjectRoomAudit; las habitaciones sin auditorías no aparecen (siguen en
+    su estado inicial).
+    """
+    __tablename__ = "project_room_checkpoint"
+
+    project_id = db.Column(
+        db.Integer,
+        db.ForeignKey("project.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = db.Column(db.Date, primary_key=True)
+    room_number = db.Column(db.String(10), primary_key=True)
+    status = db.Column(db.String(40))
+    updated_by = db.Column(db.String(120))
+    changed_at = db.Column(db.DateTime(timezone=True))
@@ -5,6 +5,15 @@ from backend.extensions import db
 
 class Quote(db.Model):
     __tablename__ = "quote"
+    __table_args__ = (
+        # Búsqueda difusa (backend/utils/fuzzy.py) — solo PostgreSQL, requiere pg_trgm
+        db.Index("ix_quote_quote_number_trgm", "quote_number", postgresql_using="gin",
+                 postgresql_ops={"quote_number": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        db.Index("ix_quote_scope_title_trgm", "scope_title", postgresql_using="gin",
+                 postgresql_ops={"scope_title": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        db.Index("ix_quote_scope_detail_trgm", "scope_detail", postgresql_using="gin",
+                 postgresql_ops={"scope_detail": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     quote_number = db.Column(db.String(120), unique=True, nullable=False)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from sqlalchemy.sql import func
+
+from backend.extensions import db
+
+
+class Room(db.Model):
+    """
+    Topología de habitaciones de la propiedad (una fila por habitación).
+    Los proyectos siembran ProjectRoomStatus a partir de esta tabla, así que
+    otra propiedad solo necesita cargar sus habitaciones aquí.
+    """
+    __tablename__ = "room"
+    __table_args__ = (
+        db.Index("ix_room_floor_sort", "floor", "sort_order"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    number = db.Column(db.String(10), nullable=False, unique=True)
+    floor = db.Column(db.String(20), nullable=True)
+    type = db.Column(db.String(40), nullable=True)          # "King", "Double Queen", "Suite"
+    display_name = db.Column(db.String(80), nullable=True)
+    sort_order = db.Column(db.Integer, nullable=False, default=0)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+
+    created_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "number": self.number,
+            "floor": self.floor,
+            "type": self.type,
+            "display_name": self.display_name or self.number,
+            "sort_order": self.sort_order,
+            "active": bool(self.active),
+        }
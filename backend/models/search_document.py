@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import func
+
+from backend.extensions import db
+
+
+class SearchDocument(db.Model):
+    """
+    Índice de búsqueda unificado: un documento por entidad (tarea, comentario,
+    asset, ítem de inventario, vendor, manual, paso de SOP, factura). Lo
+    mantiene backend/utils/search_index.py desde hooks de la sesión; no se
+    escribe a mano. `tsv` (solo PostgreSQL) pondera title A, subtitle B, body C.
+    """
+    __tablename__ = "search_document"
+    __table_args__ = (
+        db.UniqueConstraint("entity_type", "entity_id", name="uq_search_document_entity"),
+        db.Index("ix_search_document_parent", "parent_type", "parent_id"),
+        db.Index("ix_search_document_vendor", "vendor_id"),
+        db.Index("ix_search_document_tsv_gin", "tsv", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    entity_type = db.Column(db.String(24), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+
+    title = db.Column(db.String(255), nullable=True)
+    subtitle = db.Column(db.String(255), nullable=True)
+    body = db.Column(db.Text, nullable=True)
+    tsv = db.Column(db.Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+
+    # Facetas
+    floor = db.Column(db.String(20), nullable=True)
+    room = db.Column(db.String(20), nullable=True)
+    vendor_id = db.Column(db.Integer, nullable=True)
+    vendor_name = db.Column(db.String(180), nullable=True)
+
+    # Entidad de la que depende el documento (task de un comentario, sop de un paso)
+    parent_type = db.Column(db.String(24), nullable=True)
+    parent_id = db.Column(db.Integer, nullable=True)
+
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
@@ -10,6 +10,11 @@ class SOP(db.Model):
     __tablename__ = "sop"
     __table_args__ = (
         db.Index("ix_sop_title", "title"),
+        # Búsqueda difusa (backend/utils/fuzzy.py) — solo PostgreSQL, requiere pg_trgm
+        db.Index("ix_sop_title_trgm", "title", postgresql_using="gin",
+                 postgresql_ops={"title": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        db.Index("ix_sop_description_trgm", "description", postgresql_using="gin",
+                 postgresql_ops={"description": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
         {"extend_existing": True},
     )
 
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from sqlalchemy.sql import func
+
+from backend.extensions import db
+
+
+class ChangeLog(db.Model):
+    """
+    Filas tocadas por tabla, escritas tras el commit del cambio (ver
+    backend/utils/versions.py). El id hace de versión: max(id) de una tabla es
+    su versión actual. row_id NULL / op '*' = cambio masivo (recargar todo).
+    scope_id: ámbito de la fila en tablas con cursor propio (p. ej. inspection_id).
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        db.Index("ix_change_log_table_id", "table_name", "id"),
+        db.Index("ix_change_log_table_scope_id", "table_name", "scope_id", "id"),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_id = db.Column(db.Integer, nullable=True)
+    op = db.Column(db.String(1), nullable=False)  # i|u|d|*
+    scope_id = db.Column(db.Integer, nullable=True)
+
+    created_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
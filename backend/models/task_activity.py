@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from backend.extensions import db
 
 
 class TaskActivity(db.Model):
     __tablename__ = "task_activity"
+    __table_args__ = (
+        # Feed global /api/activity (keyset por created_at, id)
+        db.Index("ix_task_activity_created_id", "created_at", "id"),
+        db.Index("ix_task_activity_user_created", "user_id", "created_at"),
+        # Filtro por campo cambiado (changes ? 'status') — solo PostgreSQL
+        db.Index("ix_task_activity_changes_gin", "changes", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -18,7 +26,8 @@ class TaskActivity(db.Model):
 
     # Qué pasó
     action = db.Column(db.String(40), nullable=False)  # create, update, move, delete
-    changes = db.Column(db.Text, default="")  # JSON string: {"field":{"old":...,"new":...}}
+    # {"field": {"old": ..., "new": ...}} — JSONB en PostgreSQL, JSON (texto) en SQLite
+    changes = db.Column(db.JSON().with_variant(JSONB(), "postgresql"), default=dict)
 
     # Quién lo hizo (estilo InventoryLog)
     user_id = db.Column(db.Integer, nullable=True)
@@ -5,6 +5,10 @@ from backend.extensions import db
 
 class TaskComment(db.Model):
     __tablename__ = "task_comment"
+    __table_args__ = (
+        # Hilos paginados por id y conteos GROUP BY task_id (solo índice)
+        db.Index("ix_task_comment_task_id_id", "task_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
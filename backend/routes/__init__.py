@@ -10,6 +10,9 @@ from .projects import bp as projects_bp
 from .users import bp as users_bp
 from .uploads import bp as uploads_bp
 from .manuals import bp as manuals_bp
+from .activity import bp as activity_bp
+from .autocomplete import bp as autocomplete_bp
+from .search import bp as search_bp
 
 # ✅ Technical integrations (INNCOM)
 from backend.routes.inncom import inncom_bp
@@ -27,12 +30,15 @@ def register_blueprints(app):
 
     # 🧾 Core maintenance
     app.register_blueprint(tasks_bp, url_prefix="/api/tasks")
+    app.register_blueprint(activity_bp, url_prefix="/api/activity")
     app.register_blueprint(inventory_bp, url_prefix="/api/inventory")
     app.register_blueprint(vendors_bp, url_prefix="/api/vendors")
     app.register_blueprint(quotes_bp, url_prefix="/api/quotes")
     app.register_blueprint(invoices_bp, url_prefix="/api/invoices")
     app.register_blueprint(assets_bp, url_prefix="/api/assets")
     app.register_blueprint(projects_bp, url_prefix="/api/projects")
+    app.register_blueprint(autocomplete_bp, url_prefix="/api/autocomplete")
+    app.register_blueprint(search_bp, url_prefix="/api/search")
 
     # 📚 Documentation & manuals
     app.register_blueprint(manuals_bp, url_prefix="/api/manuals")
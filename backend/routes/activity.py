@@ -0,0 +1,111 @@
+# backend/routes/activity.py
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, or_
+
+from backend.extensions import db
+from backend.models.task import Task
+from backend.models.task_activity import TaskActivity
+from backend.routes.tasks import serialize_activity
+from backend.utils.pagination import CursorError, keyset_page, limit_arg
+
+bp = Blueprint("activity", __name__, url_prefix="/api/activity")
+
+
+def _parse_bound(val, end=False):
+    """ISO datetime o fecha; una fecha sola como `to` incluye el día completo."""
+    if not val:
+        return None
+    s = str(val).strip().replace("Z", "+00:00")
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        return None
+    if end and len(s) == 10:
+        dt = dt + timedelta(days=1)
+    return dt
+
+
+def _csv(name):
+    raw = request.args.get(name) or ""
+    return [p.strip() for p in raw.split(",") if p.strip()]
+
+
+def _changed_field(field: str):
+    if db.engine.dialect.name == "postgresql":
+        # Operador JSONB `?` → usa el índice GIN ix_task_activity_changes_gin
+        return TaskActivity.changes.op("?")(field)
+    return func.json_type(TaskActivity.changes, f'$."{field}"').isnot(None)
+
+
+@bp.get("", strict_slashes=False)
+@bp.get("/", strict_slashes=False)
+@jwt_required(optional=True)
+def list_activity():
+    """
+    Query params:
+      - user:     id | email | nombre (exacto, sin distinguir mayúsculas)
+      - user_id:  int
+      - task_id:  int
+      - action:   create,update,move,delete (lista separada por comas)
+      - field:    status,assignee,... (cualquiera de los campos cambiados)
+      - from/to:  ISO date/datetime (`to` de solo fecha incluye el día)
+      - limit:    default 50, máx 200
+      - cursor:   opaco, devuelto como next_cursor
+    """
+    q = db.session.query(TaskActivity, Task.title).outerjoin(Task, Task.id == TaskActivity.task_id)
+
+    user_q = (request.args.get("user") or "").strip()
+    if user_q:
+        if user_q.isdigit():
+            q = q.filter(TaskActivity.user_id == int(user_q))
+        else:
+            u = user_q.lower()
+            q = q.filter(or_(
+                func.lower(TaskActivity.user_email) == u,
+                func.lower(TaskActivity.user_name) == u,
+                func.lower(TaskActivity.actor) == u,
+            ))
+    user_id = request.args.get("user_id", type=int)
+    if user_id is not None:
+        q = q.filter(TaskActivity.user_id == user_id)
+    task_id = request.args.get("task_id", type=int)
+    if task_id is not None:
+        q = q.filter(TaskActivity.task_id == task_id)
+
+    actions = _csv("action")
+    if actions:
+        q = q.filter(TaskActivity.action.in_(actions))
+    fields = _csv("field")
+    if fields:
+        q = q.filter(or_(*[_changed_field(f) for f in fields]))
+
+    dt_from = _parse_bound(request.args.get("from"))
+    dt_to = _parse_bound(request.args.get("to"), end=True)
+    if dt_from:
+        q = q.filter(TaskActivity.created_at >= dt_from)
+    if dt_to:
+        q = q.filter(TaskActivity.created_at < dt_to if len(request.args["to"].strip()) == 10
+                     else TaskActivity.created_at <= dt_to)
+
+    try:
+        rows, next_cursor = keyset_page(
+            q,
+            [TaskActivity.created_at, TaskActivity.id],
+            cursor=request.args.get("cursor"),
+            limit=limit_arg(),
+            key=lambda row: [row[0].created_at, row[0].id],
+        )
+    except CursorError as e:
+        return {"error": str(e)}, 400
+
+    items = []
+    for a, title in rows:
+        data = serialize_activity(a)
+        data["entity"] = "task"
+        data["task_title"] = title
+        items.append(data)
+    return {"items": items, "next_cursor": next_cursor}
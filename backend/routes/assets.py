@@ -3,76 +3,79 @@ from __future__ import annotations
 
 from datetime import datetime, date
 from flask import Blueprint, jsonify, request
-from sqlalchemy import desc
+from sqlalchemy import func
 
 from backend.extensions import db
 from backend.models.asset import Asset
+from backend.models.asset_state_history import AssetStateHistory
+from backend.utils.asset_reliability import fleet_reliability
+from backend.utils.fuzzy import FUZZY
+from backend.utils.pagination import CursorError, SortKey, paginate
 
 # ✅ Sin url_prefix aquí (evita duplicar /api/api)
 bp = Blueprint("assets_bp", __name__)
 
 
-def _apply_order(query, model, order_str: str | None, default="-created_at"):
-    field = (order_str or default).strip()
-    desc_sort = field.startswith("-")
-    col_name = field[1:] if desc_sort else field
-    col = getattr(model, col_name, None)
-    if col is None:
-        col = getattr(model, default[1:], model.id)
-        desc_sort = default.startswith("-")
-    return query.order_by(desc(col) if desc_sort else col)
+ASSET_SORTS = {
+    # Cada clave tiene índice (ver backend/models/asset.py); el id desempata
+    "created_at": SortKey(Asset.created_at, "created_at"),
+    "updated_at": SortKey(Asset.updated_at, "updated_at"),
+    "name": SortKey(Asset.name, "name"),
+    "floor": SortKey(func.coalesce(Asset.floor, ""), "floor", ""),
+    "type": SortKey(func.coalesce(Asset.type, ""), "type", ""),
+}
+ASSET_FILTERS = ("floor", "area", "type", "q")
 
 
-def _paginate(query, default_size=50):
-    try:
-        page = max(1, int(request.args.get("page", "1")))
-    except Exception:
-        page = 1
-    try:
-        page_size = min(200, max(1, int(request.args.get("page_size", str(default_size)))))
-    except Exception:
-        page_size = default_size
-    total = query.count()
-    rows = query.offset((page - 1) * page_size).limit(page_size).all()
-    return rows, total, page, page_size
+def _list_params() -> dict:
+    """Query string y, en POST, el cuerpo JSON encima (mismos nombres)."""
+    params = request.args.to_dict(flat=True)
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        params.update({k: v for k, v in data.items() if v is not None})
+    return params
 
 
-@bp.get("/assets")
+@bp.route("/assets", methods=["GET"])
+@bp.route("/assets/list", methods=["GET", "POST"])
 def list_assets():
     """
     Filtros:
       - floor=2
       - area=Lobby
       - type=FCU
-      - q=texto (por nombre)
-      - order=-created_at | name | -name | floor | -floor ...
-      - page, page_size
+      - q=texto (por nombre, tolera errores de tipeo: "extingusher")
+      - order=-created_at | name | -name | floor | type | updated_at (con - = desc);
+        con q, por defecto -relevance (solo ?page, sin cursor)
+      - page_size (alias limit), cursor=<next_cursor> | page (compatibilidad)
+    /assets/list acepta también POST con los mismos campos en el cuerpo JSON.
     """
-    order = request.args.get("order", "-created_at")
-    floor = request.args.get("floor")
-    area = request.args.get("area")
-    typ = request.args.get("type")
-    qstr = request.args.get("q")
+    params = _list_params()
+    filters = {k: str(params[k]).strip() for k in ASSET_FILTERS if params.get(k)}
 
     q = Asset.query
-    if floor:
-        q = q.filter(Asset.floor == floor)
-    if area:
-        q = q.filter(Asset.area == area)
-    if typ:
-        q = q.filter(Asset.type == typ)
-    if qstr:
-        like = f"%{qstr.strip()}%"
-        q = q.filter(Asset.name.ilike(like))
+    if filters.get("floor"):
+        q = q.filter(Asset.floor == filters["floor"])
+    if filters.get("area"):
+        q = q.filter(Asset.area == filters["area"])
+    if filters.get("type"):
+        q = q.filter(Asset.type == filters["type"])
+    sorts, default_order = ASSET_SORTS, "-created_at"
+    if filters.get("q"):
+        # Búsqueda difusa por nombre; sin order explícito, por relevancia
+        q, rank = FUZZY["asset"].search(q, filters["q"])
+        sorts = {**ASSET_SORTS, "relevance": SortKey(rank, None)}
+        default_order = "-relevance"
 
-    q = _apply_order(q, Asset, order)
-    rows, total, page, page_size = _paginate(q)
-    return jsonify({
-        "items": [a.to_dict() for a in rows],
-        "total": total,
-        "page": page,
-        "page_size": page_size
-    }), 200
+    try:
+        page = paginate(
+            q, params, pk=Asset.id, sorts=sorts, default_order=default_order,
+            table=Asset.__tablename__, filters=filters,
+        )
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    rows = page.pop("rows")
+    return jsonify({"items": [a.to_dict() for a in rows], **page}), 200
 
 
 @bp.get("/assets/<int:item_id>")
@@ -81,51 +84,6 @@ def get_asset(item_id: int):
     return jsonify(a.to_dict()), 200
 
 
-@bp.route("/assets/list", methods=["GET", "POST"])
-def list_assets_alias():
-    if request.method == "POST":
-        data = request.get_json(silent=True) or {}
-        order = data.get("order", "-created_at")
-        floor = data.get("floor")
-        area = data.get("area")
-        typ = data.get("type")
-        qstr = data.get("q")
-        page = data.get("page")
-        page_size = data.get("page_size")
-        if page is not None:
-            request.args = request.args.copy()
-            request.args = request.args.to_dict(flat=True)
-            request.args["page"] = str(page)
-        if page_size is not None:
-            request.args["page_size"] = str(page_size)
-    else:
-        order = request.args.get("order", "-created_at")
-        floor = request.args.get("floor")
-        area = request.args.get("area")
-        typ = request.args.get("type")
-        qstr = request.args.get("q")
-
-    q = Asset.query
-    if floor:
-        q = q.filter(Asset.floor == floor)
-    if area:
-        q = q.filter(Asset.area == area)
-    if typ:
-        q = q.filter(Asset.type == typ)
-    if qstr:
-        like = f"%{(qstr or '').strip()}%"
-        q = q.filter(Asset.name.ilike(like))
-
-    q = _apply_order(q, Asset, order)
-    rows, total, page, page_size = _paginate(q)
-    return jsonify({
-        "items": [a.to_dict() for a in rows],
-        "total": total,
-        "page": page,
-        "page_size": page_size
-    }), 200
-
-
 def _to_date(value):
     if not value:
         return None
@@ -217,6 +175,75 @@ def delete_asset(item_id: int):
     return jsonify({"ok": True, "id": item_id}), 200
 
 
+# ---------- Confiabilidad (asset_state_history) ----------
+RELIABILITY_SORTS = {
+    "failures": lambda r: (-r["failures"], r["asset_id"]),
+    "recent": lambda r: (-r["failures_recent"], -r["failures"], r["asset_id"]),
+    "mtbf": lambda r: (r["mtbf_days"] is None, r["mtbf_days"] or 0, r["asset_id"]),
+    "repeat": lambda r: (-r["repeat_failures"], -r["failures"], r["asset_id"]),
+}
+
+
+def _reliability_args():
+    months = min(max(request.args.get("months", 12, type=int), 1), 60)
+    repeat_days = min(max(request.args.get("repeat_days", 90, type=int), 1), 730)
+    return months, repeat_days
+
+
+@bp.get("/assets/reliability")
+def fleet_reliability_ranking():
+    """
+    Ranking de flota: ?type=FCU&sort=failures|recent|mtbf|repeat&limit=50&months=12&repeat_days=90
+    Incluye agregados por tipo (by_type).
+    """
+    sort = request.args.get("sort", "failures")
+    if sort not in RELIABILITY_SORTS:
+        return jsonify({"error": "invalid sort", "detail": f"sort must be one of: {', '.join(RELIABILITY_SORTS)}"}), 400
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    typ = request.args.get("type")
+    try:
+        data = fleet_reliability(*_reliability_args())
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+
+    rows = data["assets"]
+    if typ:
+        rows = [r for r in rows if (r["type"] or "") == typ]
+    if sort in ("failures", "recent", "repeat"):
+        rows = [r for r in rows if r["failures"]]  # el ranking muestra solo assets con fallas
+    rows = sorted(rows, key=RELIABILITY_SORTS[sort])[:limit]
+    by_type = data["by_type"]
+    if typ:
+        by_type = {k: v for k, v in by_type.items() if k == typ}
+    return jsonify({
+        "months": data["months"],
+        "repeat_days": data["repeat_days"],
+        "items": rows,
+        "by_type": by_type,
+    }), 200
+
+
+@bp.get("/assets/<int:asset_id>/reliability")
+def asset_reliability(asset_id: int):
+    """MTBF, fallas por mes, repeat-failure y últimos cambios de estado de un asset."""
+    Asset.query.get_or_404(asset_id)
+    try:
+        data = fleet_reliability(*_reliability_args())
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    i = data["index"].get(asset_id)
+    metrics = dict(data["assets"][i]) if i is not None else {"asset_id": asset_id}
+    history = (
+        AssetStateHistory.query.filter_by(asset_id=asset_id)
+        .order_by(AssetStateHistory.changed_at.desc(), AssetStateHistory.id.desc())
+        .limit(50)
+        .all()
+    )
+    metrics["type_stats"] = data["by_type"].get(metrics.get("type") or "Unspecified")
+    metrics["history"] = [h.to_dict() for h in history]
+    return jsonify(metrics), 200
+
+
 @bp.get("/assets/<int:asset_id>/linked")
 def get_linked_docs(asset_id):
     """Devuelve todos los SOPs y Manuals asociados a un Asset."""
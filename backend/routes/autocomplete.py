@@ -0,0 +1,32 @@
+# backend/routes/autocomplete.py
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+
+from backend.utils.pagination import limit_arg
+from backend.utils.prefix_index import INDEXES
+
+bp = Blueprint("autocomplete", __name__, url_prefix="/api/autocomplete")
+
+
+@bp.get("", strict_slashes=False)
+@bp.get("/", strict_slashes=False)
+@jwt_required(optional=True)
+def autocomplete():
+    """
+    GET /api/autocomplete?kind=item|asset|vendor&q=<prefijo>&limit=10
+    Se resuelve contra el índice en memoria del proceso (sin LIKE a la BD).
+    """
+    kind = (request.args.get("kind") or "").strip().lower()
+    index = INDEXES.get(kind)
+    if index is None:
+        return {"error": "invalid kind", "detail": f"kind must be one of: {', '.join(sorted(INDEXES))}"}, 400
+    limit = limit_arg(default=10, maximum=50)
+    q = request.args.get("q") or ""
+    return {"kind": kind, "q": q, "items": index.search(q, limit)}
+
+
+@bp.get("/stats")
+@jwt_required()
+def autocomplete_stats():
+    return {k: idx.stats() for k, idx in INDEXES.items()}
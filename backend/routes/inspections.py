@@ -1,11 +1,13 @@
 # backend/routes/inspections.py
 from __future__ import annotations
-from datetime import datetime
-from typing import List, Dict
+from datetime import datetime, timezone
+from typing import Dict, List
 import os
 
 from flask import Blueprint, jsonify, request, current_app
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, insert, literal, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.utils import secure_filename
 
 from backend.extensions import db
@@ -13,10 +15,24 @@ from backend.models.inspection import Inspection
 from backend.models.inspection_item import InspectionItem
 from backend.models.asset import Asset
 from backend.models.asset_status import AssetStatus
+from backend.models.asset_state_history import AssetStateHistory
+from backend.utils.inspection_items import (
+    SYNC_FIELDS,
+    apply_counter_deltas,
+    materialize_items,
+    status_deltas,
+    touch_item,
+)
+from backend.utils.schema import require
+from backend.utils.versions import cached, changes_since, scope_version, track
 
 # ✅ Sin url_prefix aquí (ya se aplica en __init__.py)
 bp = Blueprint("inspections", __name__)
 
+track(AssetStatus, Asset)
+# _update_asset_statuses escribe una fila de historial por transición
+require("asset_state_history", "asset_id", "prev_state", "state", "inspection_id", "changed_by", "changed_at")
+
 # ------------------ helpers ------------------
 def _order_cols():
     cols = []
@@ -50,72 +66,126 @@ def _map_item_status_to_asset_state(item_status: str) -> str:
     return ""  # sin cambio
 
 
-def _update_asset_status(asset_id: int, state: str, inspection_id: int | None, who: str):
-    if not asset_id or not state:
+def _update_asset_statuses(changes: List[tuple], inspection_id: int | None, who: str):
+    """
+    Upsert masivo de AssetStatus: changes = [(asset_id, state), ...].
+    PostgreSQL/SQLite: INSERT ... ON CONFLICT DO NOTHING para los nuevos y
+    ON CONFLICT (asset_id) DO UPDATE para el resto, con su estado anterior
+    leído FOR UPDATE. Las transiciones se agregan a asset_state_history.
+    """
+    latest: Dict[int, str] = {}
+    for asset_id, state in changes:
+        if asset_id and state:
+            latest[asset_id] = state  # el último gana
+    if not latest:
         return
-    row = db.session.get(AssetStatus, asset_id)
-    if not row:
-        row = AssetStatus(asset_id=asset_id)
-        db.session.add(row)
-    row.state = state
-    row.last_inspection_id = inspection_id
-    row.updated_by = who
-    row.updated_at = datetime.utcnow()
-
-
-def _ensure_items_for_inspection(ins: Inspection) -> List[InspectionItem]:
-    existing = InspectionItem.query.filter_by(inspection_id=ins.id).all()
-    if existing:
-        return existing
-
-    q = Asset.query
-    if ins.scope_type == "floors":
-        floors = [str(f) for f in (ins.floors or [])]
-        if floors:
-            q = q.filter(Asset.floor.in_(floors))
-        else:
-            return []
-    elif ins.scope_type == "area":
-        q = q.filter(Asset.area == ins.scope_value)
-    elif ins.scope_type == "type":
-        q = q.filter(Asset.type == ins.scope_value)
-
-    q = q.order_by(Asset.name.asc())
-    assets = q.all()
-
-    rows: List[InspectionItem] = []
     now = datetime.utcnow()
-    for a in assets:
-        label_text = a.name or f"Asset {a.id}"
-        rows.append(
-            InspectionItem(
-                inspection_id=ins.id,
-                asset_id=a.id,
-                name=label_text,
-                label=label_text,
-                floor=a.floor,
-                area=a.area,
-                type=a.type,
-                status="open",
-                notes="",
-                photos=[],
-                updated_by=ins.started_by_name or "system",
-                created_at=now,
-                updated_at=now,
-            )
+    rows = [
+        {
+            "asset_id": aid, "state": st, "last_inspection_id": inspection_id,
+            "updated_by": who, "updated_at": now,
+        }
+        for aid, st in sorted(latest.items())  # orden fijo de bloqueo entre transacciones
+    ]
+    dialect = db.engine.dialect.name
+    upsert = dialect in ("postgresql", "sqlite")
+    insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+
+    # Assets sin fila: se crean primero (DO NOTHING). Una inspección concurrente
+    # espera al índice único y después encuentra la fila ya commiteada.
+    created = set()
+    if upsert:
+        created = set(db.session.execute(
+            insert_fn(AssetStatus).values(rows)
+            .on_conflict_do_nothing(index_elements=[AssetStatus.asset_id])
+            .returning(AssetStatus.asset_id)
+        ).scalars())
+    rest = [r for r in rows if r["asset_id"] not in created]
+
+    # Estado anterior bloqueado hasta el commit: dos inspecciones que mueven el
+    # mismo asset no registran la misma transición dos veces
+    prev = dict(
+        db.session.query(AssetStatus.asset_id, AssetStatus.state)
+        .filter(AssetStatus.asset_id.in_([r["asset_id"] for r in rest]))
+        .order_by(AssetStatus.asset_id)
+        .with_for_update()
+        .all()
+    ) if rest else {}
+
+    # Historial: solo transiciones reales, en un INSERT multi-fila
+    history = [
+        {
+            "asset_id": aid, "prev_state": prev.get(aid), "state": st,
+            "inspection_id": inspection_id, "changed_by": who, "changed_at": now,
+        }
+        for aid, st in latest.items()
+        if prev.get(aid) != st
+    ]
+    if history:
+        db.session.execute(insert(AssetStateHistory), history)
+    if not rest:
+        return
+    if upsert:
+        ins = insert_fn(AssetStatus).values(rest)
+        stmt = ins.on_conflict_do_update(
+            index_elements=[AssetStatus.asset_id],
+            set_={
+                "state": ins.excluded.state,
+                "last_inspection_id": ins.excluded.last_inspection_id,
+                "updated_by": ins.excluded.updated_by,
+                "updated_at": ins.excluded.updated_at,
+            },
         )
-    if rows:
-        db.session.bulk_save_objects(rows)
-        db.session.commit()
-        return InspectionItem.query.filter_by(inspection_id=ins.id).all()
-    return []
+        db.session.execute(stmt)
+        return
+    for r in rest:
+        row = db.session.get(AssetStatus, r["asset_id"]) or AssetStatus(asset_id=r["asset_id"])
+        for k, v in r.items():
+            setattr(row, k, v)
+        db.session.add(row)
+
+
+def _update_asset_status(asset_id: int, state: str, inspection_id: int | None, who: str):
+    _update_asset_statuses([(asset_id, state)], inspection_id, who)
+
 
 # ------------------ scopes for hub ------------------
+SCOPE_DIMENSIONS = {"floor": "floors", "area": "areas", "type": "types"}
+
+
+def _floor_sort_key(value: str):
+    # Pisos numéricos de arriba hacia abajo; los nombrados (Roof, Basement...) al final
+    v = str(value)
+    return (0, -int(v), "") if v.lstrip("-").isdigit() else (1, 0, v.lower())
+
+
+def _compute_scopes() -> Dict[str, dict]:
+    """
+    Pisos, áreas y tipos presentes en `asset` con su nº de assets:
+    SELECT 'floor', floor, count(*) ... GROUP BY floor UNION ALL ... (area) ... (type).
+    Cada rama usa su índice (ix_asset_floor, ix_asset_area_floor, ix_asset_type).
+    """
+    parts = [
+        db.session.query(literal(dim), getattr(Asset, dim), func.count(Asset.id))
+        .filter(getattr(Asset, dim).isnot(None), getattr(Asset, dim) != "")
+        .group_by(getattr(Asset, dim))
+        for dim in SCOPE_DIMENSIONS
+    ]
+    counts: Dict[str, Dict[str, int]] = {key: {} for key in SCOPE_DIMENSIONS.values()}
+    for dim, value, n in parts[0].union_all(*parts[1:]).all():
+        counts[SCOPE_DIMENSIONS[dim]][str(value)] = int(n)
+    return {
+        "floors": sorted(counts["floors"], key=_floor_sort_key),
+        "areas": sorted(counts["areas"], key=str.lower),
+        "types": sorted(counts["types"], key=str.lower),
+        "counts": counts,
+    }
+
+
 @bp.get("/inspections/scopes")
 def scopes():
-    floors_default = ["Roof", "Penthouse", "8", "7", "6", "5", "4", "3", "2", "1", "Basement"]
-    areas_default = ["Lobby", "Bar", "Kitchen", "Back of House", "MDF", "Gym"]
-    types_default = ["FCU", "Pump", "Detector", "Extinguisher", "Panel", "Door"]
+    # Derivado del registro de assets; se recalcula solo si asset cambia
+    derived = cached("inspection_scopes", (Asset.__tablename__,), _compute_scopes)
 
     try:
         in_progress = (
@@ -138,47 +208,73 @@ def scopes():
         completed = []
 
     return jsonify({
-        "floors": floors_default,
-        "areas": areas_default,
-        "types": types_default,
+        "floors": derived["floors"],
+        "areas": derived["areas"],
+        "types": derived["types"],
+        "counts": derived["counts"],
         "inProgress": [x.to_dict() for x in in_progress],
         "completed": [x.to_dict() for x in completed],
     }), 200
 
 
 # -------- summary de “failed/ooo” por floor/area/type --------
+BAD_STATES = ("failed", "ooo")
+SUMMARY_DIMENSIONS = {"floor": "byFloor", "area": "byArea", "type": "byType"}
+
+
+def _status_summary_rows():
+    """[(dimensión, valor, n)] en una sola consulta."""
+    base = (
+        db.session.query()
+        .select_from(AssetStatus)
+        .join(Asset, Asset.id == AssetStatus.asset_id)
+        .filter(AssetStatus.state.in_(BAD_STATES))
+    )
+    if db.engine.dialect.name == "postgresql":
+        rows = base.with_entities(
+            Asset.floor, Asset.area, Asset.type,
+            func.grouping(Asset.floor), func.grouping(Asset.area),
+            func.count(AssetStatus.asset_id),
+        ).group_by(
+            func.grouping_sets(tuple_(Asset.floor), tuple_(Asset.area), tuple_(Asset.type))
+        ).all()
+        out = []
+        for floor, area, type_, g_floor, g_area, n in rows:
+            if g_floor == 0:
+                out.append(("floor", floor, n))
+            elif g_area == 0:
+                out.append(("area", area, n))
+            else:
+                out.append(("type", type_, n))
+        return out
+
+    # SQLite y otros: UNION ALL de los tres GROUP BY (sigue siendo un solo statement)
+    parts = [
+        base.with_entities(literal(dim), getattr(Asset, dim), func.count(AssetStatus.asset_id))
+        .group_by(getattr(Asset, dim))
+        for dim in SUMMARY_DIMENSIONS
+    ]
+    return parts[0].union_all(*parts[1:]).all()
+
+
+def _compute_status_summary() -> Dict[str, Dict[str, int]]:
+    out: Dict[str, Dict[str, int]] = {key: {} for key in SUMMARY_DIMENSIONS.values()}
+    for dim, value, n in _status_summary_rows():
+        if value is None:
+            continue
+        out[SUMMARY_DIMENSIONS[dim]][str(value)] = int(n)
+    return out
+
+
 @bp.get("/assets/status/summary")
 def asset_status_summary():
-    bad_states = ["failed", "ooo"]
-
-    af = db.session.query(Asset.floor, func.count(AssetStatus.asset_id))\
-        .join(Asset, Asset.id == AssetStatus.asset_id)\
-        .filter(AssetStatus.state.in_(bad_states))\
-        .group_by(Asset.floor).all()
-
-    aa = db.session.query(Asset.area, func.count(AssetStatus.asset_id))\
-        .join(Asset, Asset.id == AssetStatus.asset_id)\
-        .filter(AssetStatus.state.in_(bad_states))\
-        .group_by(Asset.area).all()
-
-    at = db.session.query(Asset.type, func.count(AssetStatus.asset_id))\
-        .join(Asset, Asset.id == AssetStatus.asset_id)\
-        .filter(AssetStatus.state.in_(bad_states))\
-        .group_by(Asset.type).all()
-
-    def to_map(rows):
-        m: Dict[str, int] = {}
-        for k, c in rows:
-            if k is None:
-                continue
-            m[str(k)] = int(c)
-        return m
-
-    return jsonify({
-        "byFloor": to_map(af),
-        "byArea": to_map(aa),
-        "byType": to_map(at),
-    }), 200
+    # Se recalcula solo cuando cambia asset_status (_update_asset_statuses) o asset
+    summary = cached(
+        "asset_status_summary",
+        (AssetStatus.__tablename__, Asset.__tablename__),
+        _compute_status_summary,
+    )
+    return jsonify(summary), 200
 
 
 # ------------------ CRUD inspection ------------------
@@ -214,6 +310,11 @@ def create_inspection():
         inspection_date=datetime.utcnow(),
     )
     db.session.add(ins)
+    db.session.flush()
+    # Ítems en la misma transacción: un único INSERT ... SELECT FROM asset
+    n = materialize_items(ins, actor)
+    ins.items_total = n
+    ins.items_open = n
     db.session.commit()
     return jsonify(ins.to_dict()), 201
 
@@ -244,10 +345,12 @@ def patch_inspection(inspection_id: int):
     if "progress" in data:
         try:
             p = int(data.get("progress"))
-            ins.progress = max(0, min(100, p))
-            updated = True
         except Exception:
             return jsonify({"error": "progress must be int 0..100"}), 400
+        # Con ítems, progress se deriva de los contadores; el valor del cliente se ignora
+        if not ins.items_total:
+            ins.progress = max(0, min(100, p))
+            updated = True
 
     if "status" in data:
         st = str(data.get("status") or "").lower().strip()
@@ -256,6 +359,8 @@ def patch_inspection(inspection_id: int):
         ins.status = st
         if st == "completed" and (ins.progress or 0) < 100:
             ins.progress = 100
+        elif st != "completed" and ins.items_total:
+            ins.progress = (ins.items_total - ins.items_open) * 100 // ins.items_total
         updated = True
 
     if "started_by_name" in data:
@@ -282,30 +387,120 @@ def complete_inspection(inspection_id: int):
 @bp.get("/inspections/<int:inspection_id>/items")
 def list_items(inspection_id: int):
     ins = Inspection.query.get_or_404(inspection_id)
-    items = _ensure_items_for_inspection(ins)
+    items = (
+        InspectionItem.query.filter_by(inspection_id=ins.id)
+        .order_by(InspectionItem.id.asc())
+        .all()
+    )
     return jsonify({"items": [it.to_dict() for it in items], "total": len(items)}), 200
 
 
+ITEM_STATUSES = {"open", "ok", "fail", "na", "ooo"}
+BATCH_MAX = 500
+
+
+@bp.patch("/inspections/<int:inspection_id>/items")
+def update_items_batch(inspection_id: int):
+    """
+    PATCH {"items": [{"item_id": 1, "status": "ok", "notes": "..."}]} (o la lista sola).
+    Un UPDATE por PK en lote, un upsert masivo de AssetStatus, progreso
+    recalculado una vez y un solo commit. Resultado por ítem.
+    """
+    ins = Inspection.query.get_or_404(inspection_id)
+    payload = request.get_json(silent=True)
+    entries = payload.get("items") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(entries) > BATCH_MAX:
+        return jsonify({"error": f"max {BATCH_MAX} items per request"}), 400
+
+    results: List[dict] = []
+    wanted: Dict[int, dict] = {}
+    for raw in entries:
+        if not isinstance(raw, dict):
+            results.append({"item_id": None, "ok": False, "error": "entry must be an object"})
+            continue
+        try:
+            item_id = int(raw.get("item_id"))
+        except (TypeError, ValueError):
+            results.append({"item_id": raw.get("item_id"), "ok": False, "error": "invalid item_id"})
+            continue
+        status = (raw.get("status") or "").lower()
+        if status and status not in ITEM_STATUSES:
+            results.append({"item_id": item_id, "ok": False, "error": "invalid status"})
+            continue
+        patch = wanted.setdefault(item_id, {})
+        if status:
+            patch["status"] = status
+        if "notes" in raw:
+            patch["notes"] = raw.get("notes") or ""
+
+    existing = {
+        r.id: (r.asset_id, r.status, r.version)
+        for r in db.session.query(
+            InspectionItem.id, InspectionItem.asset_id, InspectionItem.status, InspectionItem.version
+        ).filter(
+            InspectionItem.inspection_id == ins.id, InspectionItem.id.in_(list(wanted))
+        ).with_for_update()
+    }
+    who = _actor_name()
+    now = datetime.utcnow()
+    rows, asset_changes, transitions = [], [], []
+    for item_id, patch in wanted.items():
+        if item_id not in existing:
+            results.append({"item_id": item_id, "ok": False, "error": "item not found"})
+            continue
+        asset_id, old_status, version = existing[item_id]
+        stamps = {f"{f}_at": now for f in patch if f in SYNC_FIELDS}
+        rows.append({
+            "id": item_id, **patch, **stamps,
+            "updated_by": who, "updated_at": now, "version": (version or 0) + 1,
+        })
+        if "status" in patch:
+            transitions.append((old_status, patch["status"]))
+            if asset_id:
+                asset_changes.append((asset_id, _map_item_status_to_asset_state(patch["status"])))
+
+    if rows:
+        db.session.execute(update(InspectionItem).execution_options(versions_scope=ins.id), rows)
+        _update_asset_statuses(asset_changes, ins.id, who)
+        apply_counter_deltas(ins.id, status_deltas(transitions))
+        db.session.commit()
+
+        fresh = {
+            it.id: it for it in InspectionItem.query.filter(InspectionItem.id.in_([r["id"] for r in rows]))
+        }
+        results.extend({"item_id": r["id"], "ok": True, "item": fresh[r["id"]].to_dict()} for r in rows)
+
+    return jsonify({
+        "ok": all(r["ok"] for r in results),
+        "updated": len(rows),
+        "results": results,
+        "inspection": ins.to_dict(),
+    }), 200
+
+
 @bp.patch("/inspections/<int:inspection_id>/items/<int:item_id>")
 def update_item_status(inspection_id: int, item_id: int):
     ins = Inspection.query.get_or_404(inspection_id)
-    item = InspectionItem.query.filter_by(id=item_id, inspection_id=ins.id).first()
-    if not item:
-        return jsonify({"error": "item not found"}), 404
-
     payload = request.get_json(silent=True) or {}
     status = (payload.get("status") or "").lower()
-    if status and status not in {"open", "ok", "fail", "na", "ooo"}:
+    if status and status not in ITEM_STATUSES:
         return jsonify({"error": "invalid status"}), 400
+
+    # Bloqueo hasta el commit: el delta de contadores sale del estado anterior
+    item = InspectionItem.query.filter_by(id=item_id, inspection_id=ins.id).with_for_update().first()
+    if not item:
+        return jsonify({"error": "item not found"}), 404
     if status:
+        apply_counter_deltas(ins.id, status_deltas([(item.status, status)]))
         item.status = status
 
     if "notes" in payload:
         item.notes = payload.get("notes") or ""
 
     who = _actor_name()
-    item.updated_by = who
-    item.updated_at = datetime.utcnow()
+    touch_item(item, [f for f in ("status", "notes") if f in payload], who)
 
     if item.asset_id:
         mapped = _map_item_status_to_asset_state(item.status)
@@ -325,12 +520,155 @@ def add_item_comment(inspection_id: int, item_id: int):
     body = request.get_json(silent=True) or {}
     note = (body.get("note") or body.get("notes") or "").strip()
     item.notes = note
-    item.updated_by = _actor_name()
-    item.updated_at = datetime.utcnow()
+    touch_item(item, ["notes"], _actor_name())
     db.session.commit()
     return jsonify({"ok": True, "item": item.to_dict()}), 200
 
 
+# ------------------ Sync offline ------------------
+SYNC_MAX = 1000
+
+
+def _utc_naive(dt: datetime | None) -> datetime | None:
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _parse_client_ts(raw, now: datetime) -> datetime:
+    """Hora del dispositivo (ISO); nunca en el futuro respecto del servidor."""
+    try:
+        dt = _utc_naive(datetime.fromisoformat(str(raw).replace("Z", "+00:00")))
+    except (TypeError, ValueError):
+        return now
+    return min(dt, now)
+
+
+def _sync_deltas(ins: Inspection, cursor: int) -> tuple:
+    """(ítems cambiados desde `cursor`, reset). reset=True -> se envía el set completo."""
+    q = InspectionItem.query.filter(InspectionItem.inspection_id == ins.id)
+    ids = changes_since(InspectionItem.__tablename__, cursor, scope=ins.id) if cursor > 0 else None
+    if ids is None:
+        return q.order_by(InspectionItem.id).all(), True
+    if not ids:
+        return [], False
+    return q.filter(InspectionItem.id.in_(list(ids))).order_by(InspectionItem.id).all(), False
+
+
+@bp.post("/inspections/<int:inspection_id>/sync")
+def sync_items(inspection_id: int):
+    """
+    Sync de un dispositivo que trabajó sin señal. Body:
+      {"cursor": 120,
+       "changes": [{"item_id": 5, "base_version": 3, "changed_at": "<ISO>",
+                    "status": "ok", "notes": "...", "photos": ["/uploads/..."],
+                    "fields_at": {"status": "<ISO>"}}]}
+    - Todo se aplica en una transacción.
+    - Si base_version coincide con la del servidor el cambio se aplica entero;
+      si no, campo a campo gana la hora más reciente (status_at / notes_at).
+      Las fotos se unen (nunca se pierden).
+    - Devuelve el nuevo cursor (propio de la inspección) y los ítems cambiados desde el cursor enviado
+      (reset=true -> lista completa de la inspección).
+    """
+    ins = Inspection.query.get_or_404(inspection_id)
+    body = request.get_json(silent=True) or {}
+    changes = body.get("changes") or []
+    if not isinstance(changes, list):
+        return jsonify({"error": "changes must be a list"}), 400
+    if len(changes) > SYNC_MAX:
+        return jsonify({"error": f"max {SYNC_MAX} changes per sync"}), 400
+    try:
+        cursor = int(body.get("cursor") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "invalid cursor"}), 400
+
+    who = _actor_name()
+    now = datetime.utcnow()
+    wanted_ids = set()
+    for ch in changes:
+        try:
+            wanted_ids.add(int((ch or {}).get("item_id")))
+        except (TypeError, ValueError, AttributeError):
+            pass
+    items = {
+        it.id: it
+        for it in InspectionItem.query.filter(
+            InspectionItem.inspection_id == ins.id, InspectionItem.id.in_(list(wanted_ids))
+        ).with_for_update()
+    } if wanted_ids else {}
+
+    results: List[dict] = []
+    transitions, asset_changes = [], []
+    for ch in changes:
+        if not isinstance(ch, dict):
+            results.append({"item_id": None, "error": "change must be an object"})
+            continue
+        try:
+            item = items.get(int(ch.get("item_id")))
+        except (TypeError, ValueError):
+            item = None
+        if item is None:
+            results.append({"item_id": ch.get("item_id"), "error": "item not found"})
+            continue
+
+        status = (ch.get("status") or "").lower() if "status" in ch else None
+        if status is not None and status not in ITEM_STATUSES:
+            results.append({"item_id": item.id, "error": "invalid status"})
+            continue
+
+        changed_at = _parse_client_ts(ch.get("changed_at"), now)
+        fields_at = ch.get("fields_at") if isinstance(ch.get("fields_at"), dict) else {}
+        fresh = ch.get("base_version") is not None and str(ch.get("base_version")) == str(item.version)
+
+        applied, rejected = [], []
+        for field, value in (("status", status), ("notes", ch.get("notes") if "notes" in ch else None)):
+            if value is None:
+                continue
+            client_at = _parse_client_ts(fields_at[field], now) if field in fields_at else changed_at
+            server_at = _utc_naive(getattr(item, f"{field}_at") or item.updated_at)
+            if fresh or server_at is None or client_at > server_at:
+                if getattr(item, field) != value:
+                    if field == "status":
+                        transitions.append((item.status, value))
+                        if item.asset_id:
+                            asset_changes.append((item.asset_id, _map_item_status_to_asset_state(value)))
+                    setattr(item, field, value)
+                    applied.append(field)
+            else:
+                rejected.append(field)
+
+        photos = [p for p in (ch.get("photos") or []) if isinstance(p, str) and p]
+        merged = list(item.photos or [])
+        new_photos = [p for p in photos if p not in merged]
+        if new_photos:
+            item.photos = merged + new_photos
+            applied.append("photos")
+
+        if applied:
+            touch_item(item, applied, who, now)
+            # <campo>_at = hora del dispositivo, para comparar con otros dispositivos
+            for field in applied:
+                if field in SYNC_FIELDS:
+                    setattr(item, f"{field}_at", _parse_client_ts(fields_at.get(field), now) if field in fields_at else changed_at)
+        results.append({"item_id": item.id, "applied": applied, "rejected": rejected, "version": item.version})
+
+    if transitions or asset_changes:
+        _update_asset_statuses(asset_changes, ins.id, who)
+        apply_counter_deltas(ins.id, status_deltas(transitions))
+    db.session.commit()
+
+    # Cursor leído antes de los deltas: lo que cambie entre medio se reenvía (idempotente)
+    new_cursor = scope_version(InspectionItem.__tablename__, ins.id)
+    deltas, reset = _sync_deltas(ins, cursor)
+    return jsonify({
+        "cursor": new_cursor,
+        "reset": reset,
+        "results": results,
+        "items": [it.to_dict() for it in deltas],
+        "inspection": ins.to_dict(),
+    }), 200
+
+
 # ------------------ Add photo (URL o archivo) ------------------
 ALLOWED_IMG_EXTS = {"jpg", "jpeg", "png", "webp", "gif", "bmp"}
 
@@ -382,10 +720,7 @@ def add_item_photo(inspection_id: int, item_id: int):
     if not url:
         return jsonify({"error": "send JSON {url: ...} or multipart 'file'"}), 400
 
-    photos = item.photos or []
-    photos.append(url)
-    item.photos = photos
-    item.updated_by = _actor_name()
-    item.updated_at = datetime.utcnow()
+    item.photos = list(item.photos or []) + [url]  # lista nueva: JSON no detecta mutaciones
+    touch_item(item, ["photos"], _actor_name())
     db.session.commit()
     return jsonify({"ok": True, "item": item.to_dict()}), 200
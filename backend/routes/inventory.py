@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import codecs
+import csv
 from datetime import datetime
 from typing import Optional
 
 from flask import Blueprint, request, jsonify
 from sqlalchemy.exc import IntegrityError, DataError, StatementError
-from sqlalchemy import or_
+from sqlalchemy import or_, func, insert, select, update
+from sqlalchemy.orm import joinedload
 
 from flask_jwt_extended import jwt_required  # <--- IMPORTADO
 
@@ -13,6 +16,10 @@ from backend.extensions import db
 from backend.models.inventory import InventoryItem
 from backend.models.inventory_log import InventoryLog
 from backend.models.user import User  # <-- para filtrar por email/nombre
+from backend.models.vendor import Vendor
+from backend.utils.pagination import CursorError, estimated_count, keyset_page, limit_arg
+from backend.utils.inventory_usage import forecast as usage_forecast_rows, last_rollup_day, rollup_usage
+from backend.utils.tabular import chunked, export_response, iter_upload_rows
 
 # JWT (si estás logueado, tomamos el id; si no, queda None)
 try:
@@ -75,8 +82,9 @@ def _payload(data: dict) -> dict:
     return out
 
 
-def _serialize(i: InventoryItem) -> dict:
-    return {
+def _serialize(i: InventoryItem, fields: set[str] | None = None) -> dict:
+    """`fields` = respuesta parcial; i.supplier solo se lee si se pidió supplier_name."""
+    data = {
         "id": i.id,
         "item_id": i.item_id,
         "name": i.name,
@@ -85,7 +93,7 @@ def _serialize(i: InventoryItem) -> dict:
         "minimum": i.minimum,
         "location": i.location,
         "supplier_id": i.supplier_id,
-        "supplier_name": getattr(i.supplier, "name", None),  # ✅ nombre real del vendor
+        "supplier_name": None,
         "part_no": i.part_no,
         "unit_cost": i.unit_cost,
         "description": i.description,
@@ -93,6 +101,9 @@ def _serialize(i: InventoryItem) -> dict:
         "product_link": i.product_link,
         "image_url": i.image,
     }
+    if fields is None or "supplier_name" in fields:
+        data["supplier_name"] = getattr(i.supplier, "name", None)  # ✅ nombre real del vendor
+    return data if fields is None else {k: v for k, v in data.items() if k in fields}
 
 
 def _current_user_id():
@@ -115,26 +126,125 @@ def _current_user_id():
         return None
 
 
+def _log_row(item_db_id, item_code, user_id, *, action: str, delta=None, prev=None, new=None, note=None) -> dict:
+    return {
+        "item_db_id": item_db_id,
+        "item_code": item_code,
+        "user_id": user_id,
+        "action": action,
+        "delta": delta,
+        "prev_stock": prev,
+        "new_stock": new,
+        "note": note,
+        "created_at": datetime.utcnow(),
+    }
+
+
 def _log(item: InventoryItem, *, action: str, delta=None, prev=None, new=None, note=None):
-    log = InventoryLog(
-        item_db_id=item.id,
-        item_code=item.item_id,
-        user_id=_current_user_id(),
-        action=action,
-        delta=delta,
-        prev_stock=prev,
-        new_stock=new,
-        note=note,
-        created_at=datetime.utcnow(),
+    db.session.add(InventoryLog(**_log_row(
+        item.id, item.item_id, _current_user_id(),
+        action=action, delta=delta, prev=prev, new=new, note=note,
+    )))
+
+
+def _signed_delta(raw_delta, mode) -> int:
+    """'in' = +abs(delta), 'out' = -abs(delta); sin mode se respeta el signo."""
+    delta = int(raw_delta or 0)
+    mode = (mode or "").lower().strip()
+    if mode in ("in", "out"):
+        delta = abs(delta) if mode == "in" else -abs(delta)
+    return delta
+
+
+def _apply_delta(item_db_id: int, delta: int):
+    """
+    UPDATE inventory SET stock = COALESCE(stock, 0) + :delta WHERE id = :id RETURNING ...
+    El incremento lo hace la BD (fila bloqueada durante la transacción), así que
+    dos ajustes concurrentes no se pisan. Devuelve (new_stock, item_code) o None.
+    """
+    stmt = (
+        update(InventoryItem)
+        .where(InventoryItem.id == item_db_id)
+        .values(stock=func.coalesce(InventoryItem.stock, 0) + delta)
+        .returning(InventoryItem.stock, InventoryItem.item_id)
+        .execution_options(synchronize_session=False)
     )
-    db.session.add(log)
+    row = db.session.execute(stmt).first()
+    return (row[0], row[1]) if row else None
 
 
 # ---------- routes ----------
+SERIALIZED_FIELDS = {
+    "id", "item_id", "name", "category", "stock", "minimum", "location",
+    "supplier_id", "supplier_name", "part_no", "unit_cost", "description",
+    "image", "product_link", "image_url",
+}
+
+
+def _fields_arg() -> set[str] | None:
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip() in SERIALIZED_FIELDS}
+    fields.add("id")
+    return fields
+
+
 @bp.get("/")
 def list_items():
-    items = InventoryItem.query.order_by(InventoryItem.name.asc()).all()
-    return jsonify({"items": [_serialize(i) for i in items]})
+    """
+    Query params (todos opcionales):
+      - category, location, supplier_id
+      - low=1        solo stock <= minimum (usa ix_inventory_low_stock)
+      - q            texto en item_id / part_no / name
+      - fields       id,name,stock,...  (respuesta parcial)
+      - limit/cursor paginación keyset por (name, id); sin ellos devuelve todo
+    """
+    fields = _fields_arg()
+    q = InventoryItem.query
+    if fields is None or "supplier_name" in fields:
+        # Un solo JOIN en lugar de un SELECT de Vendor por ítem
+        q = q.options(joinedload(InventoryItem.supplier))
+
+    category = request.args.get("category")
+    location = request.args.get("location")
+    supplier_id = request.args.get("supplier_id", type=int)
+    text_q = (request.args.get("q") or "").strip()
+    if category:
+        q = q.filter(InventoryItem.category == category)
+    if location:
+        q = q.filter(InventoryItem.location == location)
+    if supplier_id is not None:
+        q = q.filter(InventoryItem.supplier_id == supplier_id)
+    if (request.args.get("low") or "").lower() in ("1", "true", "yes"):
+        q = q.filter(InventoryItem.stock <= InventoryItem.minimum)
+    if text_q:
+        like = f"%{text_q}%"
+        q = q.filter(or_(
+            InventoryItem.item_id.ilike(like),
+            InventoryItem.part_no.ilike(like),
+            InventoryItem.name.ilike(like),
+        ))
+
+    if "limit" not in request.args and "cursor" not in request.args:
+        items = q.order_by(InventoryItem.name.asc()).all()
+        return jsonify({"items": [_serialize(i, fields) for i in items]})
+
+    try:
+        items, next_cursor = keyset_page(
+            q,
+            [func.coalesce(InventoryItem.name, ""), InventoryItem.id],
+            cursor=request.args.get("cursor"),
+            limit=limit_arg(default=100, maximum=500),
+            descending=False,
+            key=lambda i: [i.name or "", i.id],
+        )
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "items": [_serialize(i, fields) for i in items],
+        "next_cursor": next_cursor,
+    })
 
 
 # ✅ NUEVO: items con stock bajo
@@ -147,6 +257,7 @@ def list_low_stock_items():
     try:
         items = (
             InventoryItem.query
+            .options(joinedload(InventoryItem.supplier))
             .filter(InventoryItem.stock <= InventoryItem.minimum)
             .order_by(InventoryItem.name.asc())
             .all()
@@ -156,6 +267,213 @@ def list_low_stock_items():
         return jsonify({"error": "Server error", "detail": str(e)}), 500
 
 
+@bp.get("/forecast")
+@jwt_required(optional=True)
+def usage_forecast():
+    """
+    Forecast de reorden a partir de inventory_daily_usage (no lee InventoryLog).
+    Query: window=90 (días), lead_time=7, cover=30, z=1.65, only=reorder, limit
+    """
+    window = min(max(request.args.get("window", 90, type=int), 7), 730)
+    lead_time = min(max(request.args.get("lead_time", 7, type=int), 0), 180)
+    cover = min(max(request.args.get("cover", 30, type=int), 0), 365)
+    z = min(max(request.args.get("z", 1.65, type=float), 0.0), 4.0)
+    try:
+        rows = usage_forecast_rows(window=window, lead_time=lead_time, cover=cover, z=z)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    if (request.args.get("only") or "").lower() == "reorder":
+        rows = [r for r in rows if r["reorder_now"]]
+    limit = request.args.get("limit", type=int)
+    if limit:
+        rows = rows[:max(limit, 1)]
+    last_day = last_rollup_day()
+    return jsonify({
+        "items": rows,
+        "window": window,
+        "lead_time": lead_time,
+        "cover": cover,
+        "rollup_last_day": last_day.isoformat() if last_day else None,
+    })
+
+
+@bp.post("/usage/rollup")
+@jwt_required()
+def run_usage_rollup():
+    """Ejecuta el rollup diario (también disponible como scripts/rollup_inventory_usage.py)."""
+    full = (request.args.get("full") or "").lower() in ("1", "true", "yes")
+    try:
+        return jsonify(rollup_usage(full=full))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Server error", "detail": str(e)}), 500
+
+
+EXPORT_COLUMNS = [
+    "id", "item_id", "name", "category", "stock", "minimum", "location",
+    "supplier_id", "supplier_name", "part_no", "unit_cost", "description",
+    "image", "product_link",
+]
+LOG_EXPORT_COLUMNS = [
+    "id", "created_at", "item_db_id", "item_code", "action", "delta",
+    "prev_stock", "new_stock", "user_id", "user_name", "user_email", "note",
+]
+IMPORT_BATCH = 500
+
+
+@bp.get("/export")
+@jwt_required(optional=True)
+def export_items():
+    """?format=csv|xlsx — filas en streaming desde un cursor de servidor (yield_per)."""
+    cols = [getattr(InventoryItem, c) for c in EXPORT_COLUMNS if c != "supplier_name"]
+    cols.insert(EXPORT_COLUMNS.index("supplier_name"), Vendor.name)
+    rows = (
+        db.session.query(*cols)
+        .outerjoin(Vendor, Vendor.id == InventoryItem.supplier_id)
+        .order_by(InventoryItem.id.asc())
+        .execution_options(yield_per=1000)
+    )
+    return export_response(EXPORT_COLUMNS, rows, fmt=request.args.get("format"), filename="inventory")
+
+
+@bp.get("/logs/export")
+@jwt_required(optional=True)
+def export_logs():
+    """Mismos filtros que /logs; ?format=csv|xlsx, en streaming."""
+    q = _logs_query(request.args)
+    sort = (request.args.get("sort") or "desc").lower()
+    rows = (
+        q.outerjoin(User, User.id == InventoryLog.user_id)
+        .with_entities(
+            InventoryLog.id, InventoryLog.created_at, InventoryLog.item_db_id, InventoryLog.item_code,
+            InventoryLog.action, InventoryLog.delta, InventoryLog.prev_stock, InventoryLog.new_stock,
+            InventoryLog.user_id, User.name, User.email, InventoryLog.note,
+        )
+        .order_by(InventoryLog.created_at.asc() if sort == "asc" else InventoryLog.created_at.desc(),
+                  InventoryLog.id.asc() if sort == "asc" else InventoryLog.id.desc())
+        .execution_options(yield_per=1000)
+    )
+    return export_response(LOG_EXPORT_COLUMNS, rows, fmt=request.args.get("format"), filename="inventory_logs")
+
+
+def _import_row(raw: dict, vendors: dict[str, int]) -> tuple[dict | None, str | None]:
+    """Valida una fila con _payload; devuelve (valores, error). Celdas vacías = sin cambio."""
+    sup_name = raw.get("supplier_name")
+    raw = {k: v for k, v in raw.items() if k not in ("id", "supplier_name") and v not in (None, "")}
+    vals = _payload(raw)
+    if not vals.get("item_id"):
+        return None, "item_id is required"
+    for k in NUM_FIELDS:
+        if k in vals and vals[k] is None and raw.get(k) not in (None, ""):
+            return None, f"{k} must be a number"
+    for k in ("stock", "minimum", "supplier_id"):
+        if isinstance(vals.get(k), float):
+            return None, f"{k} must be an integer"
+    for k, v in list(vals.items()):
+        if k not in NUM_FIELDS and v is not None and not isinstance(v, str):
+            vals[k] = str(v)
+    if vals.get("supplier_id") is None and sup_name not in (None, ""):
+        sid = vendors.get(str(sup_name).strip().lower())
+        if sid is None:
+            return None, f"unknown supplier '{sup_name}'"
+        vals["supplier_id"] = sid
+    return vals, None
+
+
+@bp.post("/import")
+@jwt_required()
+def import_items():
+    """
+    Upload multipart 'file' (.csv o .xlsx). Upsert por item_id en lotes:
+    un SELECT por lote para resolver existentes, UPDATE/INSERT en bloque y
+    logs en bloque. ?dry_run=1 valida sin guardar; ?encoding=cp1252 para CSV
+    exportados desde Excel antiguo.
+    Respuesta: {"created": n, "updated": n, "errors": [{"row": 2, "error": "..."}]}
+    """
+    f = request.files.get("file")
+    if not f:
+        return jsonify({"error": "send multipart 'file' (.csv or .xlsx)"}), 400
+    encoding = request.args.get("encoding") or "utf-8-sig"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return jsonify({"error": "invalid encoding", "detail": f"unknown encoding: {encoding}"}), 400
+    dry_run = (request.args.get("dry_run") or "").lower() in ("1", "true", "yes")
+    user_id = _current_user_id()
+    vendors = {(n or "").strip().lower(): vid for vid, n in db.session.query(Vendor.id, Vendor.name)}
+
+    created = updated = 0
+    errors: list[dict] = []
+    try:
+        rows = iter_upload_rows(f, encoding=encoding)  # (fila real de la hoja, valores)
+        for batch in chunked(rows, IMPORT_BATCH):
+            by_code: dict[str, tuple[int, dict]] = {}
+            for line, raw in batch:
+                vals, err = _import_row(raw, vendors)
+                if err:
+                    errors.append({"row": line, "error": err})
+                    continue
+                prev = by_code.get(vals["item_id"])
+                by_code[vals["item_id"]] = (line, (prev[1] | vals) if prev else vals)
+            if not by_code:
+                continue
+
+            existing: dict[str, list[tuple[int, int | None]]] = {}
+            for rid, code, stock in db.session.query(
+                InventoryItem.id, InventoryItem.item_id, InventoryItem.stock
+            ).filter(InventoryItem.item_id.in_(list(by_code))):
+                existing.setdefault(code, []).append((rid, stock))
+
+            to_update, to_insert, logs = [], [], []
+            for code, (line, vals) in by_code.items():
+                matches = existing.get(code, [])
+                if len(matches) > 1:
+                    errors.append({"row": line, "error": f"item_id '{code}' is duplicated in inventory"})
+                    continue
+                if matches:
+                    rid, prev_stock = matches[0]
+                    to_update.append({"id": rid, **vals})
+                    if "stock" in vals and vals["stock"] != prev_stock:
+                        logs.append(_log_row(rid, code, user_id, action="set",
+                                             delta=(vals["stock"] or 0) - (prev_stock or 0),
+                                             prev=prev_stock, new=vals["stock"], note="import"))
+                    else:
+                        logs.append(_log_row(rid, code, user_id, action="update", note="import"))
+                else:
+                    to_insert.append(vals)
+
+            if to_update:
+                db.session.execute(update(InventoryItem), to_update)
+                updated += len(to_update)
+            if to_insert:
+                new_rows = db.session.execute(
+                    insert(InventoryItem).returning(InventoryItem.id, InventoryItem.item_id, InventoryItem.stock),
+                    to_insert,
+                ).all()
+                logs.extend(_log_row(rid, code, user_id, action="create", new=stock, note="import")
+                            for rid, code, stock in new_rows)
+                created += len(to_insert)
+            if logs:
+                db.session.execute(insert(InventoryLog), logs)
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"error": f"file is not valid {encoding}; export it as UTF-8 CSV or pass ?encoding=cp1252"}), 400
+    except (ValueError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify({"error": "Invalid file", "detail": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Server error", "detail": str(e)}), 500
+
+    errors.sort(key=lambda e: e["row"])
+    return jsonify({"created": created, "updated": updated, "errors": errors, "dry_run": dry_run})
+
+
 @bp.get("/<int:id>")
 def get_item(id: int):
     i = InventoryItem.query.get_or_404(id)
@@ -272,51 +590,157 @@ def adjust_item(id: int):
     - Si envías 'mode', se ignora el signo de delta: 'in' = +abs(delta), 'out' = -abs(delta)
     """
     data = request.get_json(force=True, silent=True) or {}
-    rec = InventoryItem.query.get_or_404(id)
+    try:
+        delta = _signed_delta(data.get("delta"), data.get("mode"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "delta must be an integer"}), 400
 
-    delta = int(data.get("delta") or 0)
-    mode = (data.get("mode") or "").lower().strip()
-    if mode in ("in", "out"):
-        delta = abs(delta) if mode == "in" else -abs(delta)
+    try:
+        applied = _apply_delta(id, delta)
+        if applied is None:
+            db.session.rollback()
+            return jsonify({"error": "Not found"}), 404
+        new_stock, item_code = applied
+        db.session.execute(insert(InventoryLog), [_log_row(
+            id, item_code, _current_user_id(),
+            action=("in" if delta >= 0 else "out"), delta=delta,
+            prev=new_stock - delta, new=new_stock, note=data.get("note"),
+        )])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Server error", "detail": str(e)}), 500
+
+    return jsonify(_serialize(db.session.get(InventoryItem, id)))
 
-    prev_stock = rec.stock or 0
-    new_stock = prev_stock + delta
-    rec.stock = new_stock
 
+@bp.post("/adjust/bulk")
+@jwt_required()
+def adjust_bulk():
+    """
+    Sesión de escaneo: aplica muchos ajustes en UNA transacción.
+    Body: {
+      "lines": [{"id": 12, "delta": 2, "mode": "out"}, {"item_id": "FLT-2020", "delta": 1}, ...],
+      "note": "opcional (por defecto para cada línea)",
+      "strict": false   # true = si alguna línea es inválida no se aplica nada
+    }
+    Respuesta: {"results": [{"line": 0, "ok": true, "id": .., "prev_stock": .., "new_stock": ..}, ...]}
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    lines = data.get("lines")
+    if not isinstance(lines, list) or not lines:
+        return jsonify({"error": "lines must be a non-empty list"}), 400
+    if len(lines) > 2000:
+        return jsonify({"error": "too many lines (max 2000)"}), 400
+    default_note = data.get("note")
+
+    # Resuelve SKUs -> id en una sola consulta
+    codes = {
+        str(ln.get("item_id")).strip()
+        for ln in lines
+        if isinstance(ln, dict) and ln.get("id") in (None, "") and ln.get("item_id") not in (None, "")
+    }
+    by_code: dict[str, list[int]] = {}
+    if codes:
+        for rid, code in db.session.query(InventoryItem.id, InventoryItem.item_id).filter(InventoryItem.item_id.in_(codes)):
+            by_code.setdefault(code, []).append(rid)
+
+    results: list[dict] = []
+    valid: list[tuple[int, int, int, Optional[str]]] = []  # (line, id, delta, note)
+    for n, ln in enumerate(lines):
+        if not isinstance(ln, dict):
+            results.append({"line": n, "ok": False, "error": "line must be an object"})
+            continue
+        try:
+            delta = _signed_delta(ln.get("delta"), ln.get("mode"))
+        except (TypeError, ValueError):
+            results.append({"line": n, "ok": False, "error": "delta must be an integer"})
+            continue
+        if ln.get("id") not in (None, ""):
+            try:
+                rid = int(ln.get("id"))
+            except (TypeError, ValueError):
+                results.append({"line": n, "ok": False, "error": "invalid id"})
+                continue
+        else:
+            matches = by_code.get(str(ln.get("item_id") or "").strip(), [])
+            if len(matches) != 1:
+                results.append({"line": n, "ok": False, "error": "unknown item_id" if not matches else "ambiguous item_id"})
+                continue
+            rid = matches[0]
+        valid.append((n, rid, delta, ln.get("note") or default_note))
+
+    if data.get("strict") and results:
+        return jsonify({"error": "Invalid lines", "results": results}), 400
+
+    # Un UPDATE por ítem (delta agregado), en orden de id para no provocar deadlocks
+    totals: dict[int, int] = {}
+    for _, rid, delta, _ in valid:
+        totals[rid] = totals.get(rid, 0) + delta
+
+    user_id = _current_user_id()
     try:
-        _log(rec, action=("in" if delta >= 0 else "out"), delta=delta, prev=prev_stock, new=new_stock, note=data.get("note"))
+        applied: dict[int, tuple[int, Optional[str]]] = {}
+        for rid in sorted(totals):
+            out = _apply_delta(rid, totals[rid])
+            if out is not None:
+                applied[rid] = out
+
+        # Reconstruye prev/new por línea a partir del stock final devuelto
+        running = {rid: applied[rid][0] - totals[rid] for rid in applied}
+        log_rows = []
+        for n, rid, delta, note in valid:
+            if rid not in applied:
+                results.append({"line": n, "ok": False, "id": rid, "error": "not found"})
+                continue
+            prev = running[rid]
+            running[rid] = prev + delta
+            log_rows.append(_log_row(
+                rid, applied[rid][1], user_id,
+                action=("in" if delta >= 0 else "out"), delta=delta,
+                prev=prev, new=prev + delta, note=note,
+            ))
+            results.append({"line": n, "ok": True, "id": rid, "delta": delta,
+                            "prev_stock": prev, "new_stock": prev + delta})
+
+        if data.get("strict") and len(applied) != len(totals):
+            db.session.rollback()
+            return jsonify({"error": "Invalid lines", "results": sorted(results, key=lambda r: r["line"])}), 400
+        if log_rows:
+            db.session.execute(insert(InventoryLog), log_rows)
         db.session.commit()
-        return jsonify(_serialize(rec))
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Server error", "detail": str(e)}), 500
 
+    results.sort(key=lambda r: r["line"])
+    return jsonify({
+        "results": results,
+        "applied": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+    })
+
 
-@bp.get("/logs")
-def list_logs():
+def _parse_log_dt(s):
+    try:
+        return datetime.fromisoformat(s.replace("Z", ""))
+    except Exception:
+        return None
+
+
+def _logs_query(args):
     """
-    Query params:
-      - item_db_id: int  (id interno del ítem)
-      - item_code:  str  (SKU / item_id)
-      - user_id:    int  (id exacto)
-      - user:       str  (id|email|name - filtra flexible)
-      - action:     in|out|set|create|update|delete
-      - from:       ISO date (incluyente)
-      - to:         ISO date (incluyente)
-      - page:       int (default 1)
-      - per_page:   int (default 25, máx 200)
-      - sort:       'desc'|'asc' por fecha
+    Construye la consulta filtrada de InventoryLog (sin orden ni paginación).
     """
     q = InventoryLog.query
 
-    item_db_id = request.args.get("item_db_id")
-    item_code  = request.args.get("item_code")
-    user_id    = request.args.get("user_id")
-    user_q     = request.args.get("user")  # <-- NUEVO filtro flexible
-    action     = request.args.get("action")
-    from_      = request.args.get("from")
-    to_        = request.args.get("to")
-    sort       = (request.args.get("sort") or "desc").lower()
+    item_db_id = args.get("item_db_id")
+    item_code  = args.get("item_code")
+    user_id    = args.get("user_id")
+    user_q     = args.get("user")  # <-- NUEVO filtro flexible
+    action     = args.get("action")
+    from_      = args.get("from")
+    to_        = args.get("to")
 
     if item_db_id:
         q = q.filter(InventoryLog.item_db_id == int(item_db_id))
@@ -331,58 +755,100 @@ def list_logs():
         if user_q.isdigit():
             q = q.filter(InventoryLog.user_id == int(user_q))
         else:
-            q = q.join(User, isouter=True).filter(
-                or_(
-                    User.email.ilike(f"%{user_q}%"),
-                    (User.name.ilike(f"%{user_q}%"))
-                )
+            # IN (subconsulta sobre user, tabla pequeña): el planner la resuelve
+            # una vez y filtra por ix_inventory_log_user_created, sin ILIKE por fila
+            # de log ni tope de usuarios coincidentes
+            users = select(User.id).where(
+                or_(User.email.ilike(f"%{user_q}%"), User.name.ilike(f"%{user_q}%"))
             )
+            q = q.filter(InventoryLog.user_id.in_(users))
     if action:
         q = q.filter(InventoryLog.action == action)
 
-    def _parse_dt(s):
-        try:
-            return datetime.fromisoformat(s.replace("Z", ""))
-        except Exception:
-            return None
-
-    dt_from = _parse_dt(from_) if from_ else None
-    dt_to   = _parse_dt(to_) if to_ else None
+    dt_from = _parse_log_dt(from_) if from_ else None
+    dt_to   = _parse_log_dt(to_) if to_ else None
     if dt_from:
         q = q.filter(InventoryLog.created_at >= dt_from)
     if dt_to:
         q = q.filter(InventoryLog.created_at <= dt_to)
+    return q
 
-    q = q.order_by(InventoryLog.created_at.desc() if sort != "asc" else InventoryLog.created_at.asc())
 
-    page = max(int(request.args.get("page") or 1), 1)
+def _log_dict(l: InventoryLog) -> dict:
+    user = getattr(l, "user", None)
+    user_name = None
+    user_email = None
+    if user is not None:
+        user_name = getattr(user, "name", None) or getattr(user, "full_name", None)
+        user_email = getattr(user, "email", None)
+
+    return {
+        "id": l.id,
+        "item_db_id": l.item_db_id,
+        "item_code": l.item_code,
+        "user_id": l.user_id,
+        "user_name": user_name or user_email,
+        "user_email": user_email,
+        "action": l.action,
+        "delta": l.delta,
+        "prev_stock": l.prev_stock,
+        "new_stock": l.new_stock,
+        "note": l.note,
+        "created_at": (l.created_at.isoformat() + "Z") if l.created_at else None,
+    }
+
+
+@bp.get("/logs")
+def list_logs():
+    """
+    Query params:
+      - item_db_id: int  (id interno del ítem)
+      - item_code:  str  (SKU / item_id)
+      - user_id:    int  (id exacto)
+      - user:       str  (id|email|name - filtra flexible)
+      - action:     in|out|set|create|update|delete
+      - from:       ISO date (incluyente)
+      - to:         ISO date (incluyente)
+      - page:       int (default 1)
+      - per_page:   int (default 25, máx 200)
+      - sort:       'desc'|'asc' por fecha
+      - cursor:     modo keyset por (created_at, id); usar "" para la primera página
+      - count:      exact|estimate|none (modo cursor; default none)
+    """
+    sort = (request.args.get("sort") or "desc").lower()
     per_page = min(max(int(request.args.get("per_page") or 25), 1), 200)
+    q = _logs_query(request.args)
+
+    if "cursor" in request.args:
+        count_mode = (request.args.get("count") or "none").lower()
+        total = None
+        if count_mode == "exact":
+            total = q.order_by(None).count()
+        elif count_mode == "estimate":
+            total = estimated_count(q)
+        try:
+            rows, next_cursor = keyset_page(
+                q,
+                [InventoryLog.created_at, InventoryLog.id],
+                cursor=request.args.get("cursor"),
+                limit=per_page,
+                descending=(sort != "asc"),
+            )
+        except CursorError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "items": [_log_dict(log) for log in rows],
+            "next_cursor": next_cursor,
+            "per_page": per_page,
+            "total": total,
+            "total_estimated": count_mode == "estimate",
+        })
+
+    page = max(int(request.args.get("page") or 1), 1)
+    q = q.order_by(InventoryLog.created_at.desc() if sort != "asc" else InventoryLog.created_at.asc())
     pagination = q.paginate(page=page, per_page=per_page, error_out=False)
 
-    def _row(l: InventoryLog) -> dict:
-        user = getattr(l, "user", None)
-        user_name = None
-        user_email = None
-        if user is not None:
-            user_name = getattr(user, "name", None) or getattr(user, "full_name", None)
-            user_email = getattr(user, "email", None)
-
-        return {
-            "id": l.id,
-            "item_db_id": l.item_db_id,
-            "item_code": l.item_code,
-            "user_id": l.user_id,
-            "user_name": user_name or user_email,
-            "user_email": user_email,
-            "action": l.action,
-            "delta": l.delta,
-            "prev_stock": l.prev_stock,
-            "new_stock": l.new_stock,
-            "note": l.note,
-            "created_at": (l.created_at.isoformat() + "Z") if l.created_at else None,
-        }
-
-    items = [_row(log) for log in pagination.items]
+    items = [_log_dict(log) for log in pagination.items]
 
     return jsonify({
         "items": items,
@@ -3,10 +3,10 @@ import uuid
 from pathlib import Path
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.utils import secure_filename
-from sqlalchemy import or_
 from backend.extensions import db
 from backend.models.manual import Manual
 from backend.models.asset import Asset  # ✅ necesario para traer el nombre del asset
+from backend.utils.fuzzy import FUZZY
 
 bp = Blueprint("manuals", __name__, url_prefix="/api/manuals")
 
@@ -91,10 +91,13 @@ def _manual_to_dict(m: Manual) -> dict:
 @bp.get("/")
 def get_all():
     q = (request.args.get("q") or "").strip()
-    query = Manual.query.order_by(Manual.created_at.desc())
+    query = Manual.query
     if q:
-        like = f"%{q}%"
-        query = query.filter(or_(Manual.title.ilike(like), Manual.description.ilike(like)))
+        # Búsqueda difusa (trigramas) en título/descripción, por relevancia
+        query, rank = FUZZY["manual"].search(query, q)
+        query = query.order_by(rank.desc(), Manual.created_at.desc())
+    else:
+        query = query.order_by(Manual.created_at.desc())
     items = [_manual_to_dict(m) for m in query.all()]
     return jsonify({"items": items})
 
@@ -1,15 +1,27 @@
 # -*- coding: utf-8 -*-
-from datetime import datetime
-from typing import Dict, Any, List
+from datetime import date, datetime
+from typing import Dict, Any, List, Tuple
 
 from flask import Blueprint, request, jsonify, g, abort
-from sqlalchemy import asc
+from sqlalchemy import String, Text, asc, column, func, insert, update, values
 
 from backend.extensions import db
 from backend.models.project import (
     Project,
     ProjectRoomStatus,
     ProjectRoomAudit,
+    ProjectRoomCheckpoint,
+)
+from backend.models.room import Room
+from backend.utils.grid import grid_payload
+from backend.utils.room_history import parse_ts, progress_series, rooms_as_of
+from backend.utils.rooms import (
+    DEFAULT_STATUS,
+    TOPOLOGY_FIELDS,
+    percent_complete,
+    seed_default_topology,
+    seed_project_rooms,
+    topology,
 )
 
 bp = Blueprint("projects", __name__, url_prefix="/projects")
@@ -42,50 +54,35 @@ def _current_user_email() -> str:
     return header_name.strip() or "Unknown user"
 
 
-def _serialize_room(rs: ProjectRoomStatus) -> Dict[str, Any]:
-    return rs.to_dict()
-
-
-def _room_ranges() -> List[range]:
-    """Genera los rangos del Aloft: 201–216 y 301–317 para pisos 3–8."""
-    ranges = [range(201, 217)]
-    for floor in range(3, 9):
-        start = floor * 100 + 1
-        end = floor * 100 + 17
-        ranges.append(range(start, end + 1))
-    return ranges
-
+def _serialize_room(rs: ProjectRoomStatus, room: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    data = rs.to_dict()
+    room = room or {}
+    data["floor"] = room.get("floor")
+    data["type"] = room.get("type")
+    data["display_name"] = room.get("display_name") or rs.room_number
+    return data
 
-def _all_room_numbers() -> List[str]:
-    nums = []
-    for r in _room_ranges():
-        nums.extend([str(n) for n in r])
-    return nums
 
-
-def _ensure_rooms(project_id: int) -> None:
-    """Crea registros ProjectRoomStatus para todas las habitaciones faltantes."""
-    existing = {
-        r.room_number
-        for r in ProjectRoomStatus.query.with_entities(ProjectRoomStatus.room_number)
-        .filter_by(project_id=project_id)
-        .all()
-    }
-    missing = [rn for rn in _all_room_numbers() if rn not in existing]
-    if not missing:
-        return
-
-    db.session.bulk_save_objects(
-        [
-            ProjectRoomStatus(
-                project_id=project_id,
-                room_number=rn,
-                status="Not Started",
-            )
-            for rn in missing
-        ]
-    )
-    db.session.commit()
+def _room_progress(project_ids=None) -> Dict[int, Dict[str, Any]]:
+    """
+    {project_id: {"room_counts": {status: n}, "rooms_total": n, "percent_complete": x}}
+    con un único SELECT project_id, status, count(*) ... GROUP BY project_id, status.
+    Las habitaciones "N/A" no cuentan para el porcentaje.
+    """
+    q = db.session.query(
+        ProjectRoomStatus.project_id, ProjectRoomStatus.status, func.count()
+    ).group_by(ProjectRoomStatus.project_id, ProjectRoomStatus.status)
+    if project_ids is not None:
+        q = q.filter(ProjectRoomStatus.project_id.in_(list(project_ids)))
+
+    out: Dict[int, Dict[str, Any]] = {}
+    for pid, status, n in q.all():
+        entry = out.setdefault(pid, {"room_counts": {}, "rooms_total": 0})
+        entry["room_counts"][status or "N/A"] = n
+        entry["rooms_total"] += n
+    for entry in out.values():
+        entry["percent_complete"] = percent_complete(entry["room_counts"], entry["rooms_total"])
+    return out
 
 
 # ---------- Endpoints de Proyectos ----------
@@ -115,10 +112,14 @@ def list_projects():
                 }
         return out
 
+    progress = _room_progress()
+    empty = {"room_counts": {}, "rooms_total": 0, "percent_complete": 0.0}
+
     normalized = []
     for p in items:
         data = p.to_dict()
         data["color_legend"] = normalize_legend(p.color_legend or DEFAULT_LEGEND)
+        data.update(progress.get(p.id, empty))
         normalized.append(data)
 
     return jsonify({"items": normalized})
@@ -135,15 +136,17 @@ def create_project():
     legend = data.get("color_legend") or DEFAULT_LEGEND
     p = Project(name=name, color_legend=legend, status="In Progress")
     db.session.add(p)
-    db.session.commit()
+    db.session.flush()
 
     # 🧹 Limpieza automática: borra registros previos con el mismo ID (si el ID fue reciclado)
     db.session.query(ProjectRoomStatus).filter_by(project_id=p.id).delete()
     db.session.query(ProjectRoomAudit).filter_by(project_id=p.id).delete()
-    db.session.commit()
+    db.session.query(ProjectRoomCheckpoint).filter_by(project_id=p.id).delete()
 
-    # 🏗️ Crea habitaciones desde cero
-    _ensure_rooms(p.id)
+    # 🏗️ Crea habitaciones desde la topología (un solo INSERT ... SELECT)
+    seed_default_topology()
+    seed_project_rooms(p.id)
+    db.session.commit()
 
     # 🔁 Devuelve leyenda normalizada
     project_data = p.to_dict()
@@ -198,20 +201,182 @@ def delete_project(pid: int):
     return jsonify({"ok": True})
 
 
+# ---------- Topología de habitaciones ----------
+
+@bp.get("/topology")
+def get_topology():
+    """Habitaciones activas de la propiedad (desde el caché del proceso)."""
+    rooms, _ = topology()
+    return jsonify({"items": rooms})
+
+
+_TRUE = ("1", "true", "yes", "si", "sí")
+_FALSE = ("0", "false", "no")
+
+
+def _topology_values(raw: dict, i: int) -> dict:
+    """Valores de TOPOLOGY_FIELDS validados/convertidos al tipo de la columna (abort 400 si no)."""
+    out = {}
+    for f in TOPOLOGY_FIELDS:
+        if f not in raw:
+            continue
+        v = raw[f]
+        if f == "sort_order":
+            try:
+                if isinstance(v, bool):
+                    raise ValueError
+                out[f] = int(v)
+            except (TypeError, ValueError):
+                abort(400, description=f"rooms[{i}]: sort_order must be an integer")
+        elif f == "active":
+            text = str(v).strip().lower()
+            if isinstance(v, bool):
+                out[f] = v
+            elif text in _TRUE or text in _FALSE:
+                out[f] = text in _TRUE
+            else:
+                abort(400, description=f"rooms[{i}]: active must be a boolean")
+        else:
+            if v is not None and not isinstance(v, (str, int)):
+                abort(400, description=f"rooms[{i}]: {f} must be a string")
+            value = str(v).strip() if v is not None else ""
+            size = Room.__table__.c[f].type.length
+            if size and len(value) > size:
+                abort(400, description=f"rooms[{i}]: {f} max {size} characters")
+            out[f] = value or None
+    return out
+
+
+@bp.put("/topology")
+def put_topology():
+    """
+    Alta/actualización de habitaciones: {"rooms": [{number, floor, type,
+    display_name, sort_order, active}], "replace": false}. Con replace=true
+    las habitaciones que no vienen en la lista se desactivan. Las nuevas se
+    siembran en todos los proyectos abiertos.
+    """
+    data = request.get_json() or {}
+    incoming = data.get("rooms")
+    if not isinstance(incoming, list):
+        abort(400, description="rooms must be a list")
+
+    existing = {r.number: r for r in Room.query.all()}
+    seen = set()
+    for i, raw in enumerate(incoming):
+        if not isinstance(raw, dict):
+            abort(400, description=f"rooms[{i}] must be an object")
+        number = str(raw.get("number") or "").strip()
+        if not number or len(number) > 10:
+            abort(400, description=f"rooms[{i}]: invalid number")
+        values = _topology_values(raw, i)
+        seen.add(number)
+        room = existing.get(number)
+        if room is None:
+            room = Room(number=number, sort_order=values.get("sort_order", len(existing) + i), active=True)
+            db.session.add(room)
+            existing[number] = room
+        for f, v in values.items():
+            setattr(room, f, v)
+
+    if data.get("replace"):
+        for number, room in existing.items():
+            if number not in seen:
+                room.active = False
+
+    db.session.flush()
+    seeded = seed_project_rooms()
+    db.session.commit()
+    rooms, _ = topology()
+    return jsonify({"items": rooms, "seeded": seeded})
+
+
 # ---------- Habitaciones & Leyenda ----------
 
 @bp.get("/<int:pid>/rooms")
 def list_rooms(pid: int):
-    """Lista todas las habitaciones del proyecto."""
+    """
+    Lista todas las habitaciones del proyecto.
+    ?as_of=<ts> reconstruye el estado a esa fecha; ?format=grid devuelve la
+    forma columnar {statuses, rooms, codes} (ver backend/utils/grid.py).
+    """
     Project.query.get_or_404(pid)
-    _ensure_rooms(pid)
+    fmt = (request.args.get("format") or "").lower()
+    as_of = None
+    if request.args.get("as_of"):
+        try:
+            as_of = parse_ts(request.args["as_of"])
+        except ValueError:
+            return jsonify({"error": "invalid as_of", "detail": "expected ISO date or datetime"}), 400
+
+    rooms, by_number = topology()
+    order = {r["number"]: i for i, r in enumerate(rooms)}
+
+    if fmt == "grid":
+        # Solo (habitación, estado); notas/editor vía GET /<pid>/room/<room>
+        pairs = (
+            db.session.query(ProjectRoomStatus.room_number, ProjectRoomStatus.status)
+            .filter_by(project_id=pid)
+            .all()
+        )
+        pairs.sort(key=lambda r: (order.get(r[0], len(order)), r[0]))
+        statuses = [s for _, s in pairs]
+        extra = {}
+        if as_of is not None:
+            past = rooms_as_of(pid, as_of)
+            statuses = [past[rn]["status"] if rn in past else DEFAULT_STATUS for rn, _ in pairs]
+            extra["as_of"] = as_of.isoformat()
+        return jsonify(grid_payload(
+            [rn for rn, _ in pairs], statuses,
+            key_name="rooms", dict_name="statuses", preset=list(DEFAULT_LEGEND), **extra,
+        ))
+
     rows = (
         ProjectRoomStatus.query
         .filter_by(project_id=pid)
         .order_by(asc(ProjectRoomStatus.room_number))
         .all()
     )
-    return jsonify({"items": [_serialize_room(r) for r in rows]})
+    rows.sort(key=lambda r: order.get(r.room_number, len(order)))
+    items = [_serialize_room(r, by_number.get(r.room_number)) for r in rows]
+
+    if as_of is not None:
+        # Estado reconstruido desde la auditoría; sin cambios previos = estado inicial
+        past = rooms_as_of(pid, as_of)
+        for item in items:
+            state = past.get(item["room_number"])
+            item["status"] = state["status"] if state else DEFAULT_STATUS
+            item["updated_by"] = state["updated_by"] if state else None
+            item["updated_at"] = state["changed_at"].isoformat() if state and state["changed_at"] else None
+            item.pop("notes", None)
+        return jsonify({"items": items, "as_of": as_of.isoformat()})
+    return jsonify({"items": items})
+
+
+@bp.get("/<int:pid>/progress")
+def project_progress(pid: int):
+    """
+    Serie de progreso: ?bucket=day|week&from=YYYY-MM-DD&to=YYYY-MM-DD
+    (por defecto desde la creación del proyecto hasta hoy).
+    """
+    p = Project.query.get_or_404(pid)
+    bucket = (request.args.get("bucket") or "day").lower()
+    if bucket not in ("day", "week"):
+        return jsonify({"error": "invalid bucket", "detail": "bucket must be day or week"}), 400
+    try:
+        start = date.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        end = date.fromisoformat(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return jsonify({"error": "invalid range", "detail": "from/to must be YYYY-MM-DD"}), 400
+
+    end = end or datetime.utcnow().date()
+    start = start or (p.created_at.date() if p.created_at else end)
+    if start > end:
+        return jsonify({"error": "invalid range", "detail": "from must be <= to"}), 400
+    return jsonify({
+        "project_id": pid,
+        "bucket": bucket,
+        "items": progress_series(pid, start, end, bucket),
+    })
 
 
 @bp.put("/<int:pid>/legend")
@@ -240,15 +405,165 @@ def update_legend(pid: int):
 
 # ---------- Estado de habitación + Auditoría ----------
 
+BULK_ROOMS_MAX = 500
+
+
+def _bulk_targets(data: Dict[str, Any], rooms: List[dict]) -> Dict[str, Tuple[str, Any]]:
+    """
+    {room: (status, notes|None)} desde `rooms: [{room, status, notes}]` o desde
+    un selector `{floor, from, to, status, notes}` resuelto contra la topología.
+    notes=None significa "no tocar las notas". Lanza ValueError si es inválido.
+    """
+    out: Dict[str, Tuple[str, Any]] = {}
+    if isinstance(data.get("rooms"), list):
+        for i, raw in enumerate(data["rooms"]):
+            if not isinstance(raw, dict):
+                raise ValueError(f"rooms[{i}] must be an object")
+            room = str(raw.get("room") or raw.get("room_number") or "").strip()
+            status = raw.get("status")
+            if not room or not isinstance(status, str) or not status.strip():
+                raise ValueError(f"rooms[{i}]: room and status are required")
+            out[room] = (status.strip(), raw.get("notes"))
+        return out
+
+    status = data.get("status")
+    if not isinstance(status, str) or not status.strip():
+        raise ValueError("status is required")
+    floor, lo, hi = data.get("floor"), data.get("from"), data.get("to")
+    if floor is None and lo is None and hi is None:
+        raise ValueError("rooms or a floor/from/to selector is required")
+    lo = int(lo) if lo is not None else None
+    hi = int(hi) if hi is not None else None
+
+    for r in rooms:
+        if floor is not None and str(r["floor"]) != str(floor):
+            continue
+        if lo is not None or hi is not None:
+            if not r["number"].isdigit():
+                continue
+            n = int(r["number"])
+            if (lo is not None and n < lo) or (hi is not None and n > hi):
+                continue
+        out[r["number"]] = (status.strip(), data.get("notes"))
+    return out
+
+
+def _room_snapshot(pid: int, numbers) -> Dict[str, Tuple[int, str, str]]:
+    """{room_number: (id, status, notes)} bloqueando las filas hasta el commit."""
+    rows = (
+        db.session.query(
+            ProjectRoomStatus.id, ProjectRoomStatus.room_number,
+            ProjectRoomStatus.status, ProjectRoomStatus.notes,
+        )
+        .filter(ProjectRoomStatus.project_id == pid, ProjectRoomStatus.room_number.in_(list(numbers)))
+        .with_for_update()
+        .all()
+    )
+    return {r.room_number: (r.id, r.status, r.notes or "") for r in rows}
+
+
+@bp.put("/<int:pid>/rooms")
+def bulk_set_room_status(pid: int):
+    """
+    Actualiza varias habitaciones en una transacción:
+      {"rooms": [{"room": "301", "status": "Completed", "notes": "..."}]}
+      {"floor": "3", "status": "Completed"} / {"from": 301, "to": 317, "status": "..."}
+    Un UPDATE ... FROM (VALUES ...) + un INSERT multi-fila de auditoría.
+    Solo se tocan (y auditan) las habitaciones cuyo estado o notas cambian.
+    """
+    Project.query.get_or_404(pid)
+    rooms, by_number = topology()
+    data = request.get_json() or {}
+    try:
+        targets = _bulk_targets(data, rooms)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "invalid payload", "detail": str(e)}), 400
+    if len(targets) > BULK_ROOMS_MAX:
+        return jsonify({"error": "too many rooms", "detail": f"max {BULK_ROOMS_MAX} per request"}), 400
+    if not targets:
+        return jsonify({"items": [], "updated": 0, "unknown": []})
+
+    prev = _room_snapshot(pid, targets)
+    if any(rn not in prev and rn in by_number for rn in targets):
+        seed_project_rooms(pid)
+        prev = _room_snapshot(pid, targets)
+    unknown = sorted(rn for rn in targets if rn not in prev)
+
+    changes = []
+    for rn, (status, notes) in targets.items():
+        if rn not in prev:
+            continue
+        _, old_status, old_notes = prev[rn]
+        if status != old_status or (notes is not None and notes != old_notes):
+            changes.append((rn, status, notes))
+    if not changes:
+        db.session.commit()
+        return jsonify({"items": [], "updated": 0, "unknown": unknown})
+
+    who = _current_user_email()
+    now = datetime.utcnow()
+    if db.engine.dialect.name == "postgresql":
+        v = values(
+            column("room_number", String), column("status", String), column("notes", Text),
+            name="v",
+        ).data(changes)
+        stmt = (
+            update(ProjectRoomStatus)
+            .where(ProjectRoomStatus.project_id == pid, ProjectRoomStatus.room_number == v.c.room_number)
+            .values(
+                status=v.c.status,
+                notes=func.coalesce(v.c.notes, ProjectRoomStatus.notes),
+                updated_by=who,
+                updated_at=now,
+            )
+            .returning(ProjectRoomStatus)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        updated = db.session.execute(stmt).scalars().all()
+    else:
+        # Otros dialectos: UPDATE por PK en executemany (misma transacción)
+        db.session.execute(update(ProjectRoomStatus), [
+            {
+                "id": prev[rn][0], "status": status,
+                "notes": prev[rn][2] if notes is None else notes,
+                "updated_by": who, "updated_at": now,
+            }
+            for rn, status, notes in changes
+        ])
+        updated = None
+
+    db.session.execute(insert(ProjectRoomAudit), [
+        {
+            "project_id": pid, "room_number": rn,
+            "prev_status": prev[rn][1], "new_status": status,
+            "notes": notes or "", "updated_by": who,
+        }
+        for rn, status, notes in changes
+    ])
+
+    if updated is None:
+        updated = ProjectRoomStatus.query.filter(
+            ProjectRoomStatus.id.in_([prev[rn][0] for rn, _, _ in changes])
+        ).all()
+    order = {r["number"]: i for i, r in enumerate(rooms)}
+    updated.sort(key=lambda r: order.get(r.room_number, len(order)))
+    # Serializar antes del commit: el commit expira los objetos y cada uno volvería a hacer SELECT
+    items = [_serialize_room(r, by_number.get(r.room_number)) for r in updated]
+    db.session.commit()
+    return jsonify({"items": items, "updated": len(items), "unknown": unknown})
+
+
 @bp.put("/<int:pid>/room/<string:room>")
 def set_room_status(pid: int, room: str):
     """Actualiza el estado de una habitación dentro del proyecto."""
     Project.query.get_or_404(pid)
-    _ensure_rooms(pid)
+    _, by_number = topology()
 
     rs = ProjectRoomStatus.query.filter_by(project_id=pid, room_number=str(room)).first()
     if not rs:
-        rs = ProjectRoomStatus(project_id=pid, room_number=str(room), status="Not Started")
+        if str(room) not in by_number:
+            abort(404, description="Unknown room")
+        rs = ProjectRoomStatus(project_id=pid, room_number=str(room), status=DEFAULT_STATUS)
         db.session.add(rs)
         db.session.flush()
 
@@ -271,7 +586,17 @@ def set_room_status(pid: int, room: str):
     db.session.add(audit)
     db.session.commit()
 
-    return jsonify(_serialize_room(rs))
+    return jsonify(_serialize_room(rs, by_number.get(str(room))))
+
+
+@bp.get("/<int:pid>/room/<string:room>")
+def get_room(pid: int, room: str):
+    """Detalle de una habitación (notas, editor) para la vista de grilla."""
+    rs = ProjectRoomStatus.query.filter_by(project_id=pid, room_number=str(room)).first()
+    if not rs:
+        abort(404, description="Room not found")
+    _, by_number = topology()
+    return jsonify(_serialize_room(rs, by_number.get(rs.room_number)))
 
 
 @bp.get("/<int:pid>/room/<string:room>/audits")
@@ -1,14 +1,15 @@
 from __future__ import annotations
 from datetime import datetime, date, time
-from typing import Any, Dict, Iterable
+from typing import Any, Dict
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy import types as satypes, or_
+from sqlalchemy import types as satypes
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 
 from backend.extensions import db
 from backend.models.quote import Quote  # Modelo Quote con relación .vendor
+from backend.utils.fuzzy import FUZZY
 
 bp = Blueprint("quotes", __name__, url_prefix="/api/quotes")
 
@@ -138,14 +139,10 @@ def list_quotes():
     if status and hasattr(Quote, "status"):
         qry = qry.filter(getattr(Quote, "status") == status)
 
-    # Búsqueda básica en columnas de texto
-    if q:
-        terms: Iterable = []
-        t = f"%{q}%"
-        for name in STR_COLS:
-            terms = (*terms, getattr(Quote, name).ilike(t))
-        if terms:
-            qry = qry.filter(or_(*terms))
+    # Búsqueda difusa (trigramas) en número, título y detalle, por relevancia
+    if q and q.strip():
+        qry, rank = FUZZY["quote"].search(qry, q)
+        qry = qry.order_by(rank.desc())
 
     items = qry.order_by(Quote.id.desc()).all()
     return {"items": [serialize(x) for x in items]}
@@ -0,0 +1,49 @@
+# backend/routes/search.py
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+
+from backend.utils.pagination import limit_arg
+from backend.utils.search_index import SOURCES, search
+
+bp = Blueprint("search", __name__, url_prefix="/api/search")
+
+
+@bp.get("", strict_slashes=False)
+@bp.get("/", strict_slashes=False)
+@jwt_required(optional=True)
+def unified_search():
+    """
+    GET /api/search?q=<texto>&type=task,asset&floor=3&room=305&vendor_id=7&limit=20&page=1
+    Busca en tareas, comentarios, assets, inventario, vendors, manuales,
+    pasos de SOP y facturas (tabla search_document). Devuelve items con
+    snippet resaltado (<mark>) y conteos por faceta (type, floor, room, vendor)
+    del conjunto filtrado. La faceta vendor va por id, igual que el filtro:
+    {"7": {"name": "ACME", "count": 3}}.
+    """
+    q = (request.args.get("q") or "").strip()
+    types = [t.strip() for t in (request.args.get("type") or "").split(",") if t.strip()]
+    bad = [t for t in types if t not in SOURCES]
+    if bad:
+        return {"error": "invalid type", "detail": f"type must be one of: {', '.join(sorted(SOURCES))}"}, 400
+
+    vendor_id = request.args.get("vendor_id")
+    if vendor_id is not None:
+        try:
+            vendor_id = int(vendor_id)
+        except ValueError:
+            return {"error": "invalid vendor_id", "detail": "vendor_id must be an integer"}, 400
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+    except ValueError:
+        page = 1
+
+    return search(
+        q,
+        types=types,
+        floor=(request.args.get("floor") or "").strip() or None,
+        room=(request.args.get("room") or "").strip() or None,
+        vendor_id=vendor_id,
+        limit=limit_arg(default=20, maximum=100),
+        page=page,
+    )
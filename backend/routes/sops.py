@@ -4,46 +4,42 @@ from flask import Blueprint, jsonify, request
 from backend.extensions import db
 from backend.models.sop import SOP, SOPStep
 from backend.models.asset import Asset  # ✅ para traer el nombre del asset
-from sqlalchemy import desc
+from backend.utils.fuzzy import FUZZY
+from backend.utils.pagination import CursorError, SortKey, paginate
+from backend.utils.versions import track
 from datetime import datetime
 
 bp = Blueprint("sops", __name__, url_prefix="/api/sops")
 
+track(SOP)  # el total del listado se cachea por versión de la tabla
+
 # ==========================================================
 # Helpers
 # ==========================================================
-def _apply_order(query, model, order_str: str | None, default="-created_at"):
-    field = (order_str or default).strip()
-    desc_sort = field.startswith("-")
-    col_name = field[1:] if desc_sort else field
-    col = getattr(model, col_name, None)
-    if col is None:
-        col = getattr(model, default[1:], model.id)
-        desc_sort = default.startswith("-")
-    return query.order_by(desc(col) if desc_sort else col)
-
-
-def _paginate(query, default_size=50):
-    try:
-        page = max(1, int(request.args.get("page", "1")))
-    except Exception:
-        page = 1
-    try:
-        page_size = min(200, max(1, int(request.args.get("page_size", str(default_size)))))
-    except Exception:
-        page_size = default_size
-    total = query.count()
-    rows = query.offset((page - 1) * page_size).limit(page_size).all()
-    return rows, total, page, page_size
+SOP_SORTS = {
+    # Claves indexadas en backend/models/sop.py; el id desempata
+    "created_at": SortKey(SOP.created_at, "created_at"),
+    "updated_at": SortKey(SOP.updated_at, "updated_at"),
+    "title": SortKey(SOP.title, "title"),
+}
+
+
+def _asset_names(asset_ids) -> dict:
+    """{asset_id: "Nombre - Área"} en una sola consulta."""
+    ids = {i for i in asset_ids if i}
+    if not ids:
+        return {}
+    return {
+        a.id: f"{a.name}{' - ' + a.area if a.area else ''}"
+        for a in db.session.query(Asset.id, Asset.name, Asset.area).filter(Asset.id.in_(ids))
+    }
 
 
-def _sop_to_dict(s: SOP, include_steps=False) -> dict:
+def _sop_to_dict(s: SOP, include_steps=False, asset_names: dict | None = None) -> dict:
     """Convierte SOP → dict con nombre de Asset incluido"""
-    asset_name = None
-    if s.asset_id:
-        asset = Asset.query.get(s.asset_id)
-        if asset:
-            asset_name = f"{asset.name}{' - ' + asset.area if asset.area else ''}"
+    if asset_names is None:
+        asset_names = _asset_names([s.asset_id])
+    asset_name = asset_names.get(s.asset_id)
 
     data = {
         "id": s.id,
@@ -74,30 +70,37 @@ def _sop_to_dict(s: SOP, include_steps=False) -> dict:
 # ==========================================================
 @bp.get("/")
 def list_sops():
-    """List SOPs with optional filters."""
-    order = request.args.get("order", "-created_at")
-    qstr = request.args.get("q")
-    asset_id = request.args.get("asset_id")
-    category = request.args.get("category")
+    """
+    List SOPs with optional filters.
+      - q, asset_id, category
+      - order=-created_at | title | updated_at (con - = desc); con q, -relevance
+      - page_size (alias limit), cursor=<next_cursor> | page (compatibilidad)
+    """
+    params = request.args.to_dict(flat=True)
+    filters = {k: params[k].strip() for k in ("q", "asset_id", "category") if params.get(k)}
 
     q = SOP.query
-    if qstr:
-        like = f"%{qstr.strip()}%"
-        q = q.filter((SOP.title.ilike(like)) | (SOP.description.ilike(like)))
-    if asset_id:
-        q = q.filter(SOP.asset_id == asset_id)
-    if category:
-        q = q.filter(SOP.category == category)
-
-    q = _apply_order(q, SOP, order)
-    rows, total, page, page_size = _paginate(q)
-
-    return jsonify({
-        "items": [_sop_to_dict(s) for s in rows],
-        "total": total,
-        "page": page,
-        "page_size": page_size
-    }), 200
+    sorts, default_order = SOP_SORTS, "-created_at"
+    if filters.get("q"):
+        # Búsqueda difusa en título/descripción; sin order explícito, por relevancia
+        q, rank = FUZZY["sop"].search(q, filters["q"])
+        sorts = {**SOP_SORTS, "relevance": SortKey(rank, None)}
+        default_order = "-relevance"
+    if filters.get("asset_id"):
+        q = q.filter(SOP.asset_id == filters["asset_id"])
+    if filters.get("category"):
+        q = q.filter(SOP.category == filters["category"])
+
+    try:
+        page = paginate(
+            q, params, pk=SOP.id, sorts=sorts, default_order=default_order,
+            table=SOP.__tablename__, filters=filters,
+        )
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    rows = page.pop("rows")
+    names = _asset_names(s.asset_id for s in rows)
+    return jsonify({"items": [_sop_to_dict(s, asset_names=names) for s in rows], **page}), 200
 
 
 @bp.get("/<int:sop_id>")
@@ -1,8 +1,10 @@
 # backend/routes/task_comments.py
 from flask import Blueprint, jsonify, request
+from sqlalchemy import func
 from backend.extensions import db
 from backend.models.task import Task
 from backend.models.task_comment import TaskComment
+from backend.utils.pagination import CursorError, keyset_page, limit_arg
 
 bp = Blueprint("task_comments", __name__, url_prefix="/api/tasks")
 
@@ -18,17 +20,57 @@ def serialize(c: TaskComment) -> dict:
     }
 
 
+@bp.get("/comment_counts")
+def comment_counts():
+    """
+    ?ids=1,2,3 -> {"counts": {"1": 4, "2": 0, "3": 1}}
+    Un solo GROUP BY sobre ix_task_comment_task_id_id para todo el tablero.
+    """
+    ids = []
+    for part in (request.args.get("ids") or "").split(","):
+        part = part.strip()
+        if part.isdigit():
+            ids.append(int(part))
+    ids = list(dict.fromkeys(ids))[:1000]
+    if not ids:
+        return {"counts": {}}
+
+    rows = (
+        db.session.query(TaskComment.task_id, func.count(TaskComment.id))
+        .filter(TaskComment.task_id.in_(ids))
+        .group_by(TaskComment.task_id)
+        .all()
+    )
+    counts = {str(i): 0 for i in ids}
+    counts.update({str(tid): int(n) for tid, n in rows})
+    return {"counts": counts}
+
+
 @bp.get("/<int:task_id>/comments")
 def list_comments(task_id: int):
+    """
+    Sin params devuelve todo el hilo (compat). Con `limit`/`cursor` pagina por id;
+    `order=desc` recorre desde el más reciente.
+    """
     # 404 si la tarea no existe
     Task.query.get_or_404(task_id)
 
-    items = (
-        TaskComment.query.filter_by(task_id=task_id)
-        .order_by(TaskComment.id.asc())
-        .all()
-    )
-    return {"items": [serialize(i) for i in items]}
+    q = TaskComment.query.filter_by(task_id=task_id)
+    if "limit" not in request.args and "cursor" not in request.args:
+        items = q.order_by(TaskComment.id.asc()).all()
+        return {"items": [serialize(i) for i in items]}
+
+    try:
+        items, next_cursor = keyset_page(
+            q,
+            [TaskComment.id],
+            cursor=request.args.get("cursor"),
+            limit=limit_arg(),
+            descending=(request.args.get("order") or "").lower() == "desc",
+        )
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    return {"items": [serialize(i) for i in items], "next_cursor": next_cursor}
 
 
 @bp.post("/<int:task_id>/comments")
@@ -3,14 +3,36 @@ from datetime import datetime, timezone
 import json
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import text
+from sqlalchemy import insert
 from backend.extensions import db
 from backend.models.task import Task
 from backend.models.task_activity import TaskActivity
 from backend.models.user import User
+from backend.utils.schema import require
+from backend.utils.pagination import CursorError, keyset_page, limit_arg
 
 bp = Blueprint("tasks", __name__, url_prefix="/api/tasks")
 
+UPDATABLE_FIELDS = [
+    "title",
+    "description",
+    "status",
+    "priority",
+    "assignee",
+    "room",
+    "floor",
+    "workstream",
+    "image_url",
+    "due_date",
+]
+# Filtros aceptados por /bulk cuando no se envían ids explícitos
+BULK_FILTER_FIELDS = ["status", "priority", "assignee", "workstream", "room", "floor"]
+BULK_MAX = 1000
+
+# Verificado una vez al arrancar (ver backend/utils/schema.py)
+require("task", "workstream", "image_url")
+require("task_activity", "user_id", "user_email", "user_name", "actor")
+
 
 # ------------------------- utils -------------------------
 def _parse_dt(val):
@@ -35,50 +57,6 @@ def _iso(dt: datetime | None):
     return dt.isoformat()
 
 
-def _ensure_sqlite_columns():
-    try:
-        with db.engine.begin() as conn:
-            # task columns
-            cols_task = {row[1] for row in conn.execute(text("PRAGMA table_info(task)"))}
-            if "workstream" not in cols_task:
-                conn.execute(text("ALTER TABLE task ADD COLUMN workstream VARCHAR(80)"))
-            if "image_url" not in cols_task:
-                conn.execute(text("ALTER TABLE task ADD COLUMN image_url TEXT"))
-
-            # task_activity table + columns (idempotente)
-            conn.execute(
-                text(
-                    """
-                CREATE TABLE IF NOT EXISTS task_activity (
-                    id INTEGER PRIMARY KEY,
-                    task_id INTEGER NOT NULL,
-                    action VARCHAR(40) NOT NULL,
-                    changes TEXT,
-                    user_id INTEGER,
-                    user_email VARCHAR(120),
-                    user_name VARCHAR(120),
-                    actor VARCHAR(120),
-                    created_at DATETIME,
-                    FOREIGN KEY(task_id) REFERENCES task(id)
-                )
-                """
-                )
-            )
-
-            cols_act = {row[1] for row in conn.execute(text("PRAGMA table_info(task_activity)"))}
-            for col, ddl in [
-                ("user_id", "ALTER TABLE task_activity ADD COLUMN user_id INTEGER"),
-                ("user_email", "ALTER TABLE task_activity ADD COLUMN user_email VARCHAR(120)"),
-                ("user_name", "ALTER TABLE task_activity ADD COLUMN user_name VARCHAR(120)"),
-                ("actor", "ALTER TABLE task_activity ADD COLUMN actor VARCHAR(120)"),
-            ]:
-                if col not in cols_act:
-                    conn.execute(text(ddl))
-    except Exception:
-        # silencioso para mantener compatibilidad
-        pass
-
-
 def _user_name_from_id(user_id):
     if user_id is None:
         return None
@@ -165,20 +143,43 @@ def _actor_display_from_activity(a: TaskActivity):
     return a.user_name or a.user_email or a.actor or "anonymous"
 
 
+def _jsonable(changes):
+    """Normaliza el diff para la columna JSON (fechas -> ISO)."""
+    return json.loads(json.dumps(
+        changes or {},
+        ensure_ascii=False,
+        default=lambda o: _iso(o) if isinstance(o, datetime) else str(o),
+    ))
+
+
+def _changes_of(a: TaskActivity) -> dict:
+    # Filas antiguas guardaban el JSON como texto
+    c = a.changes
+    if isinstance(c, str):
+        try:
+            c = json.loads(c or "{}")
+        except ValueError:
+            c = {}
+    return c or {}
+
+
+def _activity_row(task_id, action, changes, who):
+    return {
+        "task_id": task_id,
+        "action": action,
+        "changes": _jsonable(changes),
+        "user_id": who["user_id"],
+        "user_email": who["user_email"],
+        "user_name": who["user_name"],
+        "actor": who["display"],
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
 def _log(task_id, action, changes=None):
     try:
         who = _current_user_info()
-        entry = TaskActivity(
-            task_id=task_id,
-            action=action,
-            changes=json.dumps(changes or {}, ensure_ascii=False),
-            user_id=who["user_id"],
-            user_email=who["user_email"],
-            user_name=who["user_name"],
-            actor=who["display"],
-            created_at=datetime.now(timezone.utc),
-        )
-        db.session.add(entry)
+        db.session.add(TaskActivity(**_activity_row(task_id, action, changes, who)))
         db.session.commit()
     except Exception:
         db.session.rollback()
@@ -195,8 +196,8 @@ def _last_activity(task_id):
     return _actor_display_from_activity(a), a.created_at
 
 
-def serialize(t: Task):
-    actor, when = _last_activity(t.id)
+def serialize(t: Task, last=None):
+    actor, when = last if last else _last_activity(t.id)
     return {
         "id": t.id,
         "title": t.title,
@@ -222,7 +223,7 @@ def serialize_activity(a: TaskActivity):
         "task_id": a.task_id,
         "action": a.action,
         "actor": _actor_display_from_activity(a),
-        "changes": json.loads(a.changes or "{}"),
+        "changes": _changes_of(a),
         "created_at": _iso(a.created_at),
         "user_id": a.user_id,
         "user_email": a.user_email,
@@ -230,11 +231,30 @@ def serialize_activity(a: TaskActivity):
     }
 
 
+def _apply_changes(t: Task, data: dict) -> dict:
+    """Aplica los campos editables de `data` sobre `t` y devuelve el diff {campo: {old, new}}."""
+    changed = {}
+    for k in UPDATABLE_FIELDS:
+        if k in data:
+            old = getattr(t, k)
+            new = _parse_dt(data[k]) if k == "due_date" else data[k]
+            if old != new:
+                changed[k] = {
+                    "old": _iso(old) if isinstance(old, datetime) else old,
+                    "new": _iso(new) if isinstance(new, datetime) else new,
+                }
+                setattr(t, k, new)
+    return changed
+
+
+def _action_for(changed: dict) -> str:
+    return "move" if "status" in changed and len(changed) == 1 else "update"
+
+
 # ------------------------- routes -------------------------
 @bp.route("/", methods=["GET"], strict_slashes=False)
 @jwt_required(optional=True)
 def list_tasks():
-    _ensure_sqlite_columns()
     q = Task.query.order_by(Task.created_at.desc()).all()
     return {"items": [serialize(t) for t in q]}
 
@@ -242,7 +262,6 @@ def list_tasks():
 @bp.route("/", methods=["POST"], strict_slashes=False)
 @jwt_required(optional=True)
 def create_task():
-    _ensure_sqlite_columns()
     data = request.get_json() or {}
     t = Task(
         title=(data.get("title") or "").strip(),
@@ -266,10 +285,84 @@ def create_task():
     return serialize(t), 201
 
 
+@bp.route("/bulk", methods=["POST"], strict_slashes=False)
+@jwt_required(optional=True)
+def bulk_update():
+    """
+    Body: { "ids": [1, 2, ...] | "filter": {"status": ..., "assignee": ...}, "patch": {...} }
+    Aplica el mismo patch a todas las tareas en una sola transacción; las
+    actividades se insertan en bloque y el actor se resuelve una sola vez.
+    """
+    data = request.get_json(silent=True) or {}
+    patch = data.get("patch")
+    if not isinstance(patch, dict) or not any(k in patch for k in UPDATABLE_FIELDS):
+        return {"error": "patch must include at least one of: " + ", ".join(UPDATABLE_FIELDS)}, 400
+    if "title" in patch and not (patch.get("title") or "").strip():
+        return {"error": "title cannot be empty"}, 400
+
+    ids = data.get("ids")
+    flt = data.get("filter")
+    q = Task.query
+    if ids is not None:
+        if not isinstance(ids, list):
+            return {"error": "ids must be a list"}, 400
+        try:
+            ids = list(dict.fromkeys(int(i) for i in ids))
+        except (TypeError, ValueError):
+            return {"error": "ids must be integers"}, 400
+        if not ids:
+            return {"results": [], "updated": 0}
+        q = q.filter(Task.id.in_(ids))
+    elif isinstance(flt, dict) and any(flt.get(k) not in (None, "") for k in BULK_FILTER_FIELDS):
+        for k in BULK_FILTER_FIELDS:
+            if flt.get(k) not in (None, ""):
+                q = q.filter(getattr(Task, k) == flt[k])
+    else:
+        return {"error": "send ids or a non-empty filter"}, 400
+
+    tasks = q.order_by(Task.id.asc()).limit(BULK_MAX + 1).all()
+    if len(tasks) > BULK_MAX:
+        return {"error": f"too many tasks (max {BULK_MAX})"}, 400
+
+    who = _current_user_info()
+    activity_rows = []
+    changed_by_id = {}
+    for t in tasks:
+        changed = _apply_changes(t, patch)
+        changed_by_id[t.id] = changed
+        if changed:
+            activity_rows.append(_activity_row(t.id, _action_for(changed), changed, who))
+
+    try:
+        db.session.flush()
+        if activity_rows:
+            db.session.execute(insert(TaskActivity), activity_rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return {"error": "Server error", "detail": str(e)}, 500
+
+    # Recarga en una sola consulta las tareas expiradas por el commit
+    touched = [tid for tid, c in changed_by_id.items() if c]
+    found = {t.id: t for t in Task.query.filter(Task.id.in_(touched)).all()} if touched else {}
+
+    now = datetime.now(timezone.utc)
+    results = []
+    for tid in (ids if ids is not None else list(changed_by_id)):
+        if tid not in changed_by_id:
+            results.append({"id": tid, "ok": False, "error": "not found"})
+            continue
+        changed = changed_by_id[tid]
+        row = {"id": tid, "ok": True, "changed": sorted(changed)}
+        if changed:
+            row["item"] = serialize(found[tid], last=(who["display"], now))
+        results.append(row)
+    return {"results": results, "updated": sum(1 for c in changed_by_id.values() if c)}
+
+
 @bp.route("/<int:id>", methods=["GET"], strict_slashes=False)
 @jwt_required(optional=True)
 def get_one(id: int):
-    _ensure_sqlite_columns()
     t = Task.query.get_or_404(id)
     return serialize(t)
 
@@ -277,44 +370,20 @@ def get_one(id: int):
 @bp.route("/<int:id>", methods=["PUT", "PATCH"], strict_slashes=False)
 @jwt_required(optional=True)
 def update(id: int):
-    _ensure_sqlite_columns()
     t = Task.query.get_or_404(id)
     data = request.get_json() or {}
 
-    changed = {}
-    for k in [
-        "title",
-        "description",
-        "status",
-        "priority",
-        "assignee",
-        "room",
-        "floor",
-        "workstream",
-        "image_url",
-        "due_date",
-    ]:
-        if k in data:
-            old = getattr(t, k)
-            new = _parse_dt(data[k]) if k == "due_date" else data[k]
-            if old != new:
-                changed[k] = {
-                    "old": _iso(old) if isinstance(old, datetime) else old,
-                    "new": _iso(new) if isinstance(new, datetime) else new,
-                }
-                setattr(t, k, new)
+    changed = _apply_changes(t, data)
 
     db.session.commit()
     if changed:
-        action = "move" if "status" in changed and len(changed) == 1 else "update"
-        _log(t.id, action, changed)
+        _log(t.id, _action_for(changed), changed)
     return serialize(t)
 
 
 @bp.route("/<int:id>", methods=["DELETE"], strict_slashes=False)
 @jwt_required(optional=True)
 def delete(id: int):
-    _ensure_sqlite_columns()
     t = Task.query.get_or_404(id)
     snapshot = serialize(t)
     db.session.delete(t)
@@ -326,10 +395,19 @@ def delete(id: int):
 @bp.route("/<int:id>/activity", methods=["GET"], strict_slashes=False)
 @jwt_required(optional=True)
 def activity(id: int):
-    _ensure_sqlite_columns()
-    q = (
-        TaskActivity.query.filter_by(task_id=id)
-        .order_by(TaskActivity.created_at.desc())
-        .all()
-    )
-    return {"items": [serialize_activity(a) for a in q]}
+    """Sin params devuelve todo (compat); con `limit`/`cursor` pagina por keyset."""
+    q = TaskActivity.query.filter_by(task_id=id)
+    if "limit" not in request.args and "cursor" not in request.args:
+        rows = q.order_by(TaskActivity.created_at.desc(), TaskActivity.id.desc()).all()
+        return {"items": [serialize_activity(a) for a in rows]}
+
+    try:
+        rows, next_cursor = keyset_page(
+            q,
+            [TaskActivity.created_at, TaskActivity.id],
+            cursor=request.args.get("cursor"),
+            limit=limit_arg(),
+        )
+    except CursorError as e:
+        return {"error": str(e)}, 400
+    return {"items": [serialize_activity(a) for a in rows], "next_cursor": next_cursor}
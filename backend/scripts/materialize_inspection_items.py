@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Genera los ítems de inspecciones creadas antes de que se materializaran al
+crear la inspección (el GET de ítems ya no los crea) y recalcula sus
+contadores. Es idempotente.
+
+Uso:
+  python backend/scripts/materialize_inspection_items.py
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+
+# resolver imports del paquete backend sin depender del cwd
+THIS_FILE = Path(__file__).resolve()
+BACKEND_DIR = THIS_FILE.parents[1]
+PROJECT_ROOT = BACKEND_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app import create_app
+from backend.config import Config
+from backend.extensions import db
+from backend.models.inspection import Inspection
+from backend.models.inspection_item import InspectionItem
+from backend.utils.inspection_items import materialize_items, recount
+
+
+def main():
+    app = create_app(Config)
+    with app.app_context():
+        pending = Inspection.query.filter(
+            ~Inspection.query.session.query(InspectionItem.id)
+            .filter(InspectionItem.inspection_id == Inspection.id)
+            .exists()
+        ).all()
+        total = 0
+        for ins in pending:
+            total += materialize_items(ins)
+            recount(ins.id)
+        db.session.commit()
+        print(f"[ok] {len(pending)} inspecciones sin ítems, {total} ítems creados")
+
+
+if __name__ == "__main__":
+    main()
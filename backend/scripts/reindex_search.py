@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Reconstruye search_document (índice de /api/search) desde las tablas
+fuente. Necesario una vez tras la migración d2f7b9e4a516; después el índice
+se mantiene solo desde los hooks de la sesión. Es idempotente.
+
+Uso:
+  python backend/scripts/reindex_search.py            # todas las entidades
+  python backend/scripts/reindex_search.py task asset # solo algunas
+"""
+from __future__ import annotations
+from pathlib import Path
+import sys
+
+# resolver imports del paquete backend sin depender del cwd
+THIS_FILE = Path(__file__).resolve()
+BACKEND_DIR = THIS_FILE.parents[1]
+PROJECT_ROOT = BACKEND_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app import create_app
+from backend.config import Config
+from backend.extensions import db
+from backend.utils.search_index import SOURCES, rebuild
+
+
+def main():
+    entities = sys.argv[1:] or None
+    unknown = [e for e in entities or () if e not in SOURCES]
+    if unknown:
+        sys.exit(f"[error] entidades desconocidas: {', '.join(unknown)} (válidas: {', '.join(SOURCES)})")
+    app = create_app(Config)
+    with app.app_context():
+        counts = rebuild(entities)
+        db.session.commit()
+        for entity, n in counts.items():
+            print(f"[ok] {entity}: {n} documentos")
+
+
+if __name__ == "__main__":
+    main()
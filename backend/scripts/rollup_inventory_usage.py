@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Pliega inventory_log en inventory_daily_usage (consumo diario por ítem).
+Pensado para cron (p. ej. cada noche); es idempotente.
+
+Uso:
+  python backend/scripts/rollup_inventory_usage.py
+  python backend/scripts/rollup_inventory_usage.py --full   # reconstruye todo
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import sys
+
+# resolver imports del paquete backend sin depender del cwd
+THIS_FILE = Path(__file__).resolve()
+BACKEND_DIR = THIS_FILE.parents[1]
+PROJECT_ROOT = BACKEND_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app import create_app
+from backend.config import Config
+from backend.utils.inventory_usage import rollup_usage
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--full", action="store_true", help="recalcula todos los días")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    app = create_app(Config)
+    with app.app_context():
+        res = rollup_usage(full=args.full)
+        print(f"[ok] rollup desde {res['since'] or 'el inicio'}: {res['rows']} filas (hasta {res['last_day']})")
+
+
+if __name__ == "__main__":
+    main()
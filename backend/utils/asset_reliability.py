@@ -0,0 +1,180 @@
+# backend/utils/asset_reliability.py
+# -*- coding: utf-8 -*-
+"""
+Métricas de confiabilidad por asset a partir de asset_state_history.
+
+`fleet_reliability()` carga el historial una vez (ordenado por asset y fecha)
+y calcula, vectorizado con NumPy para toda la flota:
+  - failures: transiciones a "failed"
+  - uptime / downtime: tiempo en estados operativos vs failed/ooo
+    (antes del primer registro el asset se considera operativo)
+  - MTBF = uptime / failures y MTTR = downtime / failures (días)
+  - fallas por mes (últimos `months` meses)
+  - repeat failure: dos fallas separadas por <= `repeat_days`
+y agrega por tipo de asset. El resultado se cachea por proceso hasta que
+cambie asset_state_history o asset (o cambie el día).
+"""
+from __future__ import annotations
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+
+from backend.extensions import db
+from backend.models.asset import Asset
+from backend.models.asset_state_history import AssetStateHistory
+from backend.utils.versions import cached, track
+
+try:
+    import numpy as np
+except ImportError:  # dependencia opcional
+    np = None
+
+DOWN_STATES = ("failed", "ooo")
+DAY = 86400.0
+
+track(AssetStateHistory, Asset)
+
+
+def _epoch(dt: datetime | None) -> float:
+    if dt is None:
+        return float("nan")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _month_labels(today: date, months: int) -> List[str]:
+    out = []
+    y, m = today.year, today.month
+    for _ in range(months):
+        out.append(f"{y:04d}-{m:02d}")
+        m -= 1
+        if m == 0:
+            y, m = y - 1, 12
+    return out[::-1]
+
+
+def _compute(months: int, repeat_days: int) -> Dict[str, Any]:
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+
+    assets = db.session.execute(
+        select(Asset.id, Asset.name, Asset.type, Asset.floor, Asset.created_at).order_by(Asset.id)
+    ).all()
+    hist = db.session.execute(
+        select(AssetStateHistory.asset_id, AssetStateHistory.state, AssetStateHistory.changed_at)
+        .order_by(AssetStateHistory.asset_id, AssetStateHistory.changed_at, AssetStateHistory.id)
+    ).all()
+
+    now = datetime.now(timezone.utc).timestamp()
+    n = len(assets)
+    ids = np.fromiter((a[0] for a in assets), dtype=np.int64, count=n)
+    created = np.fromiter((_epoch(a[4]) for a in assets), dtype=np.float64, count=n)
+
+    failures = np.zeros(n, dtype=np.int64)
+    uptime = np.zeros(n)
+    downtime = np.zeros(n)
+    repeats = np.zeros(n, dtype=np.int64)
+    last_failure = np.full(n, np.nan)
+    per_month = np.zeros((n, months), dtype=np.int64)
+    labels = _month_labels(date.today(), months)
+
+    if hist and n:
+        h_aid = np.fromiter((r[0] for r in hist), dtype=np.int64, count=len(hist))
+        h_t = np.fromiter((_epoch(r[2]) for r in hist), dtype=np.float64, count=len(hist))
+        states = np.array([r[1] for r in hist], dtype=object)
+        pos = np.searchsorted(ids, h_aid)
+        known = (pos < n) & (ids[np.minimum(pos, n - 1)] == h_aid)  # assets borrados fuera
+        h_aid, h_t, states, pos = h_aid[known], h_t[known], states[known], pos[known]
+
+        if len(h_aid):
+            down = np.isin(states, DOWN_STATES)
+            failed = states == "failed"
+
+            # duración de cada estado = hasta el siguiente cambio del mismo asset (o ahora)
+            same_next = np.append(h_aid[1:] == h_aid[:-1], False)
+            nxt = np.where(same_next, np.append(h_t[1:], now), now)
+            dur = np.maximum(nxt - h_t, 0.0)
+            uptime = np.bincount(pos, weights=np.where(down, 0.0, dur), minlength=n)
+            downtime = np.bincount(pos, weights=np.where(down, dur, 0.0), minlength=n)
+
+            # antes del primer cambio: operativo desde el alta del asset
+            first = np.flatnonzero(np.insert(h_aid[1:] != h_aid[:-1], 0, True))
+            lead = np.nan_to_num(h_t[first] - created[pos[first]], nan=0.0)
+            uptime[pos[first]] += np.maximum(lead, 0.0)
+
+            f_pos, f_t = pos[failed], h_t[failed]
+            failures = np.bincount(f_pos, minlength=n)
+            if len(f_pos):
+                last_failure[f_pos] = f_t  # ordenado por fecha: queda la última
+                gap = np.diff(f_t)
+                rep = (f_pos[1:] == f_pos[:-1]) & (gap <= repeat_days * DAY)
+                repeats = np.bincount(f_pos[1:][rep], minlength=n)
+
+                f_month = f_t.astype("datetime64[s]").astype("datetime64[M]")
+                first_month = np.datetime64(labels[0], "M")
+                m_idx = (f_month - first_month).astype(np.int64)
+                in_range = (m_idx >= 0) & (m_idx < months)
+                np.add.at(per_month, (f_pos[in_range], m_idx[in_range]), 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mtbf = np.where(failures > 0, uptime / failures / DAY, np.nan)
+        mttr = np.where(failures > 0, downtime / failures / DAY, np.nan)
+        availability = np.where(uptime + downtime > 0, uptime / (uptime + downtime), np.nan)
+
+    def num(x, digits=2):
+        return None if np.isnan(x) else round(float(x), digits)
+
+    rows = []
+    for i, a in enumerate(assets):
+        rows.append({
+            "asset_id": int(ids[i]),
+            "name": a[1],
+            "type": a[2],
+            "floor": a[3],
+            "failures": int(failures[i]),
+            "failures_recent": int(per_month[i].sum()),
+            "mtbf_days": num(mtbf[i], 1),
+            "mttr_days": num(mttr[i], 1),
+            "availability": num(availability[i], 4),
+            "repeat_failures": int(repeats[i]),
+            "repeat_failure": bool(repeats[i] > 0),
+            "last_failure_at": (
+                datetime.fromtimestamp(float(last_failure[i]), tz=timezone.utc).isoformat()
+                if not np.isnan(last_failure[i]) else None
+            ),
+            "failures_by_month": dict(zip(labels, per_month[i].tolist())),
+        })
+
+    by_type: Dict[str, Dict[str, Any]] = {}
+    types = np.array([a[2] or "" for a in assets], dtype=object)
+    for t in sorted(set(types.tolist())):
+        mask = types == t
+        f = failures[mask]
+        up = uptime[mask].sum()
+        by_type[t or "Unspecified"] = {
+            "assets": int(mask.sum()),
+            "failures": int(f.sum()),
+            "failures_recent": int(per_month[mask].sum()),
+            "failures_per_asset": round(float(f.mean()), 2) if mask.any() else 0.0,
+            "mtbf_days": round(float(up / f.sum() / DAY), 1) if f.sum() else None,
+            "repeat_failure_assets": int((repeats[mask] > 0).sum()),
+        }
+
+    return {
+        "months": labels,
+        "repeat_days": repeat_days,
+        "assets": rows,
+        "index": {r["asset_id"]: i for i, r in enumerate(rows)},
+        "by_type": by_type,
+    }
+
+
+def fleet_reliability(months: int = 12, repeat_days: int = 90) -> Dict[str, Any]:
+    key = f"asset_reliability:{date.today().isoformat()}:{months}:{repeat_days}"
+    return cached(
+        key,
+        (AssetStateHistory.__tablename__, Asset.__tablename__),
+        lambda: _compute(months, repeat_days),
+    )
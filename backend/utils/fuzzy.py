@@ -0,0 +1,197 @@
+# backend/utils/fuzzy.py
+# -*- coding: utf-8 -*-
+"""
+Búsqueda difusa (tolerante a errores de tipeo) con índice de trigramas.
+
+- PostgreSQL: pg_trgm. Índices GIN `gin_trgm_ops` por columna, declarados en
+  los modelos (y creados por la migración c9e5a1f7d342); el filtro `q <% col OR col ILIKE '%q%'` usa esos índices
+  (BitmapOr) y el orden es word_similarity(q, col) ponderada por columna.
+- SQLite: tabla FTS5 `<tabla>_fuzzy` con tokenizer trigram (contenido
+  externo, mantenida por triggers). Se buscan candidatos que compartan algún
+  trigrama con la consulta y se puntúan en Python con la misma similitud.
+- Sin pg_trgm / FTS5 (o consultas de < 3 letras): ILIKE, como antes.
+
+"extingusher" encuentra "Fire Extinguisher" (similitud 0.67 > FUZZY_THRESHOLD).
+"""
+from __future__ import annotations
+import re
+import threading
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import DDL, case, event, func, literal, or_, select, text
+
+from backend.extensions import db
+from backend.models.asset import Asset
+from backend.models.manual import Manual
+from backend.models.quote import Quote
+from backend.models.sop import SOP
+from backend.utils.prefix_index import norm_name
+
+FUZZY_THRESHOLD = 0.45   # word_similarity mínima para considerar un resultado
+SQLITE_CANDIDATES = 500  # candidatos FTS5 que se puntúan en Python
+
+_WORD = re.compile(r"[0-9a-z]+")
+_lock = threading.Lock()
+_backend: Dict[Tuple[str, str], str] = {}  # (url del engine, tabla) -> pg_trgm | fts5 | like
+
+
+def trigrams(text_: str) -> Set[str]:
+    """Trigramas al estilo pg_trgm: cada palabra con "  " delante y " " detrás."""
+    out: Set[str] = set()
+    for w in _WORD.findall(norm_name(text_)):
+        w = f"  {w} "
+        out.update(w[i:i + 3] for i in range(len(w) - 2))
+    return out
+
+
+def similarity(a: str, b: str) -> float:
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def word_similarity(q: str, value: str | None) -> float:
+    """Mejor similitud entre `q` y cualquier tramo de `value` con el mismo número de palabras."""
+    words = _WORD.findall(norm_name(value))
+    n = max(1, len(_WORD.findall(norm_name(q))))
+    if not words:
+        return 0.0
+    spans = [" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))]
+    return max(similarity(q, s) for s in spans)
+
+
+class FuzzyIndex:
+    def __init__(self, model, weights: Dict[str, float]):
+        self.model = model
+        self.table = model.__tablename__
+        self.weights = weights  # columna -> peso en el ranking
+        self.fts = f"{self.table}_fuzzy"
+        # Los índices GIN gin_trgm_ops del modelo necesitan la extensión antes del CREATE
+        event.listen(model.__table__, "before_create",
+                     DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+        event.listen(model.__table__, "after_create", self._after_create)
+
+    # ---------- esquema ----------
+    def sqlite_ddl(self) -> List[str]:
+        cols = list(self.weights)
+        names = ", ".join(cols)
+        new = ", ".join(f"new.{c}" for c in cols)
+        old = ", ".join(f"old.{c}" for c in cols)
+        t, f = self.table, self.fts
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {f} USING fts5({names}, "
+            f"content='{t}', content_rowid='id', tokenize='trigram')",
+            f'CREATE TRIGGER IF NOT EXISTS {f}_ai AFTER INSERT ON "{t}" BEGIN '
+            f"INSERT INTO {f}(rowid, {names}) VALUES (new.id, {new}); END",
+            f'CREATE TRIGGER IF NOT EXISTS {f}_ad AFTER DELETE ON "{t}" BEGIN '
+            f"INSERT INTO {f}({f}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+            f'CREATE TRIGGER IF NOT EXISTS {f}_au AFTER UPDATE OF {names} ON "{t}" BEGIN '
+            f"INSERT INTO {f}({f}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {f}(rowid, {names}) VALUES (new.id, {new}); END",
+            f"INSERT INTO {f}({f}) VALUES ('rebuild')",
+        ]
+
+    def _after_create(self, target, connection, **kw):
+        # Bases creadas con db.create_all() (desarrollo); las demás vía migración
+        if connection.dialect.name == "sqlite":
+            try:
+                for stmt in self.sqlite_ddl():
+                    connection.exec_driver_sql(stmt)
+            except Exception as e:  # SQLite sin FTS5/trigram: queda ILIKE
+                print(f"[fuzzy] {self.fts} not created: {e}")
+
+    def backend(self) -> str:
+        key = (str(db.engine.url), self.table)
+        hit = _backend.get(key)
+        if hit:
+            return hit
+        dialect = db.engine.dialect.name
+        found = "like"
+        if dialect == "postgresql":
+            if db.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                found = "pg_trgm"
+        elif dialect == "sqlite":
+            if db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": self.fts}
+            ).first():
+                found = "fts5"
+        with _lock:
+            _backend[key] = found
+        return found
+
+    # ---------- consulta ----------
+    def _columns(self):
+        return [(getattr(self.model, c), w) for c, w in self.weights.items()]
+
+    def _like(self, q: str):
+        like = f"%{q}%"
+        cols = self._columns()
+        cond = or_(*[col.ilike(like) for col, _ in cols])
+        # Coincidencia al inicio primero
+        rank = case(*[(col.ilike(f"{q}%"), w) for col, w in cols], else_=0.5)
+        return cond, rank
+
+    def _pg(self, q: str):
+        db.session.execute(select(func.set_config(
+            "pg_trgm.word_similarity_threshold", str(FUZZY_THRESHOLD), True
+        )))
+        like = f"%{q}%"
+        cols = self._columns()
+        cond = or_(*[
+            or_(literal(q).op("<%", is_comparison=True)(col), col.ilike(like)) for col, _ in cols
+        ])
+        rank = func.greatest(*[func.word_similarity(q, col) * w for col, w in cols])
+        return cond, rank
+
+    def _sqlite(self, q: str):
+        grams = sorted({g for g in trigrams(q) if g.strip() and " " not in g})
+        if not grams:
+            return None
+        cols = list(self.weights)
+        match = " OR ".join('"' + g.replace('"', '""') + '"' for g in grams)
+        rows = db.session.execute(
+            text(f"SELECT rowid, {', '.join(cols)} FROM {self.fts} WHERE {self.fts} MATCH :m "
+                 f"ORDER BY rank LIMIT :n"),
+            {"m": match, "n": SQLITE_CANDIDATES},
+        ).all()
+        needle = norm_name(q)
+        scores: Dict[int, float] = {}
+        for r in rows:
+            best, hit = 0.0, False
+            for i, c in enumerate(cols):
+                value = r[i + 1]
+                s = 1.0 if needle and needle in norm_name(value) else word_similarity(q, value)
+                hit = hit or s >= FUZZY_THRESHOLD
+                best = max(best, s * self.weights[c])
+            if hit:
+                scores[r[0]] = round(best, 4)
+        pk = self.model.id
+        if not scores:
+            return pk.is_(None), literal(0)
+        return pk.in_(list(scores)), case(scores, value=pk, else_=0)
+
+    def match(self, q: str):
+        """(condición, expresión de ranking) para filtrar y ordenar por similitud."""
+        q = (q or "").strip()
+        kind = self.backend()
+        if kind == "pg_trgm":
+            return self._pg(q)
+        if kind == "fts5" and len(norm_name(q).replace(" ", "")) >= 3:
+            found = self._sqlite(q)
+            if found is not None:
+                return found
+        return self._like(q)
+
+    def search(self, query, q: str):
+        """`query` filtrada por `q`; devuelve (query, rank) para ordenar por rank desc."""
+        cond, rank = self.match(q)
+        return query.filter(cond), rank
+
+
+FUZZY: Dict[str, FuzzyIndex] = {
+    "asset": FuzzyIndex(Asset, {"name": 1.0}),
+    "manual": FuzzyIndex(Manual, {"title": 1.0, "description": 0.7}),
+    "sop": FuzzyIndex(SOP, {"title": 1.0, "description": 0.7}),
+    "quote": FuzzyIndex(Quote, {"quote_number": 1.0, "scope_title": 1.0, "scope_detail": 0.7}),
+}
@@ -0,0 +1,40 @@
+# backend/utils/grid.py
+# -*- coding: utf-8 -*-
+"""
+Codificación columnar compacta para endpoints tipo grilla.
+
+En vez de una lista de dicts repite cada valor categórico una sola vez:
+    {"statuses": ["Not Started", "Completed"], "rooms": ["201", "202"], "codes": [0, 1]}
+`codes[i]` es el índice en el diccionario del valor de `rooms[i]`. El
+diccionario arranca con `preset` (orden estable entre respuestas) y agrega
+valores nuevos en orden de aparición.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+
+def dictionary_encode(values: Iterable[Hashable], preset: Sequence[Hashable] = ()) -> Tuple[List[Any], List[int]]:
+    dictionary: List[Any] = list(preset)
+    index: Dict[Any, int] = {v: i for i, v in enumerate(dictionary)}
+    codes: List[int] = []
+    for v in values:
+        code = index.get(v)
+        if code is None:
+            code = index[v] = len(dictionary)
+            dictionary.append(v)
+        codes.append(code)
+    return dictionary, codes
+
+
+def grid_payload(
+    keys: Sequence[Any],
+    values: Sequence[Hashable],
+    *,
+    key_name: str = "keys",
+    dict_name: str = "values",
+    preset: Sequence[Hashable] = (),
+    **extra,
+) -> Dict[str, Any]:
+    """{"format": "grid", dict_name: [...], key_name: keys, "codes": [...], **extra}."""
+    dictionary, codes = dictionary_encode(values, preset)
+    return {"format": "grid", dict_name: dictionary, key_name: list(keys), "codes": codes, **extra}
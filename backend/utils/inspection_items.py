@@ -0,0 +1,166 @@
+# backend/utils/inspection_items.py
+# -*- coding: utf-8 -*-
+"""
+Materialización de los ítems de una inspección.
+
+Se hace UNA vez, al crear la inspección y en su misma transacción, con un
+único INSERT INTO inspection_item ... SELECT FROM asset WHERE <alcance>.
+El índice único (inspection_id, asset_id) impide duplicados aunque dos
+procesos lo intenten a la vez; el NOT EXISTS lo hace idempotente.
+
+Cada cambio de un ítem pasa por `touch_item` (o su equivalente en lote):
+sube `version` y sella la hora del campo, que es lo que usa el sync offline.
+La tabla está versionada por inspección (backend/utils/versions.py, ámbito
+inspection_id), así que los deltas desde un cursor salen de change_log y no
+los afectan los cambios de otras inspecciones.
+
+Los contadores de Inspection (items_total/open/ok/fail/na/ooo) se ajustan
+con deltas atómicos (col = col + d) en la misma transacción que el cambio
+de ítems; progress se recalcula en ese mismo UPDATE.
+"""
+from __future__ import annotations
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import and_, case, exists, false, func, insert, literal, select, update
+
+from backend.extensions import db
+from backend.models.asset import Asset
+from backend.models.inspection import Inspection
+from backend.models.inspection_item import InspectionItem
+from backend.utils.schema import require
+from backend.utils.versions import record, track
+
+track(InspectionItem, scope="inspection_id")
+require("inspection", "items_total", "items_open", "items_ok", "items_fail", "items_na", "items_ooo")
+require("inspection_item", "version", "status_at", "notes_at")
+
+SYNC_FIELDS = ("status", "notes")  # campos con hora propia (<campo>_at)
+
+STATUS_COUNTERS = {
+    "open": "items_open",
+    "ok": "items_ok",
+    "fail": "items_fail",
+    "na": "items_na",
+    "ooo": "items_ooo",
+}
+
+ITEM_COLUMNS = [
+    "inspection_id", "asset_id", "name", "label", "floor", "area", "type",
+    "status", "notes", "photos", "updated_by", "created_at", "updated_at",
+]
+
+
+def scope_filter(ins: Inspection):
+    """Condición sobre Asset para el alcance de la inspección."""
+    if ins.scope_type == "floors":
+        floors = [str(f) for f in (ins.floors or [])]
+        return Asset.floor.in_(floors) if floors else false()
+    if ins.scope_type == "area":
+        return Asset.area == ins.scope_value
+    if ins.scope_type == "type":
+        return Asset.type == ins.scope_value
+    return false()
+
+
+def materialize_items(ins: Inspection, who: str | None = None) -> int:
+    """Crea los ítems que falten para `ins` (no hace commit). Devuelve cuántos insertó."""
+    now = datetime.utcnow()
+    already = exists().where(and_(
+        InspectionItem.inspection_id == ins.id,
+        InspectionItem.asset_id == Asset.id,
+    ))
+    sel = (
+        select(
+            literal(ins.id), Asset.id, Asset.name, Asset.name,
+            Asset.floor, Asset.area, Asset.type,
+            literal("open"), literal(""),
+            literal([], type_=InspectionItem.photos.type),
+            literal(who or ins.started_by_name or "system"),
+            literal(now), literal(now),
+        )
+        .where(scope_filter(ins), ~already)
+        .order_by(Asset.name.asc(), Asset.id.asc())
+    )
+    # RETURNING: los ids nuevos van a change_log en vez de un cambio masivo ("*"),
+    # que obligaría a todos los dispositivos a descargar la inspección entera
+    ids = db.session.execute(
+        insert(InspectionItem).from_select(ITEM_COLUMNS, sel)
+        .returning(InspectionItem.id)
+        .execution_options(versions_logged=True)
+    ).scalars().all()
+    record(db.session, InspectionItem.__tablename__, ids, scope=ins.id)
+    return len(ids)
+
+
+def touch_item(item: InspectionItem, fields: Iterable[str], who: str, now: datetime | None = None) -> None:
+    """Marca un cambio en `item`: updated_by/at, version + 1 y <campo>_at de los campos tocados."""
+    now = now or datetime.utcnow()
+    item.updated_by = who
+    item.updated_at = now
+    item.version = (item.version or 0) + 1
+    for f in fields:
+        if f in SYNC_FIELDS:
+            setattr(item, f"{f}_at", now)
+
+
+def status_deltas(transitions: Iterable[Tuple[str | None, str | None]]) -> Dict[str, int]:
+    """[(estado_anterior, estado_nuevo), ...] -> {estado: delta}; None = ítem inexistente."""
+    deltas: Counter = Counter()
+    for old, new in transitions:
+        if old == new:
+            continue
+        if old in STATUS_COUNTERS:
+            deltas[old] -= 1
+        if new in STATUS_COUNTERS:
+            deltas[new] += 1
+    return {k: v for k, v in deltas.items() if v}
+
+
+def apply_counter_deltas(inspection_id: int, deltas: Dict[str, int], total_delta: int = 0) -> None:
+    """
+    UPDATE inspection SET items_x = items_x + :d, ..., progress = <derivado>
+    (un solo statement; no hace commit). Una inspección completada queda en 100.
+    """
+    if not deltas and not total_delta:
+        return
+    values = {}
+    for status, d in deltas.items():
+        col = getattr(Inspection, STATUS_COUNTERS[status])
+        values[col.key] = col + d
+    new_total = Inspection.items_total + total_delta
+    new_open = Inspection.items_open + deltas.get("open", 0)
+    if total_delta:
+        values["items_total"] = new_total
+    values["progress"] = case(
+        (Inspection.status == "completed", 100),
+        (new_total > 0, ((new_total - new_open) * 100) / new_total),
+        else_=Inspection.progress,
+    )
+    values["updated_at"] = datetime.utcnow()
+    db.session.execute(
+        update(Inspection).where(Inspection.id == inspection_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount(inspection_id: int) -> None:
+    """Recalcula los contadores desde inspection_item (backfill / reparación)."""
+    counts = dict(
+        db.session.query(InspectionItem.status, func.count())
+        .filter(InspectionItem.inspection_id == inspection_id)
+        .group_by(InspectionItem.status)
+        .all()
+    )
+    total = sum(counts.values())
+    values = {col: counts.get(status, 0) for status, col in STATUS_COUNTERS.items()}
+    values["items_total"] = total
+    values["progress"] = case(
+        (Inspection.status == "completed", 100),
+        else_=int(100 * (total - values["items_open"]) / total) if total else Inspection.progress,
+    )
+    db.session.execute(
+        update(Inspection).where(Inspection.id == inspection_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,157 @@
+# backend/utils/inventory_usage.py
+# -*- coding: utf-8 -*-
+"""
+Rollup diario de consumo de inventario + forecast de reorden.
+
+- `rollup_usage()` pliega InventoryLog (in/out/set) en inventory_daily_usage con
+  un único INSERT ... SELECT ... GROUP BY en la BD. Es idempotente: re-calcula
+  desde el día anterior a la última corrida, así que los movimientos que
+  llegan tarde también se cuentan.
+- `forecast()` lee SOLO los agregados y calcula, vectorizado con NumPy para
+  todos los ítems a la vez: uso diario medio, días hasta llegar a `minimum` y
+  cantidad sugerida de reorden.
+"""
+from __future__ import annotations
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import case, delete, func, insert, select
+
+from backend.extensions import db
+from backend.models.inventory import InventoryItem
+from backend.models.inventory_log import InventoryLog
+from backend.models.inventory_usage import InventoryDailyUsage, InventoryRollupState
+from backend.utils.schema import require
+
+try:
+    import numpy as np
+except ImportError:  # dependencia opcional: solo la necesita forecast()
+    np = None
+
+JOB_NAME = "daily_usage"
+
+require("inventory_daily_usage", "item_db_id", "day", "qty_in", "qty_out", "qty_set", "moves")
+require("inventory_rollup_state", "name", "last_day")
+
+
+def rollup_usage(full: bool = False) -> dict:
+    """Recalcula los agregados diarios desde la última marca de agua (o todo si full)."""
+    state = db.session.get(InventoryRollupState, JOB_NAME)
+    since = None
+    if state and state.last_day and not full:
+        since = state.last_day - timedelta(days=1)
+
+    day_expr = func.date(InventoryLog.created_at)
+    amount = func.abs(InventoryLog.delta)
+    sel = (
+        select(
+            InventoryLog.item_db_id,
+            day_expr,
+            func.coalesce(func.sum(case((InventoryLog.action == "in", amount), else_=0)), 0),
+            func.coalesce(func.sum(case((InventoryLog.action == "out", amount), else_=0)), 0),
+            func.coalesce(func.sum(case((InventoryLog.action == "set", InventoryLog.delta), else_=0)), 0),
+            func.count(),
+        )
+        .where(InventoryLog.action.in_(("in", "out", "set")), InventoryLog.delta.isnot(None))
+        .group_by(InventoryLog.item_db_id, day_expr)
+    )
+    purge = delete(InventoryDailyUsage)
+    if since is not None:
+        sel = sel.where(InventoryLog.created_at >= datetime.combine(since, datetime.min.time()))
+        purge = purge.where(InventoryDailyUsage.day >= since)
+
+    db.session.execute(purge)
+    result = db.session.execute(
+        insert(InventoryDailyUsage).from_select(
+            ["item_db_id", "day", "qty_in", "qty_out", "qty_set", "moves"], sel
+        )
+    )
+
+    today = date.today()
+    if state is None:
+        state = InventoryRollupState(name=JOB_NAME)
+        db.session.add(state)
+    state.last_day = today
+    db.session.commit()
+    return {
+        "since": since.isoformat() if since else None,
+        "rows": result.rowcount,
+        "last_day": today.isoformat(),
+    }
+
+
+def last_rollup_day() -> date | None:
+    state = db.session.get(InventoryRollupState, JOB_NAME)
+    return state.last_day if state else None
+
+
+def forecast(window: int = 90, lead_time: int = 7, cover: int = 30, z: float = 1.65) -> list[dict]:
+    """
+    Para cada ítem:
+      avg   = consumo(out) en la ventana / window
+      std   = desviación diaria (días sin movimiento cuentan como 0)
+      days_until_minimum = (stock - minimum) / avg
+      suggested_reorder_qty = ceil(avg * (lead_time + cover) + minimum + z·std·√lead_time - stock)
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+
+    items = db.session.query(
+        InventoryItem.id, InventoryItem.item_id, InventoryItem.name,
+        InventoryItem.stock, InventoryItem.minimum,
+    ).order_by(InventoryItem.id).all()
+    if not items:
+        return []
+
+    ids = np.fromiter((r[0] for r in items), dtype=np.int64, count=len(items))
+    stock = np.fromiter(((r[3] or 0) for r in items), dtype=np.float64, count=len(items))
+    minimum = np.fromiter(((r[4] or 0) for r in items), dtype=np.float64, count=len(items))
+
+    today = date.today()
+    start = today - timedelta(days=window)
+    # day > start: exactamente `window` días (hoy incluido), los mismos que divide avg
+    usage = db.session.query(InventoryDailyUsage.item_db_id, InventoryDailyUsage.qty_out).filter(
+        InventoryDailyUsage.day > start, InventoryDailyUsage.qty_out > 0
+    ).all()
+
+    n = len(items)
+    total = np.zeros(n)
+    sumsq = np.zeros(n)
+    if usage:
+        u_ids = np.fromiter((r[0] for r in usage), dtype=np.int64, count=len(usage))
+        u_out = np.fromiter((r[1] for r in usage), dtype=np.float64, count=len(usage))
+        pos = np.searchsorted(ids, u_ids)
+        known = (pos < n) & (ids[np.minimum(pos, n - 1)] == u_ids)  # ítems borrados fuera
+        total = np.bincount(pos[known], weights=u_out[known], minlength=n)
+        sumsq = np.bincount(pos[known], weights=u_out[known] ** 2, minlength=n)
+
+    avg = total / window
+    std = np.sqrt(np.maximum(sumsq / window - avg ** 2, 0.0))
+    headroom = np.maximum(stock - minimum, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.where(avg > 0, headroom / avg, np.inf)
+    safety = z * std * np.sqrt(lead_time)
+    target = avg * (lead_time + cover) + minimum + safety
+    reorder_qty = np.maximum(np.ceil(target - stock), 0).astype(np.int64)
+    reorder_now = (days <= lead_time) | (stock <= minimum)
+
+    order = np.argsort(days, kind="stable")
+    out = []
+    horizon = (date.max - today).days  # más allá, la fecha no es representable
+    for i in order.tolist():
+        d = days[i]
+        finite = bool(np.isfinite(d))
+        reached = today + timedelta(days=int(d)) if finite and d <= horizon else None
+        out.append({
+            "id": int(ids[i]),
+            "item_id": items[i][1],
+            "name": items[i][2],
+            "stock": int(stock[i]),
+            "minimum": int(minimum[i]),
+            "avg_daily_usage": round(float(avg[i]), 3),
+            "std_daily_usage": round(float(std[i]), 3),
+            "days_until_minimum": round(float(d), 1) if finite else None,
+            "minimum_reached_on": reached.isoformat() if reached else None,
+            "suggested_reorder_qty": int(reorder_qty[i]),
+            "reorder_now": bool(reorder_now[i]),
+        })
+    return out
@@ -0,0 +1,224 @@
+# backend/utils/pagination.py
+# -*- coding: utf-8 -*-
+"""
+Paginación keyset (seek) con cursores opacos.
+
+El cursor codifica los valores de las columnas de orden de la última fila
+devuelta; la siguiente página se pide con `(cols) < (valores)` sobre un
+índice compuesto, así que el costo no crece con la profundidad (sin OFFSET).
+
+`paginate()` es el listado estándar (assets, SOPs): orden solo por claves de
+una lista blanca (cada una respaldada por un índice, con id de desempate),
+cursor opaco y total cacheado por hash de filtros hasta que cambie la versión
+de la tabla (backend/utils/versions.py).
+"""
+from __future__ import annotations
+import base64
+import hashlib
+import json
+from datetime import datetime, date
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Sequence
+
+from flask import request
+from sqlalchemy import tuple_
+
+from backend.extensions import db
+from backend.utils.versions import cached
+
+
+class CursorError(ValueError):
+    """Cursor mal formado o de otra consulta."""
+
+
+def _enc(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"$dt": v.isoformat()}
+    if isinstance(v, date):
+        return {"$d": v.isoformat()}
+    return v
+
+
+def _dec(v: Any) -> Any:
+    if isinstance(v, dict):
+        if "$dt" in v:
+            return datetime.fromisoformat(v["$dt"])
+        if "$d" in v:
+            return date.fromisoformat(v["$d"])
+    return v
+
+
+def encode_cursor(values: Sequence[Any], tag: str | None = None) -> str:
+    values = [tag, *values] if tag is not None else list(values)
+    raw = json.dumps([_enc(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str | None, size: int, tag: str | None = None) -> List[Any] | None:
+    """`tag` (p. ej. el orden) ata el cursor a la consulta que lo generó."""
+    if not token:
+        return None
+    try:
+        pad = "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(token + pad))
+        if tag is not None:
+            if not isinstance(values, list) or not values or values[0] != tag:
+                raise ValueError
+            values = values[1:]
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [_dec(v) for v in values]
+    except Exception:
+        raise CursorError("invalid cursor")
+
+
+def limit_arg(default: int = 50, maximum: int = 200, name: str = "limit") -> int:
+    try:
+        return min(maximum, max(1, int(request.args.get(name, default))))
+    except Exception:
+        return default
+
+
+def keyset_page(
+    query,
+    columns: Sequence,
+    *,
+    cursor: str | None,
+    limit: int,
+    descending: bool = True,
+    key: Callable[[Any], Sequence[Any]] | None = None,
+    tag: str | None = None,
+    offset: int = 0,
+):
+    """
+    Ordena `query` por `columns` (la última debe ser única, p. ej. id) y
+    devuelve (rows, next_cursor). `key(row)` extrae los valores del cursor;
+    por defecto lee los atributos con el mismo nombre que cada columna.
+    `offset` solo existe para clientes que aún piden ?page=N.
+    """
+    after = decode_cursor(cursor, len(columns), tag)
+    if after is not None:
+        cond = tuple_(*columns) < tuple_(*after) if descending else tuple_(*columns) > tuple_(*after)
+        query = query.filter(cond)
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = key(last) if key else [getattr(last, c.key) for c in columns]
+        next_cursor = encode_cursor(values, tag)
+    return rows, next_cursor
+
+
+def estimated_count(query) -> int:
+    """
+    Total aproximado sin COUNT(*): en PostgreSQL usa la estimación de filas
+    del planner (EXPLAIN, basada en pg_statistic). En otros dialectos (SQLite
+    de desarrollo) cae a un COUNT exacto.
+    """
+    query = query.order_by(None)
+    if db.engine.dialect.name != "postgresql":
+        return query.count()
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    row = db.session.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).first()
+    plan = row[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class SortKey(NamedTuple):
+    """Clave de orden permitida: expresión indexada y atributo de la fila."""
+    expr: Any
+    attr: str
+    null: Any = None  # valor que la expresión usa para NULL (COALESCE)
+    # attr=None: expresión calculada (p. ej. relevancia); solo ?page, sin cursor
+
+
+def parse_order(order: str | None, sorts: Mapping[str, SortKey], default: str):
+    """"-name" -> ("-name", SortKey, descending). Claves fuera de la lista blanca usan `default`."""
+    field = (order or "").strip()
+    name = field.lstrip("-")
+    if name not in sorts:
+        field = default
+        name = field.lstrip("-")
+    return field, sorts[name], field.startswith("-")
+
+
+def cached_count(query, table: str, filters: Mapping[str, Any]) -> int:
+    """COUNT(*) de `query`, cacheado por (tabla, filtros) hasta que cambie la tabla."""
+    raw = json.dumps(filters, sort_keys=True, default=str, separators=(",", ":"))
+    key = f"count:{table}:{hashlib.sha1(raw.encode()).hexdigest()}"
+    return cached(key, (table,), lambda: query.order_by(None).count())
+
+
+def _int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def paginate(
+    query,
+    params: Mapping[str, Any],
+    *,
+    pk,
+    sorts: Mapping[str, SortKey],
+    default_order: str,
+    table: str,
+    filters: Mapping[str, Any],
+    default_size: int = 50,
+    max_size: int = 200,
+) -> Dict[str, Any]:
+    """
+    Página de `query` según `params` (args del request o cuerpo JSON):
+      - order=-created_at | name | ... (lista blanca `sorts`)
+      - page_size (alias limit), máx. `max_size`
+      - cursor: página siguiente en modo keyset (next_cursor de la anterior)
+      - page: compatibilidad con OFFSET; también devuelve next_cursor
+      - count=none: omite el total
+    Devuelve {rows, total, page, page_size, next_cursor, order}. Lanza
+    CursorError si el cursor no corresponde a este orden.
+    """
+    order, sort, descending = parse_order(params.get("order"), sorts, default_order)
+    size = min(max_size, max(1, _int(params.get("page_size", params.get("limit")), default_size)))
+    cursor = params.get("cursor") or None
+    page = None if cursor else max(1, _int(params.get("page"), 1))
+
+    total = None
+    if str(params.get("count") or "").lower() != "none":
+        total = cached_count(query, table, filters)
+
+    columns = [sort.expr, pk]
+    if sort.attr is None:
+        if cursor:
+            raise CursorError("invalid cursor")
+        ordered = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+        rows = ordered.offset((page - 1) * size).limit(size).all()
+        return {
+            "rows": rows, "total": total, "page": page, "page_size": size,
+            "next_cursor": None, "order": order,
+        }
+
+    def key(row):
+        value = getattr(row, sort.attr)
+        return [sort.null if value is None else value, getattr(row, pk.key)]
+
+    rows, next_cursor = keyset_page(
+        query, columns, cursor=cursor, limit=size, descending=descending, key=key,
+        tag=order, offset=(page - 1) * size if page else 0,
+    )
+    return {
+        "rows": rows,
+        "total": total,
+        "page": page,
+        "page_size": size,
+        "next_cursor": next_cursor,
+        "order": order,
+    }
@@ -0,0 +1,194 @@
+# backend/utils/prefix_index.py
+# -*- coding: utf-8 -*-
+"""
+Índice de prefijos en memoria (por proceso) para autocompletado.
+
+Cada índice guarda una lista ordenada de (clave_normalizada, rango, id) y
+resuelve un prefijo con bisect: O(log n + k) sin tocar la BD. Se mantiene
+al día con backend/utils/versions.py: si la versión de la tabla cambió se
+recargan SOLO las filas tocadas (change_log); si hubo un cambio masivo o
+el log ya se podó, se reconstruye entero.
+
+Claves:
+- códigos (item_id, part_no): minúsculas, sin acentos ni separadores
+  ("FLT-20x25" -> "flt20x25"), rango 0;
+- nombres: minúsculas, sin acentos, indexados desde cada inicio de palabra
+  ("Rooftop Air Handler" -> "rooftop air handler", "air handler",
+  "handler"); rango 1 para el nombre completo y 2 para palabras internas.
+"""
+from __future__ import annotations
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import select
+
+from backend.extensions import db
+from backend.models.asset import Asset
+from backend.models.inventory import InventoryItem
+from backend.models.vendor import Vendor
+from backend.utils.versions import changes_since, current_version, track
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+SCAN_FACTOR = 20  # se leen a lo sumo limit*SCAN_FACTOR coincidencias antes de rankear
+
+
+def _fold(text) -> str:
+    s = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+
+
+def norm_code(text) -> str:
+    return _NON_ALNUM.sub("", _fold(text))
+
+
+def norm_name(text) -> str:
+    return _NON_ALNUM.sub(" ", _fold(text)).strip()
+
+
+def _name_keys(text) -> List[Tuple[str, int]]:
+    name = norm_name(text)
+    if not name:
+        return []
+    keys = [(name, 1)]
+    for m in re.finditer(r" (?=\S)", name):
+        keys.append((name[m.end():], 2))
+    return keys
+
+
+class PrefixIndex:
+    def __init__(self, model, columns, codes: Tuple[str, ...], names: Tuple[str, ...],
+                 payload: Callable[[tuple], dict]):
+        self.model = model
+        self.table = model.__tablename__
+        self.columns = columns
+        self.codes = codes
+        self.names = names
+        self.payload = payload
+
+        self._lock = threading.Lock()
+        self._version: int | None = None  # None = nunca cargado
+        self._entries: List[Tuple[str, int, int]] = []   # (clave, rango, id) ordenado
+        self._keys_by_id: Dict[int, List[Tuple[str, int, int]]] = {}
+        self._rows: Dict[int, dict] = {}
+
+    # ---------- mantenimiento ----------
+    def _keys_for(self, row: dict) -> List[Tuple[str, int, int]]:
+        out = set()
+        for f in self.codes:
+            k = norm_code(row.get(f))
+            if k:
+                out.add((k, 0, row["id"]))
+        for f in self.names:
+            for k, rank in _name_keys(row.get(f)):
+                out.add((k, rank, row["id"]))
+        return sorted(out)
+
+    def _remove(self, rid: int) -> None:
+        for entry in self._keys_by_id.pop(rid, ()):
+            i = bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+        self._rows.pop(rid, None)
+
+    def _put(self, row: dict) -> None:
+        self._remove(row["id"])
+        keys = self._keys_for(row)
+        for entry in keys:
+            insort(self._entries, entry)
+        self._keys_by_id[row["id"]] = keys
+        self._rows[row["id"]] = row
+
+    def _load(self, ids=None) -> List[dict]:
+        stmt = select(*self.columns)
+        if ids is not None:
+            stmt = stmt.where(self.model.id.in_(list(ids)))
+        return [self.payload(r) for r in db.session.execute(stmt)]
+
+    def _rebuild(self) -> None:
+        rows = self._load()
+        entries, by_id = [], {}
+        for row in rows:
+            keys = self._keys_for(row)
+            entries.extend(keys)
+            by_id[row["id"]] = keys
+        entries.sort()
+        self._entries, self._keys_by_id = entries, by_id
+        self._rows = {r["id"]: r for r in rows}
+
+    def refresh(self) -> None:
+        version = current_version(self.table)
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            ids = changes_since(self.table, self._version) if self._version else None
+            if ids is None:
+                self._rebuild()
+            elif ids:
+                fresh = {r["id"]: r for r in self._load(ids)}
+                for rid in ids:
+                    if rid in fresh:
+                        self._put(fresh[rid])
+                    else:
+                        self._remove(rid)
+            self._version = version
+
+    # ---------- consulta ----------
+    def _scan(self, prefix: str, cap: int, hits: Dict[int, tuple]) -> None:
+        i = bisect_left(self._entries, (prefix,))
+        seen = 0
+        while i < len(self._entries) and seen < cap:
+            key, rank, rid = self._entries[i]
+            if not key.startswith(prefix):
+                break
+            score = (key != prefix, rank, len(key), key)
+            if rid not in hits or score < hits[rid]:
+                hits[rid] = score
+            i += 1
+            seen += 1
+
+    def search(self, q: str, limit: int = 10) -> List[dict]:
+        self.refresh()
+        code_q, name_q = norm_code(q), norm_name(q)
+        if not code_q:
+            return []
+        hits: Dict[int, tuple] = {}
+        with self._lock:
+            cap = limit * SCAN_FACTOR
+            self._scan(code_q, cap, hits)
+            if name_q and name_q != code_q:
+                self._scan(name_q, cap, hits)
+            ranked = sorted(hits.items(), key=lambda kv: kv[1])[:limit]
+            return [self._rows[rid] for rid, _ in ranked]
+
+    def stats(self) -> dict:
+        return {"version": self._version, "rows": len(self._rows), "keys": len(self._entries)}
+
+
+INDEXES: Dict[str, PrefixIndex] = {
+    "item": PrefixIndex(
+        InventoryItem,
+        (InventoryItem.id, InventoryItem.item_id, InventoryItem.name,
+         InventoryItem.part_no, InventoryItem.stock),
+        codes=("item_id", "part_no"), names=("name",),
+        payload=lambda r: {"id": r[0], "item_id": r[1], "name": r[2], "part_no": r[3], "stock": r[4]},
+    ),
+    "asset": PrefixIndex(
+        Asset,
+        (Asset.id, Asset.name, Asset.floor, Asset.area, Asset.type),
+        codes=(), names=("name",),
+        payload=lambda r: {"id": r[0], "name": r[1], "floor": r[2], "area": r[3], "type": r[4]},
+    ),
+    "vendor": PrefixIndex(
+        Vendor,
+        (Vendor.id, Vendor.name),
+        codes=(), names=("name",),
+        payload=lambda r: {"id": r[0], "name": r[1]},
+    ),
+}
+
+track(InventoryItem, Asset, Vendor)
@@ -0,0 +1,209 @@
+# backend/utils/room_history.py
+# -*- coding: utf-8 -*-
+"""
+Reconstrucción del estado de habitaciones de un proyecto a una fecha
+(`as_of`) y serie de progreso por día/semana, a partir de ProjectRoomAudit.
+
+- Checkpoints diarios (project_room_checkpoint): foto completa al cierre de
+  cada día con cambios. Los días pasados no cambian (las auditorías solo se
+  agregan con la hora actual), así que se construyen una vez, de forma
+  incremental desde el último checkpoint, y nunca se invalidan.
+- `rooms_as_of(T)`: checkpoint del día anterior a T + última auditoría por
+  habitación en (checkpoint, T] con ROW_NUMBER() OVER (PARTITION BY room).
+  Usa el índice (project_id, room_number, created_at).
+
+Los límites de día son UTC, igual que datetime.utcnow() en el resto de rutas.
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.models.project import ProjectRoomAudit, ProjectRoomCheckpoint, ProjectRoomStatus
+from backend.utils.rooms import DEFAULT_STATUS, percent_complete
+from backend.utils.schema import require
+
+MAX_POINTS = 1000
+
+require("project_room_checkpoint", "project_id", "day", "room_number", "status", "updated_by", "changed_at")
+
+
+def _naive_utc(dt: datetime | None) -> datetime | None:
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _start(d: date) -> datetime:
+    return datetime.combine(d, time.min)
+
+
+def parse_ts(raw: str) -> datetime:
+    """ISO datetime o fecha (una fecha sola = fin de ese día). Lanza ValueError."""
+    s = str(raw).strip().replace("Z", "+00:00")
+    dt = datetime.fromisoformat(s)
+    if len(s) == 10:
+        dt = _start(dt.date() + timedelta(days=1)) - timedelta(microseconds=1)
+    return _naive_utc(dt)
+
+
+def _last_checkpoint_day(project_id: int, upto: date | None = None) -> date | None:
+    q = select(func.max(ProjectRoomCheckpoint.day)).where(ProjectRoomCheckpoint.project_id == project_id)
+    if upto is not None:
+        q = q.where(ProjectRoomCheckpoint.day <= upto)
+    return db.session.execute(q).scalar()
+
+
+def _checkpoint(project_id: int, day: date) -> Dict[str, dict]:
+    rows = db.session.execute(
+        select(
+            ProjectRoomCheckpoint.room_number, ProjectRoomCheckpoint.status,
+            ProjectRoomCheckpoint.updated_by, ProjectRoomCheckpoint.changed_at,
+        ).where(ProjectRoomCheckpoint.project_id == project_id, ProjectRoomCheckpoint.day == day)
+    )
+    return {
+        r.room_number: {"status": r.status, "updated_by": r.updated_by, "changed_at": r.changed_at}
+        for r in rows
+    }
+
+
+def ensure_checkpoints(project_id: int) -> int:
+    """
+    Construye los checkpoints que falten hasta ayer (UTC), partiendo del
+    último existente y leyendo solo las auditorías posteriores. Devuelve
+    cuántos días se agregaron.
+    """
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    last = _last_checkpoint_day(project_id)
+    if last is not None and last >= yesterday:
+        return 0
+
+    snap = _checkpoint(project_id, last) if last else {}
+    q = (
+        select(
+            ProjectRoomAudit.room_number, ProjectRoomAudit.new_status,
+            ProjectRoomAudit.updated_by, ProjectRoomAudit.created_at,
+        )
+        .where(
+            ProjectRoomAudit.project_id == project_id,
+            ProjectRoomAudit.created_at < _start(yesterday + timedelta(days=1)),
+        )
+        .order_by(ProjectRoomAudit.created_at, ProjectRoomAudit.id)
+    )
+    if last is not None:
+        q = q.where(ProjectRoomAudit.created_at >= _start(last + timedelta(days=1)))
+
+    rows: List[dict] = []
+    days = 0
+    current: date | None = None
+
+    def flush_day(d: date):
+        rows.extend(
+            {"project_id": project_id, "day": d, "room_number": rn, **state}
+            for rn, state in snap.items()
+        )
+
+    for a in db.session.execute(q):
+        at = _naive_utc(a.created_at)
+        if current is not None and at.date() != current:
+            flush_day(current)
+            days += 1
+        current = at.date()
+        snap[a.room_number] = {"status": a.new_status, "updated_by": a.updated_by, "changed_at": at}
+    if current is not None:
+        flush_day(current)
+        days += 1
+
+    if not rows:
+        return 0
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(ProjectRoomCheckpoint), rows)
+        db.session.commit()
+    except IntegrityError:
+        # Otro request construyó los mismos días en paralelo
+        db.session.rollback()
+        return 0
+    return days
+
+
+def rooms_as_of(project_id: int, at: datetime) -> Dict[str, dict]:
+    """{room_number: {status, updated_by, changed_at}} al instante `at` (solo habitaciones con cambios)."""
+    ensure_checkpoints(project_id)
+    base = _last_checkpoint_day(project_id, upto=at.date() - timedelta(days=1))
+    state = _checkpoint(project_id, base) if base else {}
+
+    rn = func.row_number().over(
+        partition_by=ProjectRoomAudit.room_number,
+        order_by=(ProjectRoomAudit.created_at.desc(), ProjectRoomAudit.id.desc()),
+    ).label("rn")
+    inner = select(
+        ProjectRoomAudit.room_number, ProjectRoomAudit.new_status,
+        ProjectRoomAudit.updated_by, ProjectRoomAudit.created_at, rn,
+    ).where(ProjectRoomAudit.project_id == project_id, ProjectRoomAudit.created_at <= at)
+    if base is not None:
+        inner = inner.where(ProjectRoomAudit.created_at >= _start(base + timedelta(days=1)))
+    sub = inner.subquery()
+    for r in db.session.execute(select(sub).where(sub.c.rn == 1)):
+        state[r.room_number] = {
+            "status": r.new_status, "updated_by": r.updated_by, "changed_at": _naive_utc(r.created_at),
+        }
+    return state
+
+
+def progress_series(project_id: int, start: date, end: date, bucket: str = "day") -> List[dict]:
+    """
+    Conteos por estado al cierre de cada día (o de cada semana) entre start y
+    end. Las habitaciones sin auditorías cuentan como DEFAULT_STATUS.
+    Hoy se toma del estado vivo (project_room_status).
+    """
+    ensure_checkpoints(project_id)
+    today = datetime.utcnow().date()
+    step = 7 if bucket == "week" else 1
+
+    total = db.session.query(func.count(ProjectRoomStatus.id)).filter_by(project_id=project_id).scalar() or 0
+    per_day: Dict[date, Dict[str, int]] = {}
+    for day, status, n in db.session.execute(
+        select(ProjectRoomCheckpoint.day, ProjectRoomCheckpoint.status, func.count())
+        .where(ProjectRoomCheckpoint.project_id == project_id, ProjectRoomCheckpoint.day <= end)
+        .group_by(ProjectRoomCheckpoint.day, ProjectRoomCheckpoint.status)
+        .order_by(ProjectRoomCheckpoint.day)
+    ):
+        per_day.setdefault(day, {})[status or "N/A"] = n
+    checkpoint_days = sorted(per_day)
+
+    live = None
+    if end >= today:
+        live = dict(
+            db.session.query(ProjectRoomStatus.status, func.count())
+            .filter_by(project_id=project_id)
+            .group_by(ProjectRoomStatus.status)
+            .all()
+        )
+
+    def counts_at(d: date) -> Dict[str, int]:
+        if d >= today and live is not None:
+            return dict(live)
+        i = bisect_right(checkpoint_days, d) - 1
+        counts = dict(per_day[checkpoint_days[i]]) if i >= 0 else {}
+        changed = sum(n for s, n in counts.items() if s != DEFAULT_STATUS)
+        counts[DEFAULT_STATUS] = max(total - changed, 0)
+        return {s: n for s, n in counts.items() if n}
+
+    points = []
+    d = start
+    while d <= end and len(points) < MAX_POINTS:
+        close = min(d + timedelta(days=step - 1), end)
+        counts = counts_at(close)
+        points.append({
+            "bucket": d.isoformat(),
+            "as_of": close.isoformat(),
+            "counts": counts,
+            "percent_complete": percent_complete(counts, sum(counts.values())),
+        })
+        d += timedelta(days=step)
+    return points
@@ -0,0 +1,92 @@
+# backend/utils/rooms.py
+# -*- coding: utf-8 -*-
+"""
+Topología de habitaciones (tabla `room`) con caché por proceso.
+
+La lista se carga una vez por worker y se recarga solo cuando cambia la
+versión de la tabla (backend/utils/versions.py). Los proyectos se siembran
+con un único INSERT ... SELECT desde `room`.
+"""
+from __future__ import annotations
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy import and_, exists, insert, literal, select
+
+from backend.extensions import db
+from backend.models.project import Project, ProjectRoomStatus
+from backend.models.room import Room
+from backend.utils.schema import require
+from backend.utils.versions import current_version, track
+
+DEFAULT_STATUS = "Not Started"
+TOPOLOGY_FIELDS = ("floor", "type", "display_name", "sort_order", "active")
+
+_lock = threading.Lock()
+_cache: Dict[str, object] = {"version": None, "rooms": [], "by_number": {}}
+
+track(Room)
+require("room", "number", "floor", "type", "display_name", "sort_order", "active")
+
+
+def percent_complete(counts: Dict[str, int], total: int) -> float:
+    """Completed / (total - N/A) en %; las habitaciones N/A no cuentan."""
+    applicable = total - counts.get("N/A", 0)
+    return round(100.0 * counts.get("Completed", 0) / applicable, 1) if applicable else 0.0
+
+
+def default_topology() -> List[dict]:
+    """Habitaciones del Aloft (antes fijas en el código): 201–216 y x01–x17 para pisos 3–8."""
+    ranges = [range(201, 217)] + [range(f * 100 + 1, f * 100 + 18) for f in range(3, 9)]
+    rows = []
+    for r in ranges:
+        for n in r:
+            rows.append({"number": str(n), "floor": str(n // 100), "sort_order": len(rows), "active": True})
+    return rows
+
+
+def seed_default_topology() -> int:
+    """Carga la topología por defecto si la tabla `room` está vacía. No hace commit."""
+    if db.session.query(Room.id).first() is not None:
+        return 0
+    rows = default_topology()
+    db.session.execute(insert(Room), rows)
+    return len(rows)
+
+
+def topology() -> Tuple[List[dict], Dict[str, dict]]:
+    """(habitaciones activas en orden, {número: habitación})."""
+    version = current_version(Room.__tablename__)
+    if _cache["version"] == version:
+        return _cache["rooms"], _cache["by_number"]
+    with _lock:
+        if _cache["version"] != version:
+            rows = Room.query.filter(Room.active.is_(True)).order_by(Room.sort_order, Room.number).all()
+            rooms = [r.to_dict() for r in rows]
+            _cache.update(rooms=rooms, by_number={r["number"]: r for r in rooms}, version=version)
+    return _cache["rooms"], _cache["by_number"]
+
+
+def seed_project_rooms(project_id: int | None = None) -> int:
+    """
+    INSERT INTO project_room_status (project_id, room_number, status, notes)
+    SELECT ... FROM room [CROSS JOIN project] WHERE active AND NOT EXISTS (...)
+
+    Con project_id siembra ese proyecto; sin él, todos los proyectos abiertos
+    (p.ej. tras agregar habitaciones a la topología). No hace commit.
+    """
+    already = exists().where(and_(
+        ProjectRoomStatus.room_number == Room.number,
+        ProjectRoomStatus.project_id == (project_id if project_id is not None else Project.id),
+    ))
+    if project_id is not None:
+        sel = select(literal(project_id), Room.number, literal(DEFAULT_STATUS), literal(""))
+    else:
+        sel = select(Project.id, Room.number, literal(DEFAULT_STATUS), literal("")).where(
+            Project.completed_at.is_(None)
+        )
+    sel = sel.where(Room.active.is_(True), ~already)
+    result = db.session.execute(
+        insert(ProjectRoomStatus).from_select(["project_id", "room_number", "status", "notes"], sel)
+    )
+    return result.rowcount or 0
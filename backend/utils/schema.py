@@ -0,0 +1,111 @@
+# backend/utils/schema.py
+# -*- coding: utf-8 -*-
+"""
+Registro de requisitos de esquema verificado UNA vez por proceso (al arrancar).
+
+Los blueprints declaran las tablas/columnas que necesitan con `require(...)`;
+`verify_schema(app)` inspecciona la BD con el inspector del dialecto, guarda el
+resultado en `app.extensions["schema_readiness"]` y `/api/health/ready` lo expone.
+Ninguna ruta debe volver a hacer introspección ni DDL por request.
+"""
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Dict, Set
+
+from flask import Flask, current_app
+from sqlalchemy import inspect, text
+
+from backend.extensions import db
+
+# tabla -> columnas requeridas (set vacío = basta con que exista la tabla)
+REQUIRED: Dict[str, Set[str]] = {}
+
+
+def require(table: str, *columns: str) -> None:
+    """Declara que `table` (y opcionalmente `columns`) debe existir."""
+    REQUIRED.setdefault(table, set()).update(columns)
+
+
+def _missing(insp) -> tuple[list[str], Dict[str, list[str]]]:
+    tables = set(insp.get_table_names())
+    missing_tables = sorted(t for t in REQUIRED if t not in tables)
+    missing_cols: Dict[str, list[str]] = {}
+    for table, cols in REQUIRED.items():
+        if table not in tables or not cols:
+            continue
+        have = {c["name"] for c in insp.get_columns(table)}
+        lacking = sorted(cols - have)
+        if lacking:
+            missing_cols[table] = lacking
+    return missing_tables, missing_cols
+
+
+def _repair_sqlite(missing_cols: Dict[str, list[str]]) -> list[str]:
+    """
+    Solo en SQLite (dev): añade columnas faltantes usando el tipo declarado en
+    el modelo. En PostgreSQL los cambios de esquema van por Alembic.
+    """
+    applied = []
+    dialect = db.engine.dialect
+    with db.engine.begin() as conn:
+        for table, cols in missing_cols.items():
+            model_table = db.metadata.tables.get(table)
+            if model_table is None:
+                continue
+            for col in cols:
+                if col not in model_table.c:
+                    continue
+                ddl_type = model_table.c[col].type.compile(dialect=dialect)
+                conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{col}" {ddl_type}'))
+                applied.append(f"{table}.{col}")
+    return applied
+
+
+def _alembic_revision(insp) -> str | None:
+    if "alembic_version" not in insp.get_table_names():
+        return None
+    with db.engine.connect() as conn:
+        row = conn.execute(text("SELECT version_num FROM alembic_version")).first()
+    return row[0] if row else None
+
+
+def verify_schema(app: Flask) -> dict:
+    """Ejecuta la verificación (una vez) y cachea el resultado en la app."""
+    state = {
+        "ok": False,
+        "dialect": None,
+        "alembic_revision": None,
+        "missing_tables": [],
+        "missing_columns": {},
+        "repaired": [],
+        "error": None,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        with app.app_context():
+            state["dialect"] = db.engine.dialect.name
+            insp = inspect(db.engine)
+            missing_tables, missing_cols = _missing(insp)
+
+            if missing_cols and state["dialect"] == "sqlite":
+                state["repaired"] = _repair_sqlite(missing_cols)
+                insp = inspect(db.engine)
+                missing_tables, missing_cols = _missing(insp)
+
+            state["missing_tables"] = missing_tables
+            state["missing_columns"] = missing_cols
+            state["alembic_revision"] = _alembic_revision(insp)
+            state["ok"] = not missing_tables and not missing_cols
+    except Exception as e:
+        state["error"] = str(e)
+
+    app.extensions["schema_readiness"] = state
+    if not state["ok"]:
+        print(f"[schema] NOT ready: {state}")
+    return state
+
+
+def readiness(app: Flask | None = None) -> dict:
+    """Resultado cacheado; nunca toca la BD."""
+    app = app or current_app
+    return app.extensions.get("schema_readiness") or {"ok": False, "error": "schema not verified"}
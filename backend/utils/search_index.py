@@ -0,0 +1,634 @@
+# backend/utils/search_index.py
+# -*- coding: utf-8 -*-
+"""
+Índice de búsqueda unificado (tabla search_document) para /api/search.
+
+Mantenimiento incremental desde la sesión:
+  - after_flush: objetos nuevos/modificados/borrados de los modelos indexados
+    se re-leen de la BD (misma transacción) y se reescriben sus documentos.
+    Una modificación solo cuenta si tocó una columna indexada (historial del
+    atributo): un cambio de stock o de estado no reescribe nada.
+    Cambios en un padre reescriben los documentos que dependen de él
+    (task -> comentarios, sop -> pasos, vendor -> faceta vendor de ítems y
+    facturas); borrar el padre borra esos documentos.
+  - INSERT/UPDATE/DELETE masivos (session.execute(update(Model)...)) no pasan
+    por flush: se anotan en do_orm_execute y se aplican en before_commit
+    (por ids si se conocen; si no: filas sin documento, documentos huérfanos
+    o reindexado completo de esa entidad). Un UPDATE masivo que solo escribe
+    columnas no indexadas (p. ej. inventory.stock) se ignora.
+Un documento se arma con title (peso A), subtitle (B) y body (C) más facetas
+floor, room y vendor. En PostgreSQL `tsv` es un tsvector ponderado con índice
+GIN; en otros dialectos (SQLite de desarrollo) la búsqueda cae a ILIKE por
+término con el mismo ranking por campo.
+
+Backfill / reconstrucción: python backend/scripts/reindex_search.py
+"""
+from __future__ import annotations
+import html
+import re
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Sequence, Set
+
+from sqlalchemy import String, and_, case, cast, delete, event, exists, func, inspect, literal, or_, select, true, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from backend.extensions import db
+from backend.models.asset import Asset
+from backend.models.inventory import InventoryItem
+from backend.models.invoice import Invoice
+from backend.models.manual import Manual
+from backend.models.search_document import SearchDocument
+from backend.models.sop import SOP, SOPStep
+from backend.models.task import Task
+from backend.models.task_comment import TaskComment
+from backend.models.vendor import Vendor
+from backend.utils.prefix_index import norm_name
+from backend.utils.schema import require
+from backend.utils.versions import pk_from_where
+
+SEARCH_CONFIG = "english"  # configuración de text search (stemming)
+CHUNK = 500                # ids por sentencia al reindexar
+SNIPPET_WIDTH = 160
+MARK = ("[[[", "]]]")      # marcadores internos; la respuesta usa <mark>
+HEADLINE = f'MaxFragments=1, MaxWords=25, MinWords=8, StartSel="{MARK[0]}", StopSel="{MARK[1]}"'
+
+DOC = SearchDocument.__table__
+# Los hooks de sesión escriben aquí en cada flush de una entidad indexada
+require("search_document", "entity_type", "entity_id", "title", "subtitle", "body", "tsv",
+        "floor", "room", "vendor_id", "vendor_name", "parent_type", "parent_id")
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+class Source(NamedTuple):
+    entity: str
+    model: Any
+    build: Callable[[Any, Any], List[dict]]  # (conn, where) -> documentos
+    columns: Sequence[Any]                   # atributos del modelo que lee `build`
+
+
+def _join(*parts) -> str:
+    return " · ".join(str(p).strip() for p in parts if p is not None and str(p).strip())
+
+
+def _cut(value, size: int):
+    value = (str(value).strip() if value is not None else "")[:size]
+    return value or None
+
+
+def _doc(entity_id: int, title, subtitle="", body="", *, floor=None, room=None,
+         vendor_id=None, vendor_name=None, parent=(None, None)) -> dict:
+    return {
+        "entity_id": entity_id,
+        "title": _cut(title, 255),
+        "subtitle": _cut(subtitle, 255),
+        "body": _cut(body, 100_000),
+        "floor": _cut(floor, 20),
+        "room": _cut(room, 20),
+        "vendor_id": vendor_id,
+        "vendor_name": _cut(vendor_name, 180),
+        "parent_type": parent[0],
+        "parent_id": parent[1],
+    }
+
+
+# ---------- documentos por entidad ----------
+def _tasks(conn, where) -> List[dict]:
+    rows = conn.execute(select(
+        Task.id, Task.title, Task.description, Task.status, Task.workstream,
+        Task.assignee, Task.floor, Task.room,
+    ).where(where))
+    return [
+        _doc(r.id, r.title, _join(r.status, r.workstream, r.assignee, r.room and f"Room {r.room}"),
+             r.description, floor=r.floor, room=r.room)
+        for r in rows
+    ]
+
+
+def _task_comments(conn, where) -> List[dict]:
+    rows = conn.execute(
+        select(TaskComment.id, TaskComment.body, TaskComment.author_name, TaskComment.task_id,
+               Task.title, Task.floor, Task.room)
+        .outerjoin(Task, Task.id == TaskComment.task_id)
+        .where(where)
+    )
+    return [
+        _doc(r.id, r.title, r.author_name, r.body, floor=r.floor, room=r.room,
+             parent=("task", r.task_id))
+        for r in rows
+    ]
+
+
+def _assets(conn, where) -> List[dict]:
+    rows = conn.execute(select(
+        Asset.id, Asset.name, Asset.type, Asset.manufacturer, Asset.model_no,
+        Asset.serial_no, Asset.area, Asset.location, Asset.floor,
+    ).where(where))
+    return [
+        _doc(r.id, r.name, _join(r.type, r.manufacturer, r.model_no, r.serial_no, r.area),
+             r.location, floor=r.floor)
+        for r in rows
+    ]
+
+
+def _inventory(conn, where) -> List[dict]:
+    rows = conn.execute(
+        select(InventoryItem.id, InventoryItem.name, InventoryItem.item_id, InventoryItem.part_no,
+               InventoryItem.category, InventoryItem.location, InventoryItem.description,
+               InventoryItem.supplier_id, Vendor.name.label("vendor_name"))
+        .outerjoin(Vendor, Vendor.id == InventoryItem.supplier_id)
+        .where(where)
+    )
+    return [
+        _doc(r.id, r.name or r.item_id, _join(r.item_id, r.part_no, r.category, r.location),
+             r.description, vendor_id=r.supplier_id, vendor_name=r.vendor_name)
+        for r in rows
+    ]
+
+
+def _vendors(conn, where) -> List[dict]:
+    rows = conn.execute(select(
+        Vendor.id, Vendor.name, Vendor.categories, Vendor.contact_name, Vendor.email, Vendor.notes,
+    ).where(where))
+    return [
+        _doc(r.id, r.name, _join(r.categories, r.contact_name, r.email), r.notes,
+             vendor_id=r.id, vendor_name=r.name)
+        for r in rows
+    ]
+
+
+def _manuals(conn, where) -> List[dict]:
+    rows = conn.execute(select(Manual.id, Manual.title, Manual.category, Manual.description).where(where))
+    return [_doc(r.id, r.title, r.category, r.description) for r in rows]
+
+
+def _sop_steps(conn, where) -> List[dict]:
+    rows = conn.execute(
+        select(SOPStep.id, SOPStep.order, SOPStep.text, SOPStep.sop_id, SOP.title)
+        .outerjoin(SOP, SOP.id == SOPStep.sop_id)
+        .where(where)
+    )
+    return [
+        _doc(r.id, r.title, f"Step {r.order}", r.text, parent=("sop", r.sop_id))
+        for r in rows
+    ]
+
+
+def _invoices(conn, where) -> List[dict]:
+    rows = conn.execute(
+        select(Invoice.id, Invoice.invoice_number, Invoice.po_number, Invoice.status, Invoice.notes,
+               Invoice.vendor_id, Vendor.name.label("vendor_name"))
+        .outerjoin(Vendor, Vendor.id == Invoice.vendor_id)
+        .where(where)
+    )
+    return [
+        _doc(r.id, f"Invoice {r.invoice_number}", _join(r.po_number and f"PO {r.po_number}", r.status),
+             r.notes, vendor_id=r.vendor_id, vendor_name=r.vendor_name)
+        for r in rows
+    ]
+
+
+SOURCES: Dict[str, Source] = {
+    s.entity: s for s in (
+        Source("task", Task, _tasks, (
+            Task.title, Task.description, Task.status, Task.workstream, Task.assignee, Task.floor, Task.room,
+        )),
+        Source("task_comment", TaskComment, _task_comments, (
+            TaskComment.body, TaskComment.author_name, TaskComment.task_id,
+        )),
+        Source("asset", Asset, _assets, (
+            Asset.name, Asset.type, Asset.manufacturer, Asset.model_no, Asset.serial_no,
+            Asset.area, Asset.location, Asset.floor,
+        )),
+        Source("inventory", InventoryItem, _inventory, (
+            InventoryItem.name, InventoryItem.item_id, InventoryItem.part_no, InventoryItem.category,
+            InventoryItem.location, InventoryItem.description, InventoryItem.supplier_id,
+        )),
+        Source("vendor", Vendor, _vendors, (
+            Vendor.name, Vendor.categories, Vendor.contact_name, Vendor.email, Vendor.notes,
+        )),
+        Source("manual", Manual, _manuals, (Manual.title, Manual.category, Manual.description)),
+        Source("sop_step", SOPStep, _sop_steps, (SOPStep.order, SOPStep.text, SOPStep.sop_id)),
+        Source("invoice", Invoice, _invoices, (
+            Invoice.invoice_number, Invoice.po_number, Invoice.status, Invoice.notes, Invoice.vendor_id,
+        )),
+    )
+}
+BY_TABLE: Dict[str, Source] = {s.model.__tablename__: s for s in SOURCES.values()}
+# tabla padre -> entidades cuyos documentos dependen de ella
+CHILDREN: Dict[str, Sequence[str]] = {
+    "task": ("task_comment",),
+    "sop": ("sop_step",),
+    "vendor": ("inventory", "invoice"),
+}
+PARENT_MODELS = {"task": Task, "sop": SOP}  # parent_type guardado en el documento
+WATCHED: Set[str] = set(BY_TABLE) | set(CHILDREN)
+
+
+def _names(attrs) -> Set[str]:
+    """Claves de atributo y nombres de columna (los bulk usan unas u otras)."""
+    return {a.key for a in attrs} | {a.expression.name for a in attrs}
+
+
+# tabla padre -> columnas que copian los documentos dependientes
+PARENT_COLUMNS: Dict[str, Set[str]] = {
+    "task": _names((Task.title, Task.floor, Task.room)),
+    "sop": _names((SOP.title,)),
+    "vendor": _names((Vendor.name,)),
+}
+# tabla -> columnas cuyo cambio reescribe documentos (propios o de dependientes)
+INDEXED: Dict[str, Set[str]] = {t: _names(src.columns) for t, src in BY_TABLE.items()}
+for _t, _cols in PARENT_COLUMNS.items():
+    INDEXED[_t] = INDEXED.get(_t, set()) | _cols
+
+
+# ---------- escritura ----------
+def _chunks(ids: Iterable[int]) -> Iterable[List[int]]:
+    ids = sorted({i for i in ids if i is not None})
+    for i in range(0, len(ids), CHUNK):
+        yield ids[i:i + CHUNK]
+
+
+def _tsv(title, subtitle, body):
+    def weighted(value, weight):
+        return func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(value, "")), weight)
+    return weighted(title, "A").op("||")(weighted(subtitle, "B")).op("||")(weighted(body, "C"))
+
+
+DOC_FIELDS = ("title", "subtitle", "body", "floor", "room", "vendor_id", "vendor_name",
+              "parent_type", "parent_id")
+
+
+def _write(conn, src: Source, where) -> Set[int]:
+    """
+    Upsert de los documentos de `src` que cumplen `where`; devuelve sus ids.
+    INSERT ... ON CONFLICT (entity_type, entity_id) DO UPDATE: dos transacciones
+    que reindexan la misma entidad no chocan con uq_search_document_entity. En
+    PostgreSQL `tsv` se calcula en el mismo statement.
+    """
+    docs = src.build(conn, where)
+    if not docs:
+        return set()
+    for d in docs:
+        d["entity_type"] = src.entity
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            for d in docs:
+                d["tsv"] = _tsv(*(literal(d[f], DOC.c[f].type) for f in ("title", "subtitle", "body")))
+        ins = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(DOC).values(docs)
+        fields = DOC_FIELDS + (("tsv",) if dialect == "postgresql" else ())
+        conn.execute(ins.on_conflict_do_update(
+            index_elements=[DOC.c.entity_type, DOC.c.entity_id],
+            set_={**{f: ins.excluded[f] for f in fields}, "updated_at": func.now()},
+        ))
+    else:
+        # Otros dialectos: DELETE + INSERT en la misma transacción
+        conn.execute(delete(DOC).where(
+            DOC.c.entity_type == src.entity, DOC.c.entity_id.in_([d["entity_id"] for d in docs])
+        ))
+        conn.execute(DOC.insert(), docs)
+    return {d["entity_id"] for d in docs}
+
+
+def reindex(conn, src: Source, ids: Iterable[int] | None = None) -> int:
+    """Reescribe los documentos de `src` para `ids` (None = toda la entidad)."""
+    if ids is None:
+        all_ids = [r[0] for r in conn.execute(select(src.model.id))]
+        written = sum(len(_write(conn, src, src.model.id.in_(chunk))) for chunk in _chunks(all_ids))
+        _drop_orphans(conn, src.model.__tablename__)
+        return written
+    written = 0
+    for chunk in _chunks(ids):
+        done = _write(conn, src, src.model.id.in_(chunk))
+        gone = [i for i in chunk if i not in done]  # ya no existen: fuera del índice
+        if gone:
+            conn.execute(delete(DOC).where(DOC.c.entity_type == src.entity, DOC.c.entity_id.in_(gone)))
+        written += len(done)
+    return written
+
+
+def _index_missing(conn, src: Source) -> int:
+    pk = src.model.id
+    missing = select(pk).where(~exists().where(DOC.c.entity_type == src.entity, DOC.c.entity_id == pk))
+    return reindex(conn, src, [r[0] for r in conn.execute(missing)])
+
+
+def _drop_orphans(conn, table: str) -> None:
+    src = BY_TABLE.get(table)
+    if src is not None:
+        conn.execute(delete(DOC).where(
+            DOC.c.entity_type == src.entity, ~exists().where(src.model.id == DOC.c.entity_id)
+        ))
+    parent = PARENT_MODELS.get(table)
+    if parent is not None:
+        conn.execute(delete(DOC).where(
+            DOC.c.parent_type == table, ~exists().where(parent.id == DOC.c.parent_id)
+        ))
+
+
+def _dependents(conn, table: str, ids: List[int]) -> Dict[str, Set[int]]:
+    if table in PARENT_MODELS:
+        cond = DOC.c.parent_type == table
+        col = DOC.c.parent_id
+    elif table in CHILDREN:
+        cond = DOC.c.entity_type.in_(CHILDREN[table])
+        col = DOC.c.vendor_id
+    else:
+        return {}
+    out: Dict[str, Set[int]] = {}
+    for chunk in _chunks(ids):
+        for entity, eid in conn.execute(select(DOC.c.entity_type, DOC.c.entity_id).where(cond, col.in_(chunk))):
+            out.setdefault(entity, set()).add(eid)
+    return out
+
+
+def apply_changes(conn, changed: Dict[str, Set[int]], deleted: Dict[str, Set[int]],
+                  parents: Dict[str, Set[int]] | None = None) -> None:
+    """`parents`: ids cuyos dependientes hay que reescribir (None = todos los de `changed`)."""
+    for table, ids in deleted.items():
+        src = BY_TABLE.get(table)
+        for chunk in _chunks(ids):
+            if src is not None:
+                conn.execute(delete(DOC).where(DOC.c.entity_type == src.entity, DOC.c.entity_id.in_(chunk)))
+            if table in PARENT_MODELS:
+                conn.execute(delete(DOC).where(DOC.c.parent_type == table, DOC.c.parent_id.in_(chunk)))
+    for table, ids in changed.items():
+        ids = list(ids - deleted.get(table, set()))
+        if not ids:
+            continue
+        src = BY_TABLE.get(table)
+        if src is not None:
+            reindex(conn, src, ids)
+        moved = ids if parents is None else list(parents.get(table, set()) - deleted.get(table, set()))
+        if moved:
+            for entity, eids in _dependents(conn, table, moved).items():
+                reindex(conn, SOURCES[entity], eids)
+
+
+def rebuild(entities: Iterable[str] | None = None) -> Dict[str, int]:
+    """Reconstruye el índice (todas las entidades o las indicadas). No hace commit."""
+    conn = db.session.connection()
+    return {e: reindex(conn, SOURCES[e]) for e in (entities or SOURCES)}
+
+
+# ---------- hooks de sesión ----------
+def _changed(obj, columns: Set[str]) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[k].history.has_changes() for k in columns if k in attrs)
+
+
+def _bulk_columns(state) -> Set[str] | None:
+    """Columnas que escribe un UPDATE masivo; None si no se pueden saber."""
+    params = state.parameters
+    if isinstance(params, list) and params:
+        return {k for p in params for k in p} - {"id"}
+    # update(M).values(...): no hay API pública para leer los valores del statement
+    values = getattr(state.statement, "_values", None)
+    if values:
+        return {getattr(k, "name", k) for k in values} | set(params or {})
+    if isinstance(params, dict) and params:
+        return set(params) - {"id"}
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    changed: Dict[str, Set[int]] = {}
+    deleted: Dict[str, Set[int]] = {}
+    parents: Dict[str, Set[int]] = {}
+    for op, objs in (("i", session.new), ("u", session.dirty), ("d", session.deleted)):
+        for obj in objs:
+            table = getattr(obj, "__tablename__", None)
+            if table not in WATCHED:
+                continue
+            if op == "u" and not _changed(obj, INDEXED[table]):
+                continue
+            rid = getattr(obj, "id", None)
+            (deleted if op == "d" else changed).setdefault(table, set()).add(rid)
+            if op == "u" and table in PARENT_COLUMNS and _changed(obj, PARENT_COLUMNS[table]):
+                parents.setdefault(table, set()).add(rid)
+    if changed or deleted:
+        apply_changes(session.connection(), changed, deleted, parents)
+
+
+def _pending(session, table: str) -> dict:
+    return session.info.setdefault("search_pending", {}).setdefault(
+        table, {"ids": set(), "deleted": set(), "new": False, "orphans": False, "all": False}
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _orm_bulk(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(getattr(state.statement, "table", None), "name", None)
+    if table not in WATCHED:
+        return
+    if state.is_update:
+        cols = _bulk_columns(state)
+        if cols is not None and not cols & INDEXED[table]:
+            return
+    p = _pending(state.session, table)
+    params = state.parameters
+    if state.is_insert:
+        p["new"] = True
+        return
+    ids: List[int] = []
+    if isinstance(params, list) and params and all("id" in x for x in params):
+        ids = [x["id"] for x in params]
+    elif pk_from_where(state.statement) is not None:
+        ids = [pk_from_where(state.statement)]
+    if ids:
+        p["deleted" if state.is_delete else "ids"].update(ids)
+    elif state.is_delete:
+        p["orphans"] = True
+    else:
+        p["all"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    if not session.info.get("search_pending"):
+        return
+    session.flush()
+    pending = session.info.pop("search_pending", None) or {}
+    conn = session.connection()
+    for table, p in pending.items():
+        src = BY_TABLE.get(table)
+        if p["orphans"]:
+            _drop_orphans(conn, table)
+        if p["all"]:
+            if src is not None:
+                reindex(conn, src)
+            for entity in CHILDREN.get(table, ()):
+                reindex(conn, SOURCES[entity])
+        elif p["ids"] or p["deleted"]:
+            apply_changes(conn, {table: p["ids"]}, {table: p["deleted"]})
+        if p["new"] and src is not None:
+            _index_missing(conn, src)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("search_pending", None)
+
+
+# ---------- consulta ----------
+# faceta -> columna por la que se agrupa (el valor que acepta el filtro)
+FACETS = {
+    "type": DOC.c.entity_type,
+    "floor": DOC.c.floor,
+    "room": DOC.c.room,
+    "vendor": DOC.c.vendor_id,
+}
+FACET_LABELS = {"vendor": DOC.c.vendor_name}  # nombre que acompaña al valor
+
+
+def _terms(q: str) -> List[str]:
+    return _WORD.findall(norm_name(q))
+
+
+def _highlight(text: str | None) -> str | None:
+    if text is None:
+        return None
+    return html.escape(text).replace(MARK[0], "<mark>").replace(MARK[1], "</mark>")
+
+
+def _mark(text: str, terms: Sequence[str]) -> str:
+    if not terms:
+        return text
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.I)
+    return pattern.sub(lambda m: f"{MARK[0]}{m.group(0)}{MARK[1]}", text)
+
+
+def _snippet(body: str | None, subtitle: str | None, terms: Sequence[str]) -> str | None:
+    """Fragmento alrededor del primer término encontrado (dialectos sin ts_headline)."""
+    candidates = [t for t in (body, subtitle) if t]
+    if not candidates:
+        return None
+    text, hit = candidates[0], -1
+    for c in candidates:
+        found = [i for i in (c.lower().find(t) for t in terms) if i >= 0]
+        if found:
+            text, hit = c, min(found)
+            break
+    start = max(0, hit - SNIPPET_WIDTH // 3) if hit > 0 else 0
+    piece = text[start:start + SNIPPET_WIDTH]
+    piece = ("…" if start else "") + piece + ("…" if start + SNIPPET_WIDTH < len(text) else "")
+    return _mark(piece, terms)
+
+
+def _match(terms: List[str]):
+    """(condición, ranking, snippet|None, título resaltado|None) según el dialecto."""
+    if db.engine.dialect.name == "postgresql":
+        tsq = func.to_tsquery(SEARCH_CONFIG, " & ".join(terms[:-1] + [terms[-1] + ":*"]))
+        return (
+            DOC.c.tsv.op("@@")(tsq),
+            func.ts_rank_cd(DOC.c.tsv, tsq),
+            func.ts_headline(SEARCH_CONFIG, func.coalesce(DOC.c.body, DOC.c.subtitle, ""), tsq, HEADLINE),
+            func.ts_headline(SEARCH_CONFIG, func.coalesce(DOC.c.title, ""), tsq,
+                             f'HighlightAll=true, StartSel="{MARK[0]}", StopSel="{MARK[1]}"'),
+        )
+    conds, ranks = [], []
+    for t in terms:
+        like = f"%{t}%"
+        cols = [(DOC.c.title, 1.0), (DOC.c.subtitle, 0.4), (DOC.c.body, 0.2)]
+        conds.append(or_(*[c.ilike(like) for c, _ in cols]))
+        ranks.extend(case((c.ilike(like), w), else_=0.0) for c, w in cols)
+    rank = ranks[0]
+    for r in ranks[1:]:
+        rank = rank + r
+    return and_(*conds), rank, None, None
+
+
+def _facet_rows(where) -> List[tuple]:
+    """[(faceta, valor, etiqueta|None, n)] en una sola consulta."""
+    names = list(FACETS)
+    if db.engine.dialect.name == "postgresql":
+        cols = list(FACETS.values())
+        labels = [func.max(FACET_LABELS[n]) if n in FACET_LABELS else literal(None) for n in names]
+        stmt = (
+            select(*cols, *[func.grouping(c) for c in cols[:-1]], *labels, func.count())
+            .where(where)
+            .group_by(func.grouping_sets(*[tuple_(c) for c in cols]))
+        )
+        out = []
+        k = len(cols)
+        for row in db.session.execute(stmt):
+            values, flags, tags, n = row[:k], row[k:2 * k - 1], row[2 * k - 1:3 * k - 1], row[-1]
+            i = next((j for j, g in enumerate(flags) if g == 0), k - 1)
+            out.append((names[i], values[i], tags[i], n))
+        return out
+    parts = [
+        select(
+            literal(name), cast(col, String),
+            func.max(FACET_LABELS[name]) if name in FACET_LABELS else literal(None, String),
+            func.count(),
+        ).where(where).group_by(col)
+        for name, col in FACETS.items()
+    ]
+    return db.session.execute(parts[0].union_all(*parts[1:])).all()
+
+
+def search(q: str, *, types: Sequence[str] = (), floor: str | None = None, room: str | None = None,
+           vendor_id: int | None = None, limit: int = 20, page: int = 1) -> Dict[str, Any]:
+    terms = _terms(q)
+    filters = []
+    if types:
+        filters.append(DOC.c.entity_type.in_(list(types)))
+    if floor:
+        filters.append(DOC.c.floor == floor)
+    if room:
+        filters.append(DOC.c.room == room)
+    if vendor_id is not None:
+        filters.append(DOC.c.vendor_id == vendor_id)
+
+    if terms:
+        cond, rank, snippet, title_hl = _match(terms)
+    else:  # sin texto: navegación por facetas, lo más reciente primero
+        cond, rank, snippet, title_hl = true(), literal(0.0), None, None
+    where = and_(cond, *filters)
+
+    # {valor: n}; las facetas con etiqueta (vendor) dan {id: {"name", "count"}}
+    facets: Dict[str, Dict[str, Any]] = {name: {} for name in FACETS}
+    for name, value, label, n in _facet_rows(where):
+        if value is not None:
+            facets[name][str(value)] = {"name": label, "count": int(n)} if name in FACET_LABELS else int(n)
+    total = sum(facets["type"].values())
+
+    extra = [c.label(n) for c, n in ((snippet, "snippet"), (title_hl, "title_hl")) if c is not None]
+    rows = db.session.execute(
+        select(
+            DOC.c.entity_type, DOC.c.entity_id, DOC.c.title, DOC.c.subtitle, DOC.c.body,
+            DOC.c.floor, DOC.c.room, DOC.c.vendor_id, DOC.c.vendor_name, rank.label("score"), *extra,
+        )
+        .where(where)
+        .order_by(rank.desc(), DOC.c.updated_at.desc(), DOC.c.id.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
+    ).all()
+
+    items = []
+    for r in rows:
+        m = r._mapping
+        items.append({
+            "type": r.entity_type,
+            "id": r.entity_id,
+            "title": r.title,
+            "title_highlight": _highlight(m["title_hl"] if "title_hl" in m else _mark(r.title or "", terms)),
+            "subtitle": r.subtitle,
+            "snippet": _highlight(m["snippet"] if "snippet" in m else _snippet(r.body, r.subtitle, terms)),
+            "floor": r.floor,
+            "room": r.room,
+            "vendor_id": r.vendor_id,
+            "vendor": r.vendor_name,
+            "score": round(float(r.score or 0), 4),
+        })
+    return {
+        "q": q,
+        "items": items,
+        "total": total,
+        "facets": facets,
+        "page": page,
+        "page_size": limit,
+    }
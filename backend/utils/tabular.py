@@ -0,0 +1,124 @@
+# backend/utils/tabular.py
+# -*- coding: utf-8 -*-
+"""
+Exportación/importación tabular en streaming (CSV y, si openpyxl está
+instalado, XLSX).
+
+- Export: las filas llegan de un iterador (consulta con yield_per / cursor de
+  servidor) y se escriben por bloques; nunca se arma la lista completa.
+- Import: las filas se leen del upload como iterador de (fila, dict) y se procesan
+  por lotes (`chunked`).
+"""
+from __future__ import annotations
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator, Sequence, Tuple
+
+from flask import Response, stream_with_context
+
+try:
+    import openpyxl
+except ImportError:  # XLSX opcional
+    openpyxl = None
+
+CSV_MIMETYPE = "text/csv; charset=utf-8"
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _cell(v: Any) -> Any:
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]], every: int = 500) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")  # BOM: Excel abre acentos correctamente
+    writer.writerow(header)
+    for n, row in enumerate(rows, 1):
+        writer.writerow(["" if v is None else _cell(v) for v in row])
+        if n % every == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+    yield buf.getvalue()
+
+
+def _xlsx_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]], title: str) -> Iterator[bytes]:
+    # write_only vuelca las filas a disco; el .xlsx final se sirve por bloques
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31] or "Sheet1")
+    ws.append(list(header))
+    for row in rows:
+        ws.append([_cell(v) for v in row])
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            block = tmp.read(64 * 1024)
+            if not block:
+                break
+            yield block
+
+
+def export_response(header: Sequence[str], rows: Iterable[Sequence[Any]], *, fmt: str, filename: str) -> Response:
+    """Respuesta en streaming; `rows` se consume dentro del contexto del request."""
+    fmt = (fmt or "csv").lower()
+    if fmt == "xlsx":
+        if openpyxl is None:
+            return Response('{"error": "xlsx export requires openpyxl"}', status=501, mimetype="application/json")
+        body = _xlsx_chunks(header, rows, filename)
+        mimetype = XLSX_MIMETYPE
+    else:
+        fmt = "csv"
+        body = _csv_chunks(header, rows)
+        mimetype = CSV_MIMETYPE
+    resp = Response(stream_with_context(body), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx: no bufferizar el stream
+    return resp
+
+
+def iter_upload_rows(file_storage, *, encoding: str = "utf-8-sig") -> Iterator[Tuple[int, dict]]:
+    """
+    Itera las filas de un upload CSV o XLSX como (nº de fila, {encabezado: valor}).
+    El número es el de la hoja (encabezados = fila 1), contando las filas en
+    blanco que se saltan, para que los errores apunten a la fila real.
+    Lanza UnicodeDecodeError si el CSV no está en `encoding` (no se adivina:
+    así es como se corrompían los textos en imports anteriores).
+    """
+    name = (file_storage.filename or "").lower()
+    if name.endswith(".xlsx"):
+        if openpyxl is None:
+            raise ValueError("xlsx import requires openpyxl")
+        wb = openpyxl.load_workbook(file_storage.stream, read_only=True, data_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, [])]
+        for line, values in enumerate(rows, start=2):
+            if values is None or all(v in (None, "") for v in values):
+                continue
+            yield line, {h: v for h, v in zip(header, values) if h}
+        wb.close()
+        return
+
+    text = io.TextIOWrapper(file_storage.stream, encoding=encoding, newline="")
+    # csv.reader (no DictReader): DictReader descarta las filas vacías sin contarlas
+    rows = csv.reader(text)
+    header = [(h or "").strip() for h in next(rows, [])]
+    for line, values in enumerate(rows, start=2):
+        clean = {h: v.strip() for h, v in zip(header, values) if h}
+        if any(v != "" for v in clean.values()):
+            yield line, clean
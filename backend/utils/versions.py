@@ -0,0 +1,269 @@
+# backend/utils/versions.py
+# -*- coding: utf-8 -*-
+"""
+Versiones por tabla para invalidar cachés en memoria entre procesos.
+
+`track(Model, ...)` registra tablas; los flush/statements que las tocan anotan
+(row_id, op) en la sesión y, DESPUÉS del commit, se insertan en change_log en
+una transacción corta aparte. La versión de una tabla es max(change_log.id)
+de esa tabla: no hay fila contador que bloquee a los writers (ni deadlocks
+entre tablas). En PostgreSQL la inserción toma un advisory lock por tabla
+solo durante ese INSERT, para que los ids de una tabla se hagan visibles en
+orden y un cursor nunca salte un cambio.
+
+Como el change_log se escribe tras el commit de los datos, quien lee versión
+N y luego los datos ve todos los cambios <= N. Si esa escritura falla se
+reintenta una vez; si vuelve a fallar, el siguiente change_log que este
+proceso consiga escribir añade un cambio masivo ("*") de esas tablas, y los
+consumidores incrementales (changes_since) hacen una recarga completa. Si el
+proceso muere entre ambos commits, el cambio no llega a esos consumidores
+hasta su próxima recarga completa (reinicio o cambio masivo de la tabla).
+
+Una tabla puede llevar un ámbito (`track(Model, scope="inspection_id")`): cada
+fila de change_log guarda ese valor en scope_id, y `scope_version` /
+`changes_since(..., scope=)` dan un cursor propio del ámbito (p. ej. el sync
+de una inspección no se resetea por cambios de otra). La poda también es por
+ámbito. Los statements masivos indican su ámbito con
+`.execution_options(versions_scope=...)`; los que ya anotan sus ids con
+`record()` (INSERT ... RETURNING) usan `versions_logged=True`.
+
+Cada proceso (worker de gunicorn) lee la versión como mucho una vez cada
+`max_age` segundos, así que un caché cuesta ~0 consultas por request y ve los
+cambios de otros workers en cuanto caduca el TTL.
+"""
+from __future__ import annotations
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Sequence, Set, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, delete, event, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+from backend.extensions import db
+from backend.models.table_version import ChangeLog
+from backend.utils.schema import require
+
+TRACKED: Dict[str, str | None] = {}  # tabla -> atributo de ámbito (o None)
+KEEP_CHANGES = 5000  # filas de change_log retenidas por tabla (y ámbito)
+PRUNE_EVERY = 500    # se poda cuando sale un id múltiplo de esto (~1 de cada 500 inserts)
+CACHE_MAX = 512      # entradas de `cached` por proceso (LRU)
+
+# Los hooks escriben aquí tras cada commit que toca una tabla versionada
+require("change_log", "table_name", "row_id", "op", "scope_id")
+
+_lock = threading.Lock()
+_lost: Set[str] = set()  # tablas con cambios que no llegaron a change_log (se marcan "*")
+_cache: Dict[str, Tuple[int, float]] = {}  # tabla -> (versión, leído en monotonic)
+_values: "OrderedDict[str, Tuple[tuple, Any]]" = OrderedDict()  # clave -> (versiones, valor)
+
+
+def track(*models, scope: str | None = None) -> None:
+    """Activa el versionado para las tablas de estos modelos (opcionalmente con ámbito)."""
+    for m in models:
+        TRACKED[m.__tablename__] = scope
+
+
+def _in_scope(scope: int | None):
+    return ChangeLog.scope_id.is_(None) if scope is None else ChangeLog.scope_id == scope
+
+
+def bump(conn, table: str, changes: Iterable[Tuple[int | None, str, int | None]]) -> int:
+    """
+    Registra (row_id, op, scope_id) de `table` en change_log y devuelve la
+    nueva versión. `conn` debe estar en una transacción propia y corta (ver
+    _after_commit).
+    """
+    rows = [{"table_name": table, "row_id": rid, "op": op, "scope_id": sc} for rid, op, sc in changes]
+    if not rows:
+        return 0
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"change_log:{table}"))))
+    ids = conn.execute(ChangeLog.__table__.insert().returning(ChangeLog.id), rows).scalars().all()
+    version = max(ids)
+    if any(i % PRUNE_EVERY == 0 for i in ids):
+        for sc in {r["scope_id"] for r in rows}:
+            cutoff = conn.execute(
+                select(ChangeLog.id).where(ChangeLog.table_name == table, _in_scope(sc))
+                .order_by(ChangeLog.id.desc()).offset(KEEP_CHANGES).limit(1)
+            ).scalar()
+            if cutoff is not None:
+                conn.execute(delete(ChangeLog).where(
+                    ChangeLog.table_name == table, _in_scope(sc), ChangeLog.id <= cutoff
+                ))
+    return int(version)
+
+
+def _pending(session: Session) -> Dict[str, list]:
+    return session.info.setdefault("versions_pending", {})
+
+
+def record(session: Session, table: str, ids: Iterable[int], op: str = "i", scope: int | None = None) -> None:
+    """Anota ids cambiados por un statement ejecutado con versions_logged=True."""
+    _pending(session).setdefault(table, []).extend((rid, op, scope) for rid in ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    if not TRACKED:
+        return
+    changes: Dict[str, list] = {}
+    for op, objs in (("i", session.new), ("u", session.dirty), ("d", session.deleted)):
+        for obj in objs:
+            table = getattr(obj, "__tablename__", None)
+            if table not in TRACKED:
+                continue
+            if op == "u" and not session.is_modified(obj, include_collections=False):
+                continue
+            scope = TRACKED[table]
+            changes.setdefault(table, []).append(
+                (getattr(obj, "id", None), op, getattr(obj, scope, None) if scope else None)
+            )
+    pending = _pending(session)
+    for table, rows in changes.items():
+        pending.setdefault(table, []).extend(rows)
+
+
+def pk_from_where(stmt) -> int | None:
+    """`WHERE tabla.id = :x [AND ...]` -> x; cualquier otra forma -> None (recarga completa)."""
+    clause = getattr(stmt, "whereclause", None)
+    parts = clause.clauses if isinstance(clause, BooleanClauseList) else [clause]
+    for c in parts:
+        if (
+            isinstance(c, BinaryExpression) and c.operator is operators.eq
+            and getattr(c.left, "name", None) == "id" and isinstance(c.right, BindParameter)
+        ):
+            return c.right.value
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _orm_bulk(state):
+    """INSERT/UPDATE/DELETE masivos (session.execute(update(Model)...)) no pasan por flush."""
+    if not TRACKED or not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(getattr(state.statement, "table", None), "name", None)
+    if table not in TRACKED or state.execution_options.get("versions_logged"):
+        return
+    params = state.parameters
+    op = "i" if state.is_insert else ("u" if state.is_update else "d")
+    scope = state.execution_options.get("versions_scope")
+    if isinstance(params, list) and params and not state.is_insert and all("id" in p for p in params):
+        rows = [(p["id"], op, scope) for p in params]
+    elif not state.is_insert and pk_from_where(state.statement) is not None:
+        rows = [(pk_from_where(state.statement), op, scope)]
+    else:
+        rows = [(None, "*", scope)]
+    _pending(state.session).setdefault(table, []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    pending = session.info.pop("versions_pending", None)
+    if not pending:
+        return
+    with _lock:
+        lost = set(_lost)
+    for attempt in (1, 2):
+        try:
+            # Transacción aparte: la sesión ya no admite SQL y los datos ya están commiteados
+            with session.get_bind().begin() as conn:
+                for table in sorted(set(pending) | lost):
+                    rows = list(pending.get(table, ()))
+                    if table in lost:
+                        rows.append((None, "*", None))
+                    bump(conn, table, rows)
+            with _lock:
+                _lost.difference_update(lost)
+            break
+        except Exception:
+            if attempt == 2:
+                # Los datos ya se guardaron: el próximo change_log marca estas tablas con "*"
+                with _lock:
+                    _lost.update(pending)
+                logger = current_app.logger if has_app_context() else logging.getLogger(__name__)
+                logger.exception("change_log not written for %s", sorted(pending))
+    # El propio proceso ve sus cambios sin esperar al TTL
+    with _lock:
+        for t in pending:
+            _cache.pop(t, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("versions_pending", None)
+
+
+def current_version(table: str, max_age: float = 2.0) -> int:
+    now = time.monotonic()
+    hit = _cache.get(table)
+    if hit and now - hit[1] < max_age:
+        return hit[0]
+    v = db.session.execute(
+        select(func.max(ChangeLog.id)).where(ChangeLog.table_name == table)
+    ).scalar()
+    v = int(v or 0)
+    with _lock:
+        _cache[table] = (v, now)
+    return v
+
+
+def _scope_filter(table: str, scope: int | None):
+    cond = ChangeLog.table_name == table
+    if scope is None:
+        return cond
+    # Filas sin ámbito (statements que no lo indicaron) pueden ser de cualquiera
+    return and_(cond, or_(ChangeLog.scope_id == scope, ChangeLog.scope_id.is_(None)))
+
+
+def scope_version(table: str, scope: int) -> int:
+    """Versión de `table` limitada a un ámbito (sin caché: es un cursor de sync)."""
+    v = db.session.execute(select(func.max(ChangeLog.id)).where(_scope_filter(table, scope))).scalar()
+    return int(v or 0)
+
+
+def changes_since(table: str, since: int, scope: int | None = None) -> Set[int] | None:
+    """
+    Ids cambiados con versión > since (solo del ámbito `scope` si se indica),
+    o None si hay que recargar todo (cambio masivo, o change_log ya podado
+    por encima de `since`).
+    """
+    if since <= 0:
+        return None
+    where = _scope_filter(table, scope)
+    # La poda borra un prefijo: si queda alguna fila <= since, no falta nada después
+    kept = db.session.execute(select(ChangeLog.id).where(where, ChangeLog.id <= since).limit(1)).first()
+    if kept is None:
+        return None
+    ids: Set[int] = set()
+    for rid, op in db.session.execute(
+        select(ChangeLog.row_id, ChangeLog.op).where(where, ChangeLog.id > since)
+    ):
+        if rid is None or op == "*":
+            return None
+        ids.add(rid)
+    return ids
+
+
+def cached(key: str, tables: Sequence[str], compute: Callable[[], Any]) -> Any:
+    """
+    Valor calculado por `compute()` y guardado en el proceso hasta que cambie
+    la versión de alguna de `tables` (que deben estar registradas con track).
+    """
+    stamp = tuple(current_version(t) for t in tables)
+    with _lock:
+        hit = _values.get(key)
+        if hit is not None and hit[0] == stamp:
+            _values.move_to_end(key)
+            return hit[1]
+    value = compute()
+    with _lock:
+        _values[key] = (stamp, value)
+        _values.move_to_end(key)
+        while len(_values) > CACHE_MAX:
+            _values.popitem(last=False)
+    return value
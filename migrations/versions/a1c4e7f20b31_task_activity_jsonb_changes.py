@@ -0,0 +1,38 @@
+"""task_activity.changes -> JSONB + indexes for the activity feed
+
+Revision ID: a1c4e7f20b31
+Revises: 1cd076d8eff9
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+
+revision = "a1c4e7f20b31"
+down_revision = "1cd076d8eff9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Filas legacy: texto JSON o "" -> JSONB
+        op.execute(
+            "ALTER TABLE task_activity ALTER COLUMN changes TYPE JSONB "
+            "USING COALESCE(NULLIF(changes, ''), '{}')::jsonb"
+        )
+        op.execute("ALTER TABLE task_activity ALTER COLUMN changes SET DEFAULT '{}'::jsonb")
+        op.create_index(
+            "ix_task_activity_changes_gin", "task_activity", ["changes"], postgresql_using="gin"
+        )
+    op.create_index("ix_task_activity_created_id", "task_activity", ["created_at", "id"])
+    op.create_index("ix_task_activity_user_created", "task_activity", ["user_id", "created_at"])
+
+
+def downgrade():
+    bind = op.get_bind()
+    op.drop_index("ix_task_activity_user_created", table_name="task_activity")
+    op.drop_index("ix_task_activity_created_id", table_name="task_activity")
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_task_activity_changes_gin", table_name="task_activity")
+        op.execute("ALTER TABLE task_activity ALTER COLUMN changes DROP DEFAULT")
+        op.execute("ALTER TABLE task_activity ALTER COLUMN changes TYPE TEXT USING changes::text")
@@ -0,0 +1,40 @@
+"""room topology table (seeded with the Aloft layout)
+
+Revision ID: a2c9e4f71d38
+Revises: f1b8d3e6a250
+Create Date: 2026-10-19 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a2c9e4f71d38"
+down_revision = "f1b8d3e6a250"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    room = op.create_table(
+        "room",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("number", sa.String(length=10), nullable=False, unique=True),
+        sa.Column("floor", sa.String(length=20), nullable=True),
+        sa.Column("type", sa.String(length=40), nullable=True),
+        sa.Column("display_name", sa.String(length=80), nullable=True),
+        sa.Column("sort_order", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_room_floor_sort", "room", ["floor", "sort_order"])
+
+    # Topología que antes estaba fija en routes/projects.py: 201–216 y x01–x17 (pisos 3–8)
+    numbers = list(range(201, 217)) + [n for f in range(3, 9) for n in range(f * 100 + 1, f * 100 + 18)]
+    op.bulk_insert(room, [
+        {"number": str(n), "floor": str(n // 100), "sort_order": i, "active": True}
+        for i, n in enumerate(numbers)
+    ])
+
+
+def downgrade():
+    op.drop_index("ix_room_floor_sort", table_name="room")
+    op.drop_table("room")
@@ -0,0 +1,41 @@
+"""asset_state_history append table
+
+Revision ID: a7c3e5f9b284
+Revises: f6b4d2e8a193
+Create Date: 2026-10-19 19:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a7c3e5f9b284"
+down_revision = "f6b4d2e8a193"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "asset_state_history",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("prev_state", sa.String(length=16), nullable=True),
+        sa.Column("state", sa.String(length=16), nullable=False),
+        sa.Column("inspection_id", sa.Integer(), nullable=True),
+        sa.Column("changed_by", sa.String(length=120), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_asset_state_history_asset_changed", "asset_state_history", ["asset_id", "changed_at"])
+    op.create_index("ix_asset_state_history_changed_at", "asset_state_history", ["changed_at"])
+
+    # Punto de partida: el estado actual de cada asset
+    op.execute("""
+        INSERT INTO asset_state_history (asset_id, prev_state, state, inspection_id, changed_by, changed_at)
+        SELECT asset_id, NULL, state, last_inspection_id, updated_by, updated_at
+        FROM asset_status
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_asset_state_history_changed_at", table_name="asset_state_history")
+    op.drop_index("ix_asset_state_history_asset_changed", table_name="asset_state_history")
+    op.drop_table("asset_state_history")
@@ -0,0 +1,25 @@
+"""change_log.scope_id: cursores por ámbito (sync por inspección)
+
+Revision ID: a8d4f2c6e913
+Revises: e5c1a9d3b742
+Create Date: 2026-10-20 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a8d4f2c6e913"
+down_revision = "e5c1a9d3b742"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("change_log") as batch:
+        batch.add_column(sa.Column("scope_id", sa.Integer(), nullable=True))
+    op.create_index("ix_change_log_table_scope_id", "change_log", ["table_name", "scope_id", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_change_log_table_scope_id", table_name="change_log")
+    with op.batch_alter_table("change_log") as batch:
+        batch.drop_column("scope_id")
@@ -0,0 +1,25 @@
+"""asset: (sort key, id) indexes for keyset listing
+
+Revision ID: b4d8f2a6c031
+Revises: a7c3e5f9b284
+Create Date: 2026-10-19 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "b4d8f2a6c031"
+down_revision = "a7c3e5f9b284"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_asset_sort_name_id", "asset", ["name", "id"])
+    op.create_index("ix_asset_sort_floor_id", "asset", [sa.text("COALESCE(floor, '')"), "id"])
+    op.create_index("ix_asset_sort_type_id", "asset", [sa.text("COALESCE(type, '')"), "id"])
+
+
+def downgrade():
+    op.drop_index("ix_asset_sort_type_id", table_name="asset")
+    op.drop_index("ix_asset_sort_floor_id", table_name="asset")
+    op.drop_index("ix_asset_sort_name_id", table_name="asset")
@@ -0,0 +1,20 @@
+"""index task_comment (task_id, id) for paginated threads and counts
+
+Revision ID: b52d9e0c6a47
+Revises: a1c4e7f20b31
+Create Date: 2026-10-19 09:30:00
+"""
+from alembic import op
+
+revision = "b52d9e0c6a47"
+down_revision = "a1c4e7f20b31"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_task_comment_task_id_id", "task_comment", ["task_id", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_task_comment_task_id_id", table_name="task_comment")
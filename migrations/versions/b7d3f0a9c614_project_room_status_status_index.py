@@ -0,0 +1,22 @@
+"""project_room_status (project_id, status) index
+
+Revision ID: b7d3f0a9c614
+Revises: a2c9e4f71d38
+Create Date: 2026-10-19 14:00:00
+"""
+from alembic import op
+
+revision = "b7d3f0a9c614"
+down_revision = "a2c9e4f71d38"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_project_room_status_project_status", "project_room_status", ["project_id", "status"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_project_room_status_project_status", table_name="project_room_status")
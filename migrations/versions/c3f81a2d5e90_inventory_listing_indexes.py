@@ -0,0 +1,29 @@
+"""inventory: partial low-stock index and (name, id) keyset index
+
+Revision ID: c3f81a2d5e90
+Revises: b52d9e0c6a47
+Create Date: 2026-10-19 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "c3f81a2d5e90"
+down_revision = "b52d9e0c6a47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_inventory_low_stock", "inventory", ["name", "id"],
+        postgresql_where=sa.text("stock <= minimum"),
+        sqlite_where=sa.text("stock <= minimum"),
+    )
+    op.create_index(
+        "ix_inventory_sort_name_id", "inventory", [sa.text("COALESCE(name, '')"), "id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_inventory_sort_name_id", table_name="inventory")
+    op.drop_index("ix_inventory_low_stock", table_name="inventory")
@@ -0,0 +1,35 @@
+"""project_room_audit history index + project_room_checkpoint
+
+Revision ID: c5e1a7b3d829
+Revises: b7d3f0a9c614
+Create Date: 2026-10-19 15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "c5e1a7b3d829"
+down_revision = "b7d3f0a9c614"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_project_room_audit_project_room_created",
+        "project_room_audit",
+        ["project_id", "room_number", "created_at"],
+    )
+    op.create_table(
+        "project_room_checkpoint",
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("project.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("room_number", sa.String(length=10), primary_key=True),
+        sa.Column("status", sa.String(length=40), nullable=True),
+        sa.Column("updated_by", sa.String(length=120), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("project_room_checkpoint")
+    op.drop_index("ix_project_room_audit_project_room_created", table_name="project_room_audit")
@@ -0,0 +1,69 @@
+"""fuzzy search: pg_trgm GIN indexes (PostgreSQL) / FTS5 trigram tables (SQLite)
+
+Revision ID: c9e5a1f7d342
+Revises: b4d8f2a6c031
+Create Date: 2026-10-19 21:00:00
+"""
+from alembic import op
+
+revision = "c9e5a1f7d342"
+down_revision = "b4d8f2a6c031"
+branch_labels = None
+depends_on = None
+
+# Debe coincidir con FUZZY en backend/utils/fuzzy.py
+FUZZY_COLUMNS = {
+    "asset": ["name"],
+    "manuals": ["title", "description"],
+    "sop": ["title", "description"],
+    "quote": ["quote_number", "scope_title", "scope_detail"],
+}
+
+
+def _sqlite_ddl(table, cols):
+    names = ", ".join(cols)
+    new = ", ".join(f"new.{c}" for c in cols)
+    old = ", ".join(f"old.{c}" for c in cols)
+    f = f"{table}_fuzzy"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {f} USING fts5({names}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {f}_ai AFTER INSERT ON "{table}" BEGIN '
+        f"INSERT INTO {f}(rowid, {names}) VALUES (new.id, {new}); END",
+        f'CREATE TRIGGER IF NOT EXISTS {f}_ad AFTER DELETE ON "{table}" BEGIN '
+        f"INSERT INTO {f}({f}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f'CREATE TRIGGER IF NOT EXISTS {f}_au AFTER UPDATE OF {names} ON "{table}" BEGIN '
+        f"INSERT INTO {f}({f}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {f}(rowid, {names}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {f}({f}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table, cols in FUZZY_COLUMNS.items():
+            for col in cols:
+                op.create_index(
+                    f"ix_{table}_{col}_trgm", table, [col],
+                    postgresql_using="gin", postgresql_ops={col: "gin_trgm_ops"},
+                )
+    elif bind.dialect.name == "sqlite":
+        for table, cols in FUZZY_COLUMNS.items():
+            for stmt in _sqlite_ddl(table, cols):
+                op.execute(stmt)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table, cols in FUZZY_COLUMNS.items():
+            for col in cols:
+                op.drop_index(f"ix_{table}_{col}_trgm", table_name=table)
+    elif bind.dialect.name == "sqlite":
+        for table in FUZZY_COLUMNS:
+            f = f"{table}_fuzzy"
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {f}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {f}")
@@ -0,0 +1,50 @@
+"""search_document: unified search index (weighted tsvector + facets)
+
+Revision ID: d2f7b9e4a516
+Revises: c9e5a1f7d342
+Create Date: 2026-10-19 22:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "d2f7b9e4a516"
+down_revision = "c9e5a1f7d342"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "search_document",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("entity_type", sa.String(length=24), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=True),
+        sa.Column("subtitle", sa.String(length=255), nullable=True),
+        sa.Column("body", sa.Text(), nullable=True),
+        sa.Column("tsv", sa.Text().with_variant(postgresql.TSVECTOR(), "postgresql"), nullable=True),
+        sa.Column("floor", sa.String(length=20), nullable=True),
+        sa.Column("room", sa.String(length=20), nullable=True),
+        sa.Column("vendor_id", sa.Integer(), nullable=True),
+        sa.Column("vendor_name", sa.String(length=180), nullable=True),
+        sa.Column("parent_type", sa.String(length=24), nullable=True),
+        sa.Column("parent_id", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.UniqueConstraint("entity_type", "entity_id", name="uq_search_document_entity"),
+    )
+    op.create_index("ix_search_document_parent", "search_document", ["parent_type", "parent_id"])
+    op.create_index("ix_search_document_vendor", "search_document", ["vendor_id"])
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.create_index("ix_search_document_tsv_gin", "search_document", ["tsv"], postgresql_using="gin")
+    # El contenido se carga con: python backend/scripts/reindex_search.py
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_search_document_tsv_gin", table_name="search_document")
+    op.drop_index("ix_search_document_vendor", table_name="search_document")
+    op.drop_index("ix_search_document_parent", table_name="search_document")
+    op.drop_table("search_document")
@@ -0,0 +1,34 @@
+"""inspection_item unique (inspection_id, asset_id)
+
+Revision ID: d8f2b6c0e417
+Revises: c5e1a7b3d829
+Create Date: 2026-10-19 16:00:00
+"""
+from alembic import op
+
+revision = "d8f2b6c0e417"
+down_revision = "c5e1a7b3d829"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Duplicados generados por GETs concurrentes: se conserva el más reciente
+    op.execute("""
+        DELETE FROM inspection_item WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY inspection_id, asset_id ORDER BY updated_at DESC, id DESC
+                ) AS rn
+                FROM inspection_item
+                WHERE asset_id IS NOT NULL
+            ) d WHERE d.rn > 1
+        )
+    """)
+    op.create_index(
+        "uq_inspection_item_asset", "inspection_item", ["inspection_id", "asset_id"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_inspection_item_asset", table_name="inspection_item")
@@ -0,0 +1,24 @@
+"""inventory_log composite indexes for keyset pagination
+
+Revision ID: d94b0e3a7c12
+Revises: c3f81a2d5e90
+Create Date: 2026-10-19 10:30:00
+"""
+from alembic import op
+
+revision = "d94b0e3a7c12"
+down_revision = "c3f81a2d5e90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_inventory_log_item_created", "inventory_log", ["item_db_id", "created_at"])
+    op.create_index("ix_inventory_log_user_created", "inventory_log", ["user_id", "created_at"])
+    op.create_index("ix_inventory_log_created_id", "inventory_log", ["created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_inventory_log_created_id", table_name="inventory_log")
+    op.drop_index("ix_inventory_log_user_created", table_name="inventory_log")
+    op.drop_index("ix_inventory_log_item_created", table_name="inventory_log")
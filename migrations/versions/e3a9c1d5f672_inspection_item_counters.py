@@ -0,0 +1,51 @@
+"""inspection item counters (items_total/open/ok/fail/na/ooo)
+
+Revision ID: e3a9c1d5f672
+Revises: d8f2b6c0e417
+Create Date: 2026-10-19 17:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e3a9c1d5f672"
+down_revision = "d8f2b6c0e417"
+branch_labels = None
+depends_on = None
+
+COUNTERS = {
+    "items_open": "open",
+    "items_ok": "ok",
+    "items_fail": "fail",
+    "items_na": "na",
+    "items_ooo": "ooo",
+}
+
+
+def upgrade():
+    with op.batch_alter_table("inspection") as batch:
+        batch.add_column(sa.Column("items_total", sa.Integer(), nullable=False, server_default="0"))
+        for col in COUNTERS:
+            batch.add_column(sa.Column(col, sa.Integer(), nullable=False, server_default="0"))
+
+    # Backfill desde inspection_item
+    sets = ["items_total = (SELECT count(*) FROM inspection_item ii WHERE ii.inspection_id = inspection.id)"]
+    for col, status in COUNTERS.items():
+        sets.append(
+            f"{col} = (SELECT count(*) FROM inspection_item ii "
+            f"WHERE ii.inspection_id = inspection.id AND ii.status = '{status}')"
+        )
+    op.execute("UPDATE inspection SET " + ", ".join(sets))
+    op.execute("""
+        UPDATE inspection SET progress = CASE
+            WHEN status = 'completed' THEN 100
+            ELSE ((items_total - items_open) * 100) / items_total
+        END
+        WHERE items_total > 0
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table("inspection") as batch:
+        for col in reversed(list(COUNTERS)):
+            batch.drop_column(col)
+        batch.drop_column("items_total")
@@ -0,0 +1,38 @@
+"""change_log: el id hace de versión; se elimina el contador table_version
+
+Revision ID: e5c1a9d3b742
+Revises: d2f7b9e4a516
+Create Date: 2026-10-20 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e5c1a9d3b742"
+down_revision = "d2f7b9e4a516"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index("ix_change_log_table_version", table_name="change_log")
+    with op.batch_alter_table("change_log") as batch:
+        batch.drop_column("version")
+    op.create_index("ix_change_log_table_id", "change_log", ["table_name", "id"])
+    op.drop_table("table_version")
+
+
+def downgrade():
+    op.create_table(
+        "table_version",
+        sa.Column("table_name", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "INSERT INTO table_version (table_name, version) "
+        "SELECT table_name, MAX(id) FROM change_log GROUP BY table_name"
+    )
+    op.drop_index("ix_change_log_table_id", table_name="change_log")
+    with op.batch_alter_table("change_log") as batch:
+        batch.add_column(sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"))
+    op.execute("UPDATE change_log SET version = id")
+    op.create_index("ix_change_log_table_version", "change_log", ["table_name", "version"])
@@ -0,0 +1,38 @@
+"""inventory_daily_usage rollup + inventory_rollup_state
+
+Revision ID: e7a2c5d18f43
+Revises: d94b0e3a7c12
+Create Date: 2026-10-19 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e7a2c5d18f43"
+down_revision = "d94b0e3a7c12"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "inventory_daily_usage",
+        sa.Column("item_db_id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("qty_in", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("qty_out", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("qty_set", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("moves", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_inventory_daily_usage_day", "inventory_daily_usage", ["day"])
+    op.create_table(
+        "inventory_rollup_state",
+        sa.Column("name", sa.String(length=40), primary_key=True),
+        sa.Column("last_day", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("inventory_rollup_state")
+    op.drop_index("ix_inventory_daily_usage_day", table_name="inventory_daily_usage")
+    op.drop_table("inventory_daily_usage")
@@ -0,0 +1,37 @@
+"""table_version + change_log (invalidación de cachés por proceso)
+
+Revision ID: f1b8d3e6a250
+Revises: e7a2c5d18f43
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "f1b8d3e6a250"
+down_revision = "e7a2c5d18f43"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "table_version",
+        sa.Column("table_name", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=True),
+        sa.Column("op", sa.String(length=1), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index("ix_change_log_table_version", "change_log", ["table_name", "version"])
+
+
+def downgrade():
+    op.drop_index("ix_change_log_table_version", table_name="change_log")
+    op.drop_table("change_log")
+    op.drop_table("table_version")
@@ -0,0 +1,27 @@
+"""inspection_item version + per-field timestamps (offline sync)
+
+Revision ID: f6b4d2e8a193
+Revises: e3a9c1d5f672
+Create Date: 2026-10-19 18:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "f6b4d2e8a193"
+down_revision = "e3a9c1d5f672"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("inspection_item") as batch:
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        batch.add_column(sa.Column("status_at", sa.DateTime(timezone=True), nullable=True))
+        batch.add_column(sa.Column("notes_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("inspection_item") as batch:
+        batch.drop_column("notes_at")
+        batch.drop_column("status_at")
+        batch.drop_column("version")